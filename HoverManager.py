@@ -1,25 +1,51 @@
-import MyModel
-from MyShapes import MyPoint, Shape, check_box_intersection
+from enum import Enum
+from MyModel import MyModel
+from MyShapes import MyPoint, MyPolygon, Shape, check_box_intersection
+
+class PickModes(Enum):
+    BOUNDING_BOX = 0 # Index query, then the closest point on every candidate
+    COLOR_ID = 1 # Offscreen ID buffer (see PickManager), then only the hit shape
 
 class HoverManager():
     """Manages hover-selection logic."""
     def __init__(self, pixel_box_size=10.0):
         self.m_hovered_shape: Shape = None
         self.m_closest_point_on_shape: MyPoint = None
+        self.m_hovered_face: MyPolygon = None
         self.m_current_mouse_pos: MyPoint = None
         self.m_selection_box_world_size: float = 0.0
         self.m_pixel_box_size = pixel_box_size
+        self.m_pick_mode = PickModes.BOUNDING_BOX
+        self.m_color_picker = None # Callable (mouse_pos, radius_pixels) -> (ready, shape)
 
     def clear(self):
         """Clears the current hover state."""
         self.m_hovered_shape = None
         self.m_closest_point_on_shape = None
+        self.m_hovered_face = None
         self.m_current_mouse_pos = None
 
     def update_world_box_size(self, world_per_pixel: float):
         """Updates the selection box size based on current zoom."""
         self.m_selection_box_world_size = self.m_pixel_box_size * world_per_pixel
 
+    def get_selection_box_world_size(self) -> float:
+        return self.m_selection_box_world_size
+
+    # --- NEW ---
+    def set_pick_mode(self, mode: PickModes):
+        self.m_pick_mode = mode
+
+    def get_pick_mode(self) -> PickModes:
+        return self.m_pick_mode
+
+    def set_color_picker(self, picker):
+        """
+        picker(mouse_pos, radius_pixels) -> (ready, shape), used in COLOR_ID
+        mode. While it isn't ready (stale buffer) hovering uses bounding boxes.
+        """
+        self.m_color_picker = picker
+
     def update_hover(self, mouse_pos: MyPoint, model: MyModel):
         """
         Finds the closest shape whose bounding box intersects the 
@@ -28,6 +54,7 @@ class HoverManager():
         self.m_current_mouse_pos = mouse_pos
         self.m_hovered_shape = None # Reset
         self.m_closest_point_on_shape = None
+        self.m_hovered_face = None
 
         if self.m_selection_box_world_size == 0.0 or not mouse_pos:
             return
@@ -37,37 +64,51 @@ class HoverManager():
         box_xmin, box_xmax = mx - half_box, mx + half_box
         box_ymin, box_ymax = my - half_box, my + half_box
 
+        # --- NEW ---: Color-ID picking finds the shape; only it gets the exact closest point
+        if self.m_pick_mode == PickModes.COLOR_ID and self.m_color_picker is not None:
+            ready, picked_shape = self.m_color_picker(mouse_pos, int(self.m_pixel_box_size // 2))
+            if ready:
+                if picked_shape is not None:
+                    self.m_hovered_shape = picked_shape
+                    self.m_closest_point_on_shape = picked_shape.find_closest_point(mouse_pos)[0]
+                else:
+                    self.m_hovered_face = model.find_face_at(mouse_pos)
+                return
+
         min_dist_sq = float('inf')
         best_shape = None
         best_point = None
 
-        for shape in model.getShapes():
-            s_xmin, s_xmax, s_ymin, s_ymax = shape.get_bounding_box()
+        # --- MODIFIED ---: 1. Shapes whose bounding box intersects the selection
+        # box come from the model's spatial index (kept up to date on every edit)
+        for shape in model.get_shape_index().query_box(box_xmin, box_xmax, box_ymin, box_ymax):
+            # 2. Find the distance from the mouse to this shape
+            closest_pt, dist = shape.find_closest_point(mouse_pos)
+            dist_sq = dist**2
             
-            # 1. Check if shape's bounding box intersects the selection box
-            if check_box_intersection(box_xmin, box_xmax, box_ymin, box_ymax, 
-                                      s_xmin, s_xmax, s_ymin, s_ymax):
-                
-                # 2. If it does, find the distance from the mouse to this shape
-                closest_pt, dist = shape.find_closest_point(mouse_pos)
-                dist_sq = dist**2
-                
-                # 3. Keep track of the one that is closest to the mouse
-                if dist_sq < min_dist_sq:
-                    min_dist_sq = dist_sq
-                    best_shape = shape
-                    best_point = closest_pt
+            # 3. Keep track of the one that is closest to the mouse
+            if dist_sq < min_dist_sq:
+                min_dist_sq = dist_sq
+                best_shape = shape
+                best_point = closest_pt
         
         # Store the best candidate
         self.m_hovered_shape = best_shape
         self.m_closest_point_on_shape = best_point
 
+        # --- NEW ---: With no shape under the mouse, look for a found face
+        if best_shape is None:
+            self.m_hovered_face = model.find_face_at(mouse_pos)
+
     def get_hovered_shape(self) -> Shape:
         return self.m_hovered_shape
     
     def get_closest_point(self) -> MyPoint:
         return self.m_closest_point_on_shape
 
+    def get_hovered_face(self) -> MyPolygon:
+        return self.m_hovered_face
+
     def get_selection_box_points(self) -> list[MyPoint]:
         """Gets the 4 corner points of the selection box for drawing."""
         if not self.m_current_mouse_pos:
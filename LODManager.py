@@ -0,0 +1,80 @@
+# LODManager.py
+import math
+import weakref
+from MyShapes import MyPoint, Shape
+from MyGeometry import simplify_polyline
+from MyModel import ModelEvents
+
+class LODManager():
+    """
+    Manages render-time level-of-detail for shapes.
+    Shapes smaller than a pixel collapse to a single point, and dense
+    polylines are simplified (Douglas-Peucker) at pixel tolerance.
+    Simplified vertex lists are cached per shape and per zoom bucket.
+    """
+    def __init__(self, pixel_tolerance=1.0, max_buckets_per_shape=4):
+        self.m_pixel_tolerance = pixel_tolerance
+        self.m_max_buckets_per_shape = max_buckets_per_shape
+        # shape -> {'bbox': (xmin, xmax, ymin, ymax), 'buckets': {bucket: points}}
+        self.m_cache = weakref.WeakKeyDictionary()
+
+    def clear(self):
+        """Drops every cached simplification."""
+        self.m_cache.clear()
+
+    def invalidate(self, shape: Shape):
+        """Drops the cached data of a single shape (e.g. after it changed)."""
+        self.m_cache.pop(shape, None)
+
+    def on_model_event(self, event: ModelEvents, shapes: list[Shape]):
+        """Model observer: keeps the cache in step with edits."""
+        if event in (ModelEvents.SHAPES_MODIFIED, ModelEvents.SHAPES_REMOVED):
+            for shape in shapes:
+                self.invalidate(shape)
+        elif event == ModelEvents.CLEARED:
+            self.clear()
+
+    @staticmethod
+    def get_zoom_bucket(world_per_pixel: float) -> int:
+        """Zoom buckets are powers of two of the world size of a pixel."""
+        if world_per_pixel <= 0.0:
+            return 0
+        return math.floor(math.log2(world_per_pixel))
+
+    def _get_entry(self, shape: Shape) -> dict:
+        entry = self.m_cache.get(shape)
+        if entry is None:
+            entry = {'bbox': shape.get_bounding_box(), 'buckets': {}}
+            self.m_cache[shape] = entry
+        return entry
+
+    def get_render_points(self, shape: Shape, world_per_pixel: float) -> (list[MyPoint], bool):
+        """
+        Returns (points_to_draw, is_sub_pixel).
+        If is_sub_pixel is True, the list holds a single point that stands
+        for the whole shape and should be drawn with GL_POINTS.
+        """
+        entry = self._get_entry(shape)
+
+        # 1. Sub-pixel shapes collapse into their bounding box center (and are never tessellated)
+        xmin, xmax, ymin, ymax = entry['bbox']
+        if max(xmax - xmin, ymax - ymin) < world_per_pixel:
+            return [MyPoint((xmin + xmax) / 2.0, (ymin + ymax) / 2.0)], True
+
+        points = shape.get_tessellated_points()
+
+        if len(points) < 3:
+            return points, False
+
+        # 2. Simplify at the tolerance of the zoom bucket (never above one pixel)
+        bucket = self.get_zoom_bucket(world_per_pixel)
+        buckets = entry['buckets']
+        simplified = buckets.get(bucket)
+        if simplified is None:
+            tolerance = (2.0 ** bucket) * self.m_pixel_tolerance
+            simplified = simplify_polyline(points, tolerance)
+            if len(buckets) >= self.m_max_buckets_per_shape:
+                buckets.pop(next(iter(buckets))) # Oldest bucket first
+            buckets[bucket] = simplified
+
+        return simplified, False
@@ -0,0 +1,154 @@
+# LoadManager.py
+import queue
+import threading
+import time
+from PySide6.QtCore import QTimer
+from MyModel import MyModel
+from MyModelIO import iter_shape_chunks
+from MyShapes import tessellate_shapes
+from MyTileStore import TileStore
+from MyTiledModel import TiledModel
+
+_DONE = object() # End of the worker's chunks
+
+def _read_drawing(path: str):
+    for chunk in iter_shape_chunks(path):
+        tessellate_shapes(chunk)
+        yield chunk
+
+def _read_tiles(path: str, keys: list[tuple]):
+    """(key, shapes) of each tile, through a connection of the worker's own (sqlite's are per thread)."""
+    store = TileStore(path)
+    try:
+        for key in keys:
+            shapes = store.read_tile(key)
+            tessellate_shapes(shapes)
+            yield key, shapes
+    finally:
+        store.close()
+
+class LoadManager():
+    """
+    Progressive loading: a worker thread parses (and batch-tessellates)
+    a drawing in chunks, and a timer on the GUI thread hands them to the
+    model, a few at a time, so the canvas keeps repainting and panning
+    while the rest of the file is read. The model itself is only ever
+    touched from the GUI thread. start_tiles() does the same for tiles
+    of a TiledModel, each added whole.
+    """
+    def __init__(self, interval_ms=15, time_budget_ms=25.0, max_queued_chunks=8, slice_size=500):
+        self.m_model: MyModel = None
+        self.m_queue = queue.Queue(maxsize=max_queued_chunks)
+        self.m_current = [] # Chunk being added, from m_current_pos on
+        self.m_current_pos = 0
+        self.m_slice_size = slice_size # Shapes per add_shapes call (one model event each)
+        self.m_worker: threading.Thread = None
+        self.m_cancel = threading.Event()
+        self.m_timer = QTimer()
+        self.m_timer.setInterval(interval_ms)
+        self.m_timer.timeout.connect(self._drain)
+        self.m_time_budget = time_budget_ms / 1000.0
+        self.m_on_chunk = None # Called with (shapes_loaded) after every chunk
+        self.m_on_finished = None # Called with (shapes_loaded, error message or None)
+        self.m_loaded = 0
+        self.m_start_time = 0.0
+        self.m_write_count = 0 # The tiled model's, when the tile reads started
+
+    def is_loading(self) -> bool:
+        return self.m_worker is not None
+
+    def start(self, path: str, model: MyModel, on_chunk=None, on_finished=None):
+        """Starts loading path into model (whose shapes are kept; clear it first to replace them)."""
+        self._start(model, _read_drawing(path), on_chunk, on_finished)
+
+    def start_tiles(self, model: TiledModel, keys: list[tuple], on_chunk=None, on_finished=None):
+        """Starts loading the given tiles of model (see TiledModel.add_read_tile)."""
+        self.m_write_count = model.get_write_count()
+        self._start(model, _read_tiles(model.get_store().get_path(), keys), on_chunk, on_finished)
+
+    def _start(self, model: MyModel, items, on_chunk, on_finished):
+        self.cancel()
+        self.m_model = model
+        self.m_on_chunk = on_chunk
+        self.m_on_finished = on_finished
+        self.m_loaded = 0
+        self.m_current = []
+        self.m_current_pos = 0
+        self.m_start_time = time.perf_counter()
+        self.m_cancel = threading.Event()
+        self.m_queue = queue.Queue(maxsize=self.m_queue.maxsize)
+        self.m_worker = threading.Thread(target=self._work, args=(items, self.m_queue, self.m_cancel), daemon=True)
+        self.m_worker.start()
+        self.m_timer.start()
+
+    def cancel(self):
+        """Stops a running load; shapes already added stay in the model."""
+        if self.m_worker is None:
+            return
+        self.m_cancel.set()
+        self.m_timer.stop()
+        self.m_worker = None
+        self.m_current = []
+
+    @staticmethod
+    def _work(items, chunks: queue.Queue, cancel: threading.Event):
+        """Worker thread: read and tessellate (in the items generator), never touching the model."""
+        try:
+            for chunk in items:
+                while not cancel.is_set():
+                    try:
+                        chunks.put(chunk, timeout=0.1)
+                        break
+                    except queue.Full:
+                        pass
+                if cancel.is_set():
+                    return
+            result = _DONE
+        except Exception as e: # Anything left uncaught would end the thread and leave the load hanging
+            result = e
+        while not cancel.is_set():
+            try:
+                chunks.put(result, timeout=0.1)
+                return
+            except queue.Full:
+                pass
+
+    def _drain(self):
+        """
+        Timer slot: adds queued shapes to the model, a slice at a time,
+        until the time budget is spent (the rest waits for the next tick).
+        """
+        deadline = time.perf_counter() + self.m_time_budget
+        loaded_before = self.m_loaded
+        while time.perf_counter() < deadline:
+            if self.m_current_pos >= len(self.m_current):
+                try:
+                    item = self.m_queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is _DONE or isinstance(item, Exception):
+                    self._finish(None if item is _DONE else str(item))
+                    return
+                if isinstance(item, tuple): # A whole tile
+                    key, shapes = item
+                    self.m_model.add_read_tile(key, shapes, self.m_write_count)
+                    self.m_loaded += len(shapes)
+                    continue
+                self.m_current, self.m_current_pos = item, 0
+            shapes = self.m_current[self.m_current_pos:self.m_current_pos + self.m_slice_size]
+            self.m_current_pos += len(shapes)
+            self.m_model.add_shapes(shapes, tessellate=False) # Already tessellated by the worker
+            self.m_loaded += len(shapes)
+        if self.m_loaded > loaded_before and self.m_on_chunk:
+            self.m_on_chunk(self.m_loaded)
+
+    def _finish(self, error: str):
+        self.m_timer.stop()
+        self.m_worker = None
+        elapsed = time.perf_counter() - self.m_start_time
+        if error:
+            print(f"Loading failed after {self.m_loaded} shapes: {error}")
+        else:
+            print(f"Loaded {self.m_loaded} shapes in {elapsed:.2f} s")
+        if self.m_on_finished:
+            self.m_on_finished(self.m_loaded, error)
@@ -5,6 +5,12 @@ from PySide6.QtWidgets import QApplication
 def main():
     app = QApplication(sys.argv)
     gui = MyWindow()
+    # --- NEW ---: --memory-report prints the memory report on exit,
+    # --trace-allocations starts with allocation tracing of region builds on
+    if '--memory-report' in sys.argv:
+        app.aboutToQuit.connect(gui.canvas.print_memory_report)
+    if '--trace-allocations' in sys.argv:
+        gui.trace_allocations_action.setChecked(True)
     gui.show()
     sys.exit(app.exec())
 
@@ -0,0 +1,57 @@
+import os
+import subprocess
+import sys
+
+# The GUI-free core: safe to import from headless workers and scripts
+CORE_MODULES = [
+    'MyShapes',
+    'MyGeometry',
+    'MyGraph',
+    'MyGraphBuilder',
+    'MySpatialIndex',
+    'MyTransforms',
+    'MyModel',
+    'MyModelIO',
+    'MyTileStore',
+    'MyTiledModel',
+    'MyRegionCache',
+    'MyIntersectionCache',
+    'MyMemoryReport',
+    'MyBooleanOps',
+    'LODManager',
+    'HoverManager',
+    'SnapManager',
+]
+
+# Packages the core must not load at import time (numpy is optional and lazy)
+HEAVY_PACKAGES = ('OpenGL', 'PySide6', 'numpy')
+
+PROBE = """
+import sys, time
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+print(elapsed)
+print(','.join(p for p in {packages!r} if p in sys.modules))
+"""
+
+def measure(module: str) -> (float, list[str]):
+    """Imports module in a fresh interpreter. Returns (seconds, heavy packages loaded)."""
+    result = subprocess.run([sys.executable, '-c', PROBE.format(module=module, packages=HEAVY_PACKAGES)],
+                            cwd=os.path.dirname(os.path.abspath(__file__)),
+                            capture_output=True, text=True, check=True)
+    elapsed, loaded = result.stdout.splitlines()[-2:]
+    return float(elapsed), [p for p in loaded.split(',') if p]
+
+def main():
+    failed = False
+    for module in CORE_MODULES:
+        elapsed, loaded = measure(module)
+        print(f"{module:<16} {elapsed * 1000.0:8.2f} ms")
+        if loaded:
+            print(f"    loads {', '.join(loaded)}")
+            failed = True
+    return 1 if failed else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,162 @@
+# MyBooleanOps.py
+from collections import defaultdict
+from enum import Enum
+from MyShapes import MyPoint, MyPolygon, polygon_signed_area
+from MyGeometry import point_in_polygon, sort_clockwise
+
+class BooleanOps(Enum):
+    UNION = 0
+    INTERSECTION = 1
+    DIFFERENCE = 2 # First operand minus all the others
+    XOR = 3
+
+def get_face_sample_point(face: MyPolygon) -> MyPoint:
+    """Returns a point strictly inside the face: the centroid of its largest triangle."""
+    points = face.get_all_points()
+    best_area = -1.0
+    best_point = None
+    for i, j, k in face.get_triangles() or []:
+        a, b, c = points[i], points[j], points[k]
+        area = abs((b.getX() - a.getX()) * (c.getY() - a.getY()) - (b.getY() - a.getY()) * (c.getX() - a.getX()))
+        if area > best_area:
+            best_area = area
+            best_point = MyPoint((a.getX() + b.getX() + c.getX()) / 3.0,
+                                 (a.getY() + b.getY() + c.getY()) / 3.0)
+    return best_point
+
+def label_faces(faces: list[MyPolygon], operands: list, tolerance: float = None) -> list[tuple[bool, ...]]:
+    """
+    Labels every face with its inside/outside status per operand.
+    Operands are closed shapes or faces of the same arrangement. Since the
+    arrangement already contains every crossing, a face is either fully
+    inside or fully outside each operand, so one sample point decides it.
+    tolerance must be the one the arrangement was built with, so that the
+    operand outlines match the face edges.
+    """
+    face_ids = {id(f) for f in faces}
+    operand_data = []
+    for op in operands:
+        if id(op) in face_ids:
+            operand_data.append((op, None, None))
+        else:
+            operand_data.append((op, op.get_bounding_box(), op.get_geometry_points(tolerance)))
+
+    labels = []
+    for face in faces:
+        sample = get_face_sample_point(face)
+        label = []
+        for op, bbox, boundary in operand_data:
+            if bbox is None: # The operand is a face itself
+                label.append(op is face)
+                continue
+            if sample is None:
+                label.append(False)
+                continue
+            x, y = sample.getX(), sample.getY()
+            inside_bbox = bbox[0] <= x <= bbox[1] and bbox[2] <= y <= bbox[3]
+            label.append(inside_bbox and point_in_polygon(sample, boundary))
+        labels.append(tuple(label))
+    return labels
+
+def _keeps_face(op: BooleanOps, label: tuple[bool, ...]) -> bool:
+    if op == BooleanOps.UNION:
+        return any(label)
+    if op == BooleanOps.INTERSECTION:
+        return all(label)
+    if op == BooleanOps.DIFFERENCE:
+        return label[0] and not any(label[1:])
+    if op == BooleanOps.XOR:
+        return sum(label) % 2 == 1
+    return False
+
+def _add_half_edges(half_edges: dict, pts: list[MyPoint]):
+    """Adds the edges of a loop; an edge already present in reverse cancels out."""
+    n = len(pts)
+    for i in range(n):
+        u, v = pts[i], pts[(i + 1) % n]
+        ku, kv = (u.getX(), u.getY()), (v.getX(), v.getY())
+        if ku == kv:
+            continue
+        if (kv, ku) in half_edges:
+            del half_edges[(kv, ku)]
+        else:
+            half_edges[(ku, kv)] = (u, v)
+
+def merge_faces(faces: list[MyPolygon]) -> list[MyPolygon]:
+    """
+    Merges adjacent faces into outlines with holes.
+    Faces are counter-clockwise, so an edge shared by two chosen faces shows
+    up once in each direction and cancels; what is left is the boundary,
+    with outer loops counter-clockwise and holes clockwise.
+    """
+    half_edges = {} # ((x1, y1), (x2, y2)) -> (p1, p2)
+    for face in faces:
+        # Outline counter-clockwise, holes (nested components) clockwise
+        loops = [face.get_tessellated_points()]
+        for hole in face.get_holes():
+            loops.append(hole[::-1] if polygon_signed_area(hole) > 0.0 else hole)
+        for pts in loops:
+            _add_half_edges(half_edges, pts)
+
+    outgoing = defaultdict(list)
+    for ku, kv in half_edges:
+        outgoing[ku].append(kv)
+
+    # 1. Chain the boundary half-edges into loops
+    used = set()
+    loops = []
+    for start in half_edges:
+        if start in used:
+            continue
+        loop = []
+        current = start
+        while current not in used:
+            used.add(current)
+            ku, kv = current
+            loop.append(half_edges[current][0])
+            # Used edges stay candidates: reaching the loop's first edge again closes it
+            candidates = list(outgoing[kv])
+            if not candidates:
+                break
+            if len(candidates) > 1:
+                # Pinch vertex: take the first edge clockwise from where we came from
+                # (same rule as the face tracing, so loops stay simple)
+                u, v = half_edges[current]
+                order = sort_clockwise(v, u, [half_edges[(kv, kw)][1] for kw in candidates])
+                candidates = [candidates[i] for i in order]
+            current = (kv, candidates[0])
+        if len(loop) > 2:
+            loops.append(loop)
+
+    # 2. Split into outlines and holes, and give each hole to its smallest outline
+    outers = []
+    holes = []
+    for loop in loops:
+        area = polygon_signed_area(loop)
+        if area > 0.0:
+            outers.append((area, loop))
+        elif area < 0.0:
+            holes.append(loop)
+    outers.sort(key=lambda o: o[0])
+
+    holes_per_outer = [[] for _ in outers]
+    for hole in holes:
+        for idx, (area, outer) in enumerate(outers):
+            if any(point_in_polygon(p, outer) for p in hole[:3]):
+                holes_per_outer[idx].append(hole)
+                break
+
+    return [MyPolygon(outer, holes_per_outer[idx]) for idx, (area, outer) in enumerate(outers)]
+
+def compute_boolean(faces: list[MyPolygon], operands: list, op: BooleanOps, tolerance: float = None) -> list[MyPolygon]:
+    """
+    Runs a boolean operation over the faces of an already built arrangement
+    (built with the given tessellation tolerance).
+    No intersections are recomputed: faces are labeled, filtered and merged.
+    """
+    if not operands:
+        return []
+    bounded_faces = [f for f in faces if f.get_signed_area() > 0.0] # Skip outer boundaries
+    labels = label_faces(bounded_faces, operands, tolerance)
+    chosen = [f for f, label in zip(bounded_faces, labels) if _keeps_face(op, label)]
+    return merge_faces(chosen)
@@ -1,16 +1,31 @@
 from PySide6 import QtOpenGLWidgets
 from PySide6.QtCore import Qt, QPointF
-from PySide6.QtGui import QWheelEvent
+from PySide6.QtGui import QWheelEvent, QKeyEvent
 from OpenGL.GL import *
-from MyModel import MyModel
+from MyModel import MyModel, ModelEvents
 from MyGraph import GraphEdge, GraphNode, MyGraph # --- NEW ---
 from MyShapes import (
     MyPoint, MyLine, MyPolygon, MyQuadBezier, MyCubicBezier, MyCircle, 
-    MyCircleArc, MyPolyline, Shape, check_box_intersection
+    MyCircleArc, MyPolyline, CurveShape, Shape, check_box_intersection
 )
-from MyGeometry import find_segment_intersection, point_on_segment, dist_sq
+from MyGraphBuilder import build_graph, find_faces
+from HoverManager import HoverManager, PickModes
+from PickManager import PickManager
+from LoadManager import LoadManager
+from MyModelIO import save_shapes
+from MyTileStore import TileStore, TILES_EXTENSION, build_tile_store, save_tiled
+from MyTiledModel import TiledModel
+from MyRegionCache import RegionCache, region_key
+from MyIntersectionCache import IntersectionCache
+from MyMemoryReport import AllocationTracer, memory_report, format_memory_report
+from SnapManager import SnapManager, SnapKinds
+from MyBooleanOps import BooleanOps, compute_boolean
+from LODManager import LODManager
+from MyRenderer import get_gl_primitive, ShapeBatchRenderer
+from MyTransforms import translation, rotation, scaling, mirroring
 from enum import Enum
 import math
+import time
 
 class CanvasModes(Enum):
     # ... (unchanged)
@@ -23,77 +38,6 @@ class CanvasModes(Enum):
     CIRCLE_ARC_CREATION = 6
     SELECTION_MODE = 7
 
-class HoverManager:
-    def __init__(self, pixel_box_size=10.0):
-        self.m_hovered_shape: Shape = None
-        self.m_closest_point_on_shape: MyPoint = None
-        self.m_current_mouse_pos: MyPoint = None
-        self.m_selection_box_world_size: float = 0.0
-        self.m_pixel_box_size = pixel_box_size
-
-    def clear(self):
-        self.m_hovered_shape = None
-        self.m_closest_point_on_shape = None
-        self.m_current_mouse_pos = None
-
-    def update_world_box_size(self, world_per_pixel: float):
-        self.m_selection_box_world_size = self.m_pixel_box_size * world_per_pixel
-
-    def update_hover(self, mouse_pos: MyPoint, model: MyModel):
-        self.m_current_mouse_pos = mouse_pos
-        self.m_hovered_shape = None
-        self.m_closest_point_on_shape = None
-
-        if self.m_selection_box_world_size == 0.0 or not mouse_pos:
-            return
-
-        half_box = self.m_selection_box_world_size / 2.0
-        mx, my = mouse_pos.getX(), mouse_pos.getY()
-        box_xmin, box_xmax = mx - half_box, mx + half_box
-        box_ymin, box_ymax = my - half_box, my + half_box
-
-        min_dist_sq = float('inf')
-        best_shape = None
-        best_point = None
-
-        for shape in model.getShapes():
-            s_xmin, s_xmax, s_ymin, s_ymax = shape.get_bounding_box()
-            
-            if check_box_intersection(box_xmin, box_xmax, box_ymin, box_ymax, 
-                                      s_xmin, s_xmax, s_ymin, s_ymax):
-                
-                closest_pt, dist = shape.find_closest_point(mouse_pos)
-                dist_sq = dist**2
-                
-                if dist_sq < min_dist_sq:
-                    min_dist_sq = dist_sq
-                    best_shape = shape
-                    best_point = closest_pt
-        
-        self.m_hovered_shape = best_shape
-        self.m_closest_point_on_shape = best_point
-
-    def get_hovered_shape(self) -> Shape:
-        return self.m_hovered_shape
-    
-    def get_closest_point(self) -> MyPoint:
-        return self.m_closest_point_on_shape
-
-    def get_selection_box_points(self) -> list[MyPoint]:
-        if not self.m_current_mouse_pos:
-            return []
-        
-        half_box = self.m_selection_box_world_size / 2.0
-        mx, my = self.m_current_mouse_pos.getX(), self.m_current_mouse_pos.getY()
-        
-        return [
-            MyPoint(mx - half_box, my - half_box), # Bottom-left
-            MyPoint(mx + half_box, my - half_box), # Bottom-right
-            MyPoint(mx + half_box, my + half_box), # Top-right
-            MyPoint(mx - half_box, my + half_box)  # Top-left
-        ]
-
-
 class MyCanvas(QtOpenGLWidgets.QOpenGLWidget):
     def __init__(self):
         # ... (init is unchanged)
@@ -107,7 +51,41 @@ class MyCanvas(QtOpenGLWidgets.QOpenGLWidget):
         self.m_temp_point = None
         self.m_currentMode = CanvasModes.FREE_MOVE
         self.setMouseTracking(True)
+        self.setFocusPolicy(Qt.StrongFocus) # Arrow keys move the selection
         self.m_hover_manager = HoverManager(pixel_box_size=10.0)
+        self.m_lod_manager = LODManager(pixel_tolerance=1.0)
+        self.m_shape_renderer = ShapeBatchRenderer(self.m_lod_manager, growing_group='unselected')
+        self.m_pick_manager = PickManager()
+        self.m_hover_manager.set_color_picker(
+            lambda pos, radius: self.m_pick_manager.pick(pos, self.get_view(), radius))
+        self.m_snap_manager = SnapManager()
+        self.m_snap_enabled = True
+        # --- NEW ---: Progressive loading (the view follows the drawing until the user pans or zooms)
+        self.m_load_manager = LoadManager()
+        self.m_fit_while_loading = False
+        self.m_simplify_graph = True # Collapse degree-2 chains after shattering
+        # --- NEW ---: Chord error allowed when curves are split for the graph
+        self.m_graph_tolerance: float = None # World units; None derives it from the selection
+        self.m_graph_relative_tolerance = 1e-4 # Of the selection's diagonal, while m_graph_tolerance is None
+        self.m_graph_curve_tolerance = 1e-3 # Of the smallest curve's diagonal, so no curve collapses
+        self.m_graph_epsilon = 1e-6 # Node merge distance
+        # --- NEW ---: Built regions are kept on disk for repeat builds (None: no cache)
+        self.m_region_cache: RegionCache = RegionCache()
+        # --- NEW ---: Crossings of unchanged shape pairs are reused across builds
+        self.m_intersection_cache = IntersectionCache()
+        self.m_trace_allocations = False # Report tracemalloc peaks of build_intersection_graph
+        self.m_face_fill_source = None # Model buffer the GL array was packed from
+        self.m_face_fill_array = None
+        # --- NEW ---: Rubber-band (drag rectangle) selection state
+        self.m_rubber_band_start: MyPoint = None
+        self.m_rubber_band_end: MyPoint = None
+        self.m_rubber_band_start_pix = (0.0, 0.0)
+        self.m_rubber_band_hits: list[Shape] = []
+        self.m_rubber_band_ctrl = False
+        self.m_rubber_band_min_pixels = 4.0 # Below this, a drag is a click
+        # --- NEW ---: Control point being dragged (SELECTION_MODE)
+        self.m_drag_shape: Shape = None
+        self.m_drag_index = -1
 
     def initializeGL(self):
         # ... (unchanged)
@@ -131,45 +109,48 @@ class MyCanvas(QtOpenGLWidgets.QOpenGLWidget):
         glLoadIdentity()
         if self.m_model is None: return
 
+        # --- NEW ---: A tiled drawing loads the tiles of the view, a few per frame
+        if isinstance(self.m_model, TiledModel):
+            if self.m_model.set_view_window(self.m_L, self.m_R, self.m_B, self.m_T):
+                self.update()
+            self.draw_unloaded_tiles()
+
         graph = self.m_model.get_graph()
-        selected_shapes = self.m_model.get_selected_shapes()
         glLineWidth(2.0)
 
-        # Draw unselected shapes
-        # ... (This logic is unchanged)
-        glColor3f(0.0, 0.0, 1.0) # Blue
-        for shape in self.m_model.getShapes():
-            if shape in selected_shapes:
-                continue 
-            glBegin(shape.get_gl_primitive())
-            for vtx in shape.get_tessellated_points():
-                glVertex2f(vtx.getX(), vtx.getY())
-            glEnd()
-            glPointSize(6.0)
-            glColor3f(1.0, 0.0, 0.0) # Red CPs
-            glBegin(GL_POINTS)
-            for p in shape.get_control_points():
-                glVertex2f(p.getX(), p.getY())
-            glEnd()
-            glColor3f(0.0, 0.0, 1.0) 
+        # --- NEW ---: Level-of-detail for the current zoom
+        world_per_pixel = self.get_world_units_per_pixel()
+
+        # --- MODIFIED ---: Draw unselected shapes as one batch (blue, red CPs)
+        # The shape being dragged is left out of both groups and drawn on its own,
+        # so each drag step only rebuilds that one shape's arrays
+        model = self.m_model
+        dragged = self.m_drag_shape
+        self.m_shape_renderer.draw('unselected',
+                                   lambda: [s for s in model.getShapes() if not model.is_selected(s) and s is not dragged],
+                                   world_per_pixel, (0.0, 0.0, 1.0), 2.0, (1.0, 0.0, 0.0), 6.0)
 
         # --- MODIFIED ---: Draw selected shapes OR graph + faces
         if graph:
             # --- NEW ---: Draw Found Faces
+            # --- MODIFIED ---: All faces in one draw call, from their cached triangles
             glColor4f(0.0, 0.8, 0.0, 0.3) # Semi-transparent green
-            for face in self.m_model.get_found_faces():
-                glBegin(face.get_gl_primitive())
-                for vtx in face.get_tessellated_points():
-                    glVertex2f(vtx.getX(), vtx.getY())
-                glEnd()
+            self.draw_face_fill_buffer()
+
+            # --- NEW ---: Selected faces get a stronger fill
+            glColor4f(0.0, 0.4, 1.0, 0.4) # Semi-transparent blue
+            for face in self.m_model.get_selected_faces():
+                self.draw_face_triangles(face)
 
             # 1. Draw Graph Edges
             glColor3f(0.0, 0.5, 0.0) # Dark Green
             glLineWidth(2.0)
             glBegin(GL_LINES)
             for edge in graph.get_edges():
-                glVertex2f(edge.n1.point.getX(), edge.n1.point.getY())
-                glVertex2f(edge.n2.point.getX(), edge.n2.point.getY())
+                edge_points = edge.get_polyline() # Compound edges carry their chain
+                for i in range(len(edge_points) - 1):
+                    glVertex2f(edge_points[i].getX(), edge_points[i].getY())
+                    glVertex2f(edge_points[i+1].getX(), edge_points[i+1].getY())
             glEnd()
             
             # 2. Draw Graph Nodes
@@ -181,25 +162,33 @@ class MyCanvas(QtOpenGLWidgets.QOpenGLWidget):
             glEnd()
         
         else:
-            # No graph, just draw selected shapes normally
-            # ... (This logic is unchanged)
-            glColor3f(0.0, 1.0, 0.0) # Green
-            glLineWidth(3.0) 
-            for shape in selected_shapes:
-                glBegin(shape.get_gl_primitive())
-                for vtx in shape.get_tessellated_points():
-                    glVertex2f(vtx.getX(), vtx.getY())
-                glEnd()
-                glPointSize(8.0)
-                glColor3f(1.0, 0.5, 0.0) # Orange CPs
-                glBegin(GL_POINTS)
-                for p in shape.get_control_points():
-                    glVertex2f(p.getX(), p.getY())
-                glEnd()
-                glColor3f(0.0, 1.0, 0.0) 
+            # No graph, just draw selected shapes normally (green, orange CPs)
+            self.m_shape_renderer.draw('selected',
+                                       lambda: [s for s in model.get_selected_shapes() if s is not dragged],
+                                       world_per_pixel, (0.0, 1.0, 0.0), 3.0, (1.0, 0.5, 0.0), 8.0)
+
+        if dragged is not None:
+            self.m_shape_renderer.draw('dragged', lambda: [dragged],
+                                       world_per_pixel, (0.0, 1.0, 0.0), 3.0, (1.0, 0.5, 0.0), 8.0)
         
         glLineWidth(2.0) 
 
+        # --- NEW ---: Boolean operation results (fill + outlines and holes)
+        boolean_results = self.m_model.get_boolean_results()
+        if boolean_results:
+            glColor4f(1.0, 0.6, 0.0, 0.35) # Semi-transparent orange
+            for polygon in boolean_results:
+                self.draw_face_triangles(polygon)
+            glColor3f(0.8, 0.3, 0.0)
+            glLineWidth(3.0)
+            for polygon in boolean_results:
+                for loop in [polygon.get_tessellated_points()] + polygon.get_holes():
+                    glBegin(GL_LINE_LOOP)
+                    for p in loop:
+                        glVertex2f(p.getX(), p.getY())
+                    glEnd()
+            glLineWidth(2.0)
+
         # --- Draw creation previews ---
         if self.m_temp_point and self.m_creating_shape_points:
             glPointSize(6.0)
@@ -211,9 +200,16 @@ class MyCanvas(QtOpenGLWidgets.QOpenGLWidget):
             glColor3f(0.5, 0.5, 0.5)
             self.draw_previews()
 
+        # --- Draw Snap Marker ---
+        if self.m_currentMode not in (CanvasModes.FREE_MOVE, CanvasModes.SELECTION_MODE):
+            self.draw_snap_marker()
+
         # --- Draw Hover Previews ---
         if self.m_currentMode == CanvasModes.SELECTION_MODE:
-            self.draw_hover_previews()
+            if self.m_rubber_band_start is not None:
+                self.draw_rubber_band()
+            else:
+                self.draw_hover_previews()
             
         # --- Draw Intersection Points (still useful for debugging) ---
         glPointSize(10.0)
@@ -223,6 +219,113 @@ class MyCanvas(QtOpenGLWidgets.QOpenGLWidget):
             glVertex2f(p.getX(), p.getY())
         glEnd()
 
+        # --- NEW ---: Shapes still waiting to be packed (e.g. while loading) go in the next frames
+        if self.m_shape_renderer.has_pending():
+            self.update()
+
+        # --- NEW ---: Color-ID pick buffer, only re-rendered after a view or model change
+        if self.m_currentMode == CanvasModes.SELECTION_MODE and \
+           self.m_hover_manager.get_pick_mode() == PickModes.COLOR_ID:
+            self.m_pick_manager.update(self.m_model, self.m_lod_manager, self.get_view(),
+                                       self.defaultFramebufferObject())
+
+    def draw_face_fill_buffer(self):
+        """Fills every found face with a single glDrawArrays call."""
+        buffer = self.m_model.get_face_fill_buffer()
+        if not buffer:
+            return
+        # Re-pack into a GL array only when the model rebuilt its buffer
+        if self.m_face_fill_source is not buffer:
+            self.m_face_fill_source = buffer
+            self.m_face_fill_array = (GLfloat * len(buffer))(*buffer)
+        glEnableClientState(GL_VERTEX_ARRAY)
+        glVertexPointer(2, GL_FLOAT, 0, self.m_face_fill_array)
+        glDrawArrays(GL_TRIANGLES, 0, len(buffer) // 2)
+        glDisableClientState(GL_VERTEX_ARRAY)
+
+    def draw_face_triangles(self, face: MyPolygon):
+        points = face.get_all_points()
+        glBegin(GL_TRIANGLES)
+        for tri in face.get_triangles():
+            for i in tri:
+                glVertex2f(points[i].getX(), points[i].getY())
+        glEnd()
+
+    # --- NEW ---
+    def draw_unloaded_tiles(self):
+        """Outlines the tiles of the view left out to stay within the memory budget."""
+        boxes = self.m_model.get_unloaded_tile_boxes()
+        if not boxes:
+            return
+        glColor3f(0.7, 0.7, 0.7) # Gray
+        glLineWidth(1.0)
+        for xmin, xmax, ymin, ymax in boxes:
+            glBegin(GL_LINE_LOOP)
+            glVertex2f(xmin, ymin)
+            glVertex2f(xmax, ymin)
+            glVertex2f(xmax, ymax)
+            glVertex2f(xmin, ymax)
+            glEnd()
+        glLineWidth(2.0)
+
+    # --- NEW ---
+    def draw_snap_marker(self):
+        """Square for endpoints/control points, X for intersections, diamond for nearest."""
+        snap_point = self.m_snap_manager.get_snap_point()
+        if snap_point is None:
+            return
+        kind = self.m_snap_manager.get_snap_kind()
+        r = 6.0 * self.get_world_units_per_pixel()
+        x, y = snap_point.getX(), snap_point.getY()
+        glColor3f(1.0, 0.5, 0.0) # Orange
+        if kind == SnapKinds.INTERSECTION:
+            glBegin(GL_LINES)
+            glVertex2f(x - r, y - r); glVertex2f(x + r, y + r)
+            glVertex2f(x - r, y + r); glVertex2f(x + r, y - r)
+            glEnd()
+        elif kind == SnapKinds.NEAREST:
+            glBegin(GL_LINE_LOOP)
+            glVertex2f(x, y - r); glVertex2f(x + r, y)
+            glVertex2f(x, y + r); glVertex2f(x - r, y)
+            glEnd()
+        else:
+            glBegin(GL_LINE_LOOP)
+            glVertex2f(x - r, y - r); glVertex2f(x + r, y - r)
+            glVertex2f(x + r, y + r); glVertex2f(x - r, y + r)
+            glEnd()
+
+    # --- NEW ---
+    def draw_rubber_band(self):
+        """Draws the drag rectangle and highlights the shapes it currently hits."""
+        world_per_pixel = self.get_world_units_per_pixel()
+        glColor3f(0.0, 0.8, 0.8) # Cyan
+        glLineWidth(3.0)
+        for shape in self.m_rubber_band_hits:
+            lod_points, is_sub_pixel = self.m_lod_manager.get_render_points(shape, world_per_pixel)
+            glBegin(GL_POINTS if is_sub_pixel else get_gl_primitive(shape))
+            for vtx in lod_points:
+                glVertex2f(vtx.getX(), vtx.getY())
+            glEnd()
+        glLineWidth(2.0)
+
+        # Window selection is drawn solid, crossing selection dashed
+        xmin, xmax, ymin, ymax = self.get_rubber_band_box()
+        crossing = self.is_rubber_band_crossing()
+        if crossing:
+            glColor3f(0.0, 0.6, 0.0) # Green
+            glLineStipple(1, 0xAAAA)
+            glEnable(GL_LINE_STIPPLE)
+        else:
+            glColor3f(0.0, 0.0, 0.8) # Blue
+        glBegin(GL_LINE_LOOP)
+        glVertex2f(xmin, ymin)
+        glVertex2f(xmax, ymin)
+        glVertex2f(xmax, ymax)
+        glVertex2f(xmin, ymax)
+        glEnd()
+        if crossing:
+            glDisable(GL_LINE_STIPPLE)
+
     def draw_hover_previews(self):
         # ... (unchanged)
         box_points = self.m_hover_manager.get_selection_box_points()
@@ -236,6 +339,17 @@ class MyCanvas(QtOpenGLWidgets.QOpenGLWidget):
             glEnd()
             glDisable(GL_LINE_STIPPLE)
 
+        # --- NEW ---: Outline the face under the mouse
+        hovered_face = self.m_hover_manager.get_hovered_face()
+        if hovered_face:
+            glColor3f(1.0, 0.0, 1.0) # Magenta
+            glLineWidth(3.0)
+            glBegin(GL_LINE_LOOP)
+            for p in hovered_face.get_tessellated_points():
+                glVertex2f(p.getX(), p.getY())
+            glEnd()
+            glLineWidth(2.0)
+
         hovered_shape = self.m_hover_manager.get_hovered_shape()
         if hovered_shape:
             closest_point = self.m_hover_manager.get_closest_point()
@@ -268,7 +382,7 @@ class MyCanvas(QtOpenGLWidgets.QOpenGLWidget):
             dy = self.m_temp_point.getY() - center.getY()
             radius = math.sqrt(dx**2 + dy**2)
             temp_circle = MyCircle(center, radius)
-            glBegin(temp_circle.get_gl_primitive())
+            glBegin(get_gl_primitive(temp_circle))
             for p in temp_circle.get_tessellated_points():
                 glVertex2f(p.getX(), p.getY())
             glEnd()
@@ -283,7 +397,7 @@ class MyCanvas(QtOpenGLWidgets.QOpenGLWidget):
                 p_start, p_end = self.m_creating_shape_points
                 p_on_arc = self.m_temp_point
                 temp_arc = MyCircleArc(p_start, p_end, p_on_arc)
-                glBegin(temp_arc.get_gl_primitive())
+                glBegin(get_gl_primitive(temp_arc))
                 for p in temp_arc.get_tessellated_points():
                     glVertex2f(p.getX(), p.getY())
                 glEnd()
@@ -305,7 +419,7 @@ class MyCanvas(QtOpenGLWidgets.QOpenGLWidget):
     
     def draw_dashed_preview(self, temp_curve):
         # ... (unchanged)
-        glBegin(temp_curve.get_gl_primitive())
+        glBegin(get_gl_primitive(temp_curve))
         for vtx in temp_curve.get_tessellated_points():
             glVertex2f(vtx.getX(), vtx.getY())
         glEnd()
@@ -337,25 +451,36 @@ class MyCanvas(QtOpenGLWidgets.QOpenGLWidget):
         if self.m_currentMode == CanvasModes.SELECTION_MODE:
             hovered_shape = self.m_hover_manager.get_hovered_shape()
             ctrl_pressed = event.modifiers() & Qt.ControlModifier
+
+            # --- NEW ---: A control point of a selected shape starts a drag
+            if not ctrl_pressed and self.start_control_point_drag(world_pos):
+                self.update()
+                return
             
             if hovered_shape:
                 if ctrl_pressed:
-                    if hovered_shape in self.m_model.get_selected_shapes():
+                    if self.m_model.is_selected(hovered_shape):
                         self.m_model.remove_from_selection(hovered_shape)
                     else:
                         self.m_model.add_to_selection(hovered_shape)
                 else:
-                    if hovered_shape not in self.m_model.get_selected_shapes():
+                    if not self.m_model.is_selected(hovered_shape):
                         self.m_model.clear_selection()
                         self.m_model.add_to_selection(hovered_shape)
             else:
-                if not ctrl_pressed:
-                    self.m_model.clear_selection()
+                # --- NEW ---: Empty space starts a rubber band; a plain click
+                # is resolved on release (see finish_rubber_band)
+                self.m_rubber_band_start = world_pos
+                self.m_rubber_band_end = world_pos
+                self.m_rubber_band_start_pix = (event.position().x(), event.position().y())
+                self.m_rubber_band_hits = []
+                self.m_rubber_band_ctrl = bool(ctrl_pressed)
+                self.m_hover_manager.clear()
             
             self.update()
             return
         
-        self.m_creating_shape_points.append(world_pos)
+        self.m_creating_shape_points.append(self.snap_world_pos(world_pos))
         self.finalize_shape()
         self.update()
 
@@ -392,7 +517,14 @@ class MyCanvas(QtOpenGLWidgets.QOpenGLWidget):
         
         if self.m_isPanning:
             self.panCanvas(event)
+
+        elif self.m_drag_shape is not None:
+            self.drag_control_point(world_pos)
             
+        elif self.m_rubber_band_start is not None:
+            self.update_rubber_band(world_pos, event.position())
+            self.update()
+
         elif self.m_currentMode == CanvasModes.SELECTION_MODE:
             self.m_hover_manager.update_hover(world_pos, self.m_model)
             self.m_temp_point = None 
@@ -400,9 +532,8 @@ class MyCanvas(QtOpenGLWidgets.QOpenGLWidget):
 
         elif self.m_currentMode != CanvasModes.FREE_MOVE: 
             self.m_hover_manager.clear() 
-            self.m_temp_point = world_pos 
-            if self.m_creating_shape_points:
-                 self.update()
+            self.m_temp_point = self.snap_world_pos(world_pos)
+            self.update() # Also redraws the snap marker
         else: 
             self.m_hover_manager.clear()
             self.m_temp_point = None
@@ -412,11 +543,262 @@ class MyCanvas(QtOpenGLWidgets.QOpenGLWidget):
         # ... (unchanged)
         if event.button() == Qt.MouseButton.LeftButton:
             self.m_isPanning = False
+            if self.m_drag_shape is not None:
+                self.end_control_point_drag()
+            if self.m_rubber_band_start is not None:
+                self.finish_rubber_band(self.screenToWorld(event.position()), event.position())
+
+    # --- NEW ---
+    def set_pick_mode(self, mode: PickModes):
+        self.m_hover_manager.set_pick_mode(mode)
+        self.update() # The ID buffer is rendered by the next paint
+
+    def get_view(self) -> tuple:
+        """(L, R, B, T, width, height) of the current world window and viewport."""
+        return (self.m_L, self.m_R, self.m_B, self.m_T, self.m_w, self.m_h)
+
+    # --- NEW ---
+    def set_graph_tolerance(self, tolerance: float):
+        """World-space chord error for graph building; None to derive it from the selection."""
+        self.m_graph_tolerance = tolerance
+
+    def get_graph_tolerance(self, shapes: list[Shape]) -> float:
+        """
+        The set tolerance, or one derived from the shapes alone (never the
+        zoom, so a selection always builds the same regions): a fraction of
+        their overall size, made finer if needed so the smallest curve keeps
+        its shape. None if the shapes have no size.
+        """
+        if self.m_graph_tolerance is not None:
+            return self.m_graph_tolerance
+        boxes = [shape.get_bounding_box() for shape in shapes]
+        if not boxes:
+            return None
+        diagonal = math.hypot(max(b[1] for b in boxes) - min(b[0] for b in boxes),
+                              max(b[3] for b in boxes) - min(b[2] for b in boxes))
+        tolerance = self.m_graph_relative_tolerance * diagonal
+        curve_sizes = [math.hypot(b[1] - b[0], b[3] - b[2]) for shape, b in zip(shapes, boxes)
+                       if isinstance(shape, CurveShape)]
+        curve_sizes = [size for size in curve_sizes if size > 0.0]
+        if curve_sizes:
+            tolerance = min(tolerance, self.m_graph_curve_tolerance * min(curve_sizes))
+        if tolerance <= 0.0:
+            return None
+        # Snapped down to a power of two, so a slightly different selection reuses cached builds
+        return 2.0 ** math.floor(math.log2(tolerance))
+
+    # --- NEW ---: Memory diagnostics
+    def set_trace_allocations(self, enabled: bool):
+        self.m_trace_allocations = enabled
+
+    def print_memory_report(self):
+        """Prints the approximate memory held by the model, the caches and the render batches."""
+        if self.m_model is None:
+            return
+        rows = memory_report(self.m_model, self.m_lod_manager, self.m_shape_renderer, self.m_intersection_cache)
+        print(format_memory_report(rows))
+
+    # --- NEW ---
+    def set_snap_enabled(self, enabled: bool):
+        self.m_snap_enabled = enabled
+        self.m_snap_manager.clear()
+        self.update()
+
+    def snap_world_pos(self, world_pos: MyPoint) -> MyPoint:
+        """Snaps a creation-mode position to nearby geometry, if enabled."""
+        if not self.m_snap_enabled or self.m_model is None:
+            self.m_snap_manager.clear()
+            return world_pos
+        # Same pixel tolerance as the hover box in SELECTION_MODE
+        tolerance = self.m_hover_manager.get_selection_box_world_size() / 2.0
+        return self.m_snap_manager.snap(world_pos, self.m_model, tolerance)
+
+    # --- NEW ---
+    def find_control_point_at(self, world_pos: MyPoint) -> (Shape, int):
+        """
+        Returns (shape, index) of the selected shape's control point nearest
+        to world_pos within the hover tolerance, or (None, -1).
+        """
+        tolerance = self.m_hover_manager.get_selection_box_world_size() / 2.0
+        if tolerance <= 0.0 or self.m_model is None:
+            return None, -1
+        mx, my = world_pos.getX(), world_pos.getY()
+        best_shape, best_index, best_dist_sq = None, -1, tolerance**2
+        # A Bezier's handles can lie outside its box: look the points up in the snap index
+        self.m_snap_manager.attach(self.m_model)
+        for shape, i in self.m_snap_manager.find_control_points(mx - tolerance, mx + tolerance, my - tolerance, my + tolerance):
+            if not self.m_model.is_selected(shape):
+                continue
+            p = shape.get_control_points()[i]
+            dist_sq = (p.getX() - mx)**2 + (p.getY() - my)**2
+            if dist_sq <= best_dist_sq:
+                best_shape, best_index, best_dist_sq = shape, i, dist_sq
+        return best_shape, best_index
+
+    def start_control_point_drag(self, world_pos: MyPoint) -> bool:
+        shape, index = self.find_control_point_at(world_pos)
+        if shape is None:
+            return False
+        self.m_drag_shape = shape
+        self.m_drag_index = index
+        self.m_hover_manager.clear()
+        self.m_shape_renderer.invalidate('selected') # Regroup once: the shape moves to its own batch
+        return True
+
+    def drag_control_point(self, world_pos: MyPoint):
+        """
+        Moves the dragged control point. Only that shape is re-tessellated;
+        the model updates its box and index entry, and observers (LOD, snap,
+        renderer) refresh just that shape. A graph built from it is dropped.
+        """
+        self.m_model.move_control_point(self.m_drag_shape, self.m_drag_index, world_pos.getX(), world_pos.getY())
+
+    def end_control_point_drag(self):
+        self.m_drag_shape = None
+        self.m_drag_index = -1
+        self.m_shape_renderer.invalidate('dragged')
+        self.m_shape_renderer.invalidate('selected') # Back into its group
+        self.update()
+
+    # --- NEW ---: Transforms of the selection
+    def get_selection_center(self) -> MyPoint:
+        """Center of the selected shapes' combined bounding box (None if nothing is selected)."""
+        index = self.m_model.get_shape_index()
+        boxes = [index.get_box(shape) for shape in self.m_model.get_selected_shapes()]
+        if not boxes:
+            return None
+        return MyPoint((min(b[0] for b in boxes) + max(b[1] for b in boxes)) / 2.0,
+                       (min(b[2] for b in boxes) + max(b[3] for b in boxes)) / 2.0)
+
+    def transform_selection(self, matrix: tuple):
+        """Applies an affine matrix (see MyTransforms) to every selected shape at once."""
+        if self.m_model is None or self.m_drag_shape is not None:
+            return
+        self.m_model.apply_transform(self.m_model.get_selected_shapes(), matrix)
+        self.m_hover_manager.clear()
+        self.update()
+
+    def move_selection(self, dx: float, dy: float):
+        self.transform_selection(translation(dx, dy))
+
+    def rotate_selection(self, degrees: float):
+        center = self.get_selection_center()
+        if center:
+            self.transform_selection(rotation(math.radians(degrees), center.getX(), center.getY()))
+
+    def scale_selection(self, factor: float):
+        center = self.get_selection_center()
+        if center:
+            self.transform_selection(scaling(factor, None, center.getX(), center.getY()))
+
+    def mirror_selection(self, horizontal: bool):
+        """Mirrors left-right (horizontal) or top-bottom, about the selection center."""
+        center = self.get_selection_center()
+        if center:
+            self.transform_selection(mirroring(math.pi / 2.0 if horizontal else 0.0, center.getX(), center.getY()))
+
+    def keyPressEvent(self, event: QKeyEvent):
+        # Arrow keys nudge the selection by 10 pixels (1 pixel with Shift)
+        steps = {Qt.Key_Left: (-1, 0), Qt.Key_Right: (1, 0), Qt.Key_Up: (0, 1), Qt.Key_Down: (0, -1)}
+        step = steps.get(event.key())
+        if step is None or self.m_currentMode != CanvasModes.SELECTION_MODE or self.m_model is None \
+           or self.m_model.get_selection_count() == 0:
+            super().keyPressEvent(event)
+            return
+        pixels = 1.0 if event.modifiers() & Qt.ShiftModifier else 10.0
+        distance = pixels * self.get_world_units_per_pixel()
+        self.move_selection(step[0] * distance, step[1] * distance)
+
+    # --- NEW ---
+    def is_rubber_band_dragged(self, pos: QPointF) -> bool:
+        sx, sy = self.m_rubber_band_start_pix
+        return max(abs(pos.x() - sx), abs(pos.y() - sy)) >= self.m_rubber_band_min_pixels
+
+    def is_rubber_band_crossing(self) -> bool:
+        """Dragging right-to-left selects by crossing, left-to-right by window."""
+        return self.m_rubber_band_end.getX() < self.m_rubber_band_start.getX()
+
+    def get_rubber_band_box(self):
+        p0, p1 = self.m_rubber_band_start, self.m_rubber_band_end
+        return (min(p0.getX(), p1.getX()), max(p0.getX(), p1.getX()),
+                min(p0.getY(), p1.getY()), max(p0.getY(), p1.getY()))
+
+    def update_rubber_band(self, world_pos: MyPoint, pos: QPointF):
+        """
+        Moves the band corner and refreshes the live set of hit shapes
+        (of a tiled model, only those in loaded tiles: see finish_rubber_band).
+        """
+        self.m_rubber_band_end = world_pos
+        if not self.is_rubber_band_dragged(pos):
+            self.m_rubber_band_hits = []
+            return
+        xmin, xmax, ymin, ymax = self.get_rubber_band_box()
+        self.m_rubber_band_hits = self.m_model.query_shapes_in_box(
+            xmin, xmax, ymin, ymax, crossing=self.is_rubber_band_crossing())
+
+    def finish_rubber_band(self, world_pos: MyPoint, pos: QPointF):
+        """Applies the rubber band selection, or handles a plain click."""
+        ctrl_pressed = self.m_rubber_band_ctrl
+
+        if self.is_rubber_band_dragged(pos):
+            box = self.get_rubber_band_box()
+            missing = self.m_model.get_missing_tiles_in_box(*box) if isinstance(self.m_model, TiledModel) else []
+            if missing and not self.m_load_manager.is_loading():
+                self.select_in_tiles(missing, box, self.is_rubber_band_crossing(), ctrl_pressed)
+            else:
+                if not ctrl_pressed:
+                    self.m_model.clear_selection()
+                for shape in self.m_rubber_band_hits:
+                    self.m_model.add_to_selection(shape)
+        else:
+            # Click inside a found face selects the face
+            hovered_face = self.m_model.find_face_at(world_pos)
+            if hovered_face:
+                if ctrl_pressed:
+                    if hovered_face in self.m_model.get_selected_faces():
+                        self.m_model.remove_face_from_selection(hovered_face)
+                    else:
+                        self.m_model.add_face_to_selection(hovered_face)
+                else:
+                    self.m_model.clear_face_selection()
+                    self.m_model.add_face_to_selection(hovered_face)
+            elif not ctrl_pressed:
+                self.m_model.clear_selection()
+
+        self.m_rubber_band_start = None
+        self.m_rubber_band_end = None
+        self.m_rubber_band_hits = []
+        self.m_hover_manager.update_hover(world_pos, self.m_model)
+        self.update()
+
+    def select_in_tiles(self, keys: list[tuple], box: tuple, crossing: bool, add: bool):
+        """
+        Rubber band selection over tiles that aren't loaded: the background
+        loader reads them, then the band's shapes are selected.
+        """
+        model = self.m_model
+        def on_finished(shapes_loaded: int, error: str):
+            if error or self.m_model is not model:
+                return
+            model.ensure_tiles_in_box(*box) # Any evicted while the others were read
+            if not add:
+                model.clear_selection()
+            for shape in model.query_shapes_in_box(*box, crossing=crossing):
+                model.add_to_selection(shape)
+            print(f"Selected {model.get_selection_count()} shapes")
+            self.update()
+        print(f"Loading {len(keys)} tiles for the selection...")
+        self.m_load_manager.start_tiles(model, keys, on_finished=on_finished)
 
     def changeCanvasMode(self, mode: CanvasModes):
         # --- MODIFIED ---
         self.m_currentMode = mode
         self.clearCreationState() 
+        self.m_rubber_band_start = None
+        self.m_rubber_band_hits = []
+        self.m_drag_shape = None
+        self.m_drag_index = -1
+        self.m_snap_manager.clear()
         
         if mode != CanvasModes.SELECTION_MODE:
             self.m_hover_manager.clear()
@@ -437,8 +819,37 @@ class MyCanvas(QtOpenGLWidgets.QOpenGLWidget):
         self.update()
 
     def setModel(self, _model: MyModel):
-        # ... (unchanged)
+        # --- MODIFIED ---: Follow the model's changes instead of rescanning it
+        if self.m_model is not None:
+            self.m_model.unsubscribe(self.on_model_event)
+            self.m_model.unsubscribe(self.m_lod_manager.on_model_event)
+            self.m_model.unsubscribe(self.m_shape_renderer.on_model_event)
+            self.m_model.unsubscribe(self.m_pick_manager.on_model_event)
         self.m_model = _model
+        self.m_lod_manager.clear()
+        self.m_shape_renderer.invalidate()
+        self.m_pick_manager.invalidate()
+        self.m_snap_manager.attach(_model)
+        if _model is not None:
+            _model.subscribe(self.m_lod_manager.on_model_event) # Before the renderer, which reads it
+            _model.subscribe(self.m_shape_renderer.on_model_event)
+            self.m_shape_renderer.set_selection_groups('selected', 'unselected', _model.is_selected)
+            _model.subscribe(self.m_pick_manager.on_model_event)
+            _model.subscribe(self.on_model_event)
+
+    # --- NEW ---
+    def on_model_event(self, event: ModelEvents, shapes: list[Shape]):
+        """Model observer: drops stale hover state and schedules a repaint."""
+        if event in (ModelEvents.SHAPES_REMOVED, ModelEvents.CLEARED):
+            hovered = self.m_hover_manager.get_hovered_shape()
+            if event == ModelEvents.CLEARED or hovered in shapes:
+                self.m_hover_manager.clear()
+            if event == ModelEvents.CLEARED or self.m_drag_shape in shapes:
+                self.m_drag_shape = None
+                self.m_drag_index = -1
+            self.m_rubber_band_hits = [s for s in self.m_rubber_band_hits if s not in shapes] \
+                if event == ModelEvents.SHAPES_REMOVED else []
+        self.update()
 
     def fitWorldToViewport(self):
         # ... (unchanged)
@@ -452,7 +863,10 @@ class MyCanvas(QtOpenGLWidgets.QOpenGLWidget):
 
     def clearCanvas(self):
         # ... (unchanged)
-        if self.m_model: self.m_model.clear()
+        self.m_load_manager.cancel()
+        if isinstance(self.m_model, TiledModel):
+            self.replace_model(MyModel()) # Clearing must not empty the tiled file
+        elif self.m_model: self.m_model.clear() # Observers (LOD, snap index) reset themselves
         self.fitWorldToViewport() 
         self.update_selection_box_size()
         self.update()
@@ -502,14 +916,88 @@ class MyCanvas(QtOpenGLWidgets.QOpenGLWidget):
         self.m_B -= dy_world
         self.m_T -= dy_world
         self.m_panStartX, self.m_panStartY = endX, endY
+        self.m_fit_while_loading = False
         self.update_selection_box_size()
         self.update()
 
     def wheelEvent(self, event: QWheelEvent):
         # ... (unchanged)
         zoom_factor = 1.1 if event.angleDelta().y() < 0 else 1 / 1.1
+        self.m_fit_while_loading = False
         self.scaleWorldWindow(zoom_factor)
 
+    # --- NEW ---: Files
+    def open_file(self, path: str):
+        """
+        Replaces the drawing with the one in path. Shapes appear chunk by
+        chunk while a background worker reads the rest of the file; the
+        canvas stays interactive meanwhile.
+        """
+        if self.m_model is None:
+            return
+        if path.endswith(TILES_EXTENSION):
+            self.open_tiled_file(path)
+            return
+        self.m_load_manager.cancel()
+        self.changeCanvasMode(self.m_currentMode) # Drops creation and drag state
+        if isinstance(self.m_model, TiledModel):
+            self.replace_model(MyModel())
+        self.m_model.clear()
+        self.m_fit_while_loading = True
+        self.m_load_manager.start(path, self.m_model, on_chunk=self.on_load_progress,
+                                  on_finished=self.on_load_finished)
+
+    def open_tiled_file(self, path: str):
+        """
+        Opens a tiled drawing (see MyTileStore) in place of the model. Only
+        the tiles around the view are loaded, as the view pans and zooms.
+        """
+        self.m_load_manager.cancel()
+        self.changeCanvasMode(self.m_currentMode)
+        try:
+            store = TileStore(path)
+        except ValueError as e:
+            print(f"Could not open {path}: {e}")
+            return
+        self.replace_model(TiledModel(store))
+        print(f"Opened {path}: {store.get_shape_count()} shapes in {len(store.get_tile_keys())} tiles")
+        self.fitWorldToViewport()
+
+    def replace_model(self, model: MyModel):
+        """Switches to another model, writing back and closing a tiled one."""
+        if isinstance(self.m_model, TiledModel):
+            self.m_model.close()
+        self.setModel(model)
+        self.update()
+
+    def on_load_progress(self, shapes_loaded: int):
+        if self.m_fit_while_loading:
+            self.fitWorldToViewport() # From the model's incrementally grown extents
+        else:
+            self.update()
+
+    def on_load_finished(self, shapes_loaded: int, error: str):
+        self.on_load_progress(shapes_loaded)
+        self.m_fit_while_loading = False
+
+    def save_file(self, path: str):
+        if self.m_model is None:
+            return
+        if isinstance(self.m_model, TiledModel) and path == self.m_model.get_store().get_path():
+            self.m_model.flush()
+            print(f"Saved {path}")
+            return
+        if path.endswith(TILES_EXTENSION):
+            if isinstance(self.m_model, TiledModel): # Tile by tile, never all in memory
+                store = build_tile_store(path, self.m_model.iter_tiles(), self.m_model.get_store().get_tile_size())
+            else:
+                store = save_tiled(path, self.m_model.getShapes())
+            print(f"Saved {store.get_shape_count()} shapes to {path} ({len(store.get_tile_keys())} tiles)")
+            store.close()
+            return
+        count = save_shapes(path, self.m_model.iter_all_shapes())
+        print(f"Saved {count} shapes to {path}")
+
     def build_intersection_graph(self):
         """Finds intersections, shatters segments, and builds the planar graph."""
         if self.m_model is None:
@@ -525,132 +1013,91 @@ class MyCanvas(QtOpenGLWidgets.QOpenGLWidget):
             self.update()
             return
 
-        graph = MyGraph()
-        raw_intersection_points = []
-        all_segments = []
+        # --- NEW ---: With allocation tracing on, the build's peak memory is reported per phase
+        with AllocationTracer("build_intersection_graph", enabled=self.m_trace_allocations) as tracer:
+            self._build_regions(selected_shapes, self.get_graph_tolerance(selected_shapes), tracer)
+        self.update()
 
-        # 1. Get all segments from all selected shapes
-        # ... (this logic is unchanged)
-        for shape in selected_shapes:
-            points = shape.get_tessellated_points()
-            if not points:
-                continue
-            is_loop = (shape.get_gl_primitive() == GL_LINE_LOOP)
-            for i in range(len(points) - 1):
-                all_segments.append( (points[i], points[i+1], shape) )
-            if is_loop and len(points) > 1:
-                all_segments.append( (points[-1], points[0], shape) )
+    def _build_regions(self, selected_shapes: list[Shape], tolerance: float, tracer: AllocationTracer):
+        # --- NEW ---: A repeat build of the same geometry comes from the region cache
+        start = time.perf_counter()
+        with tracer.phase("region cache lookup"):
+            key = region_key(selected_shapes, self.m_graph_epsilon, tolerance, self.m_simplify_graph)
+            cached = self.m_region_cache.load(key) if self.m_region_cache else None
+        if cached is not None:
+            graph, raw_intersection_points, faces, parents = cached
+            print(f"Regions loaded from cache in {(time.perf_counter() - start) * 1000.0:.1f} ms: "
+                  f"{len(graph.get_nodes())} nodes, {len(graph.get_edges())} edges.")
+            self.m_model.set_graph(graph)
+            self.m_model.set_intersection_points(raw_intersection_points)
+            self.add_regions(faces, parents)
+            return
 
-        # 2. Find all intersection points
-        # ... (this logic is unchanged)
-        for i in range(len(all_segments)):
-            for j in range(i + 1, len(all_segments)):
-                p1, p2, shape1 = all_segments[i]
-                p3, p4, shape2 = all_segments[j]
-                if shape1 == shape2:
-                    continue 
-                intersection_pt = find_segment_intersection(p1, p2, p3, p4)
-                if intersection_pt:
-                    raw_intersection_points.append(intersection_pt)
-        
-        # 3. Create graph nodes
-        # ... (this logic is unchanged)
-        for p1, p2, shape in all_segments:
-            graph.add_node(p1)
-            graph.add_node(p2)
-        for pt in raw_intersection_points:
-            graph.add_node(pt)
+        stats = self.m_intersection_cache.get_stats()
+        with tracer.phase("build_graph"):
+            graph, raw_intersection_points = build_graph(
+                selected_shapes, self.m_graph_epsilon, simplify_chains=self.m_simplify_graph, tolerance=tolerance,
+                cache=self.m_intersection_cache)
+        reused = self.m_intersection_cache.get_stats()['hits'] - stats['hits']
+        computed = self.m_intersection_cache.get_stats()['misses'] - stats['misses']
 
-        # 4. Create shattered edges
-        # ... (this logic is unchanged)
-        for p1, p2, shape in all_segments:
-            p1_node = graph.find_node_at(p1)
-            p2_node = graph.find_node_at(p2)
-            nodes_on_segment = []
-            for node in graph.get_nodes():
-                if node == p1_node or node == p2_node:
-                    continue
-                if point_on_segment(node.point, p1, p2):
-                    dist = dist_sq(p1_node.point, node.point)
-                    nodes_on_segment.append((dist, node))
-            nodes_on_segment.sort(key=lambda x: x[0])
-            current_node = p1_node
-            for dist, next_node in nodes_on_segment:
-                graph.add_edge(current_node, next_node)
-                current_node = next_node
-            graph.add_edge(current_node, p2_node)
-
-        print(f"Graph built: {len(graph.get_nodes())} nodes, {len(graph.get_edges())} edges.")
+        print(f"Graph built: {len(graph.get_nodes())} nodes, {len(graph.get_edges())} edges (tolerance {tolerance or 0.0:.3g}; "
+              f"{reused} shape pairs reused, {computed} computed).")
         self.m_model.set_graph(graph)
         self.m_model.set_intersection_points(raw_intersection_points)
         
         # --- NEW ---: Call face finding
-        self.find_regions_from_graph(graph)
-        
-        self.update()
+        with tracer.phase("find faces"):
+            faces, parents = self.find_regions_from_graph(graph)
+        if self.m_region_cache:
+            with tracer.phase("region cache store"):
+                self.m_region_cache.store(key, graph, raw_intersection_points, faces, parents)
 
-    def find_regions_from_graph(self, graph: MyGraph):
-        """Traverses the graph to find all closed faces."""
+    def find_regions_from_graph(self, graph: MyGraph) -> (list[MyPolygon], list[int]):
+        """
+        Traverses the graph to find all closed faces. Outer boundaries are
+        dropped; components nested inside a face become holes of it, and
+        the faces are stored in the model as a tree. Returns (faces, parents).
+        """
         if graph is None:
-            return
+            return [], []
 
-        graph.reset_visited_flags()
-        max_nodes_per_face = len(graph.get_nodes()) + 1
-        found_faces_count = 0
-
-        for start_edge in graph.get_edges():
-            # Try tracing from n1 -> n2
-            if not start_edge.visited_forward:
-                face_nodes = self._trace_face(start_edge, start_edge.n1, max_nodes_per_face)
-                if face_nodes:
-                    face_points = [node.point for node in face_nodes]
-                    self.m_model.add_found_face(MyPolygon(face_points))
-                    found_faces_count += 1
-            
-            # Try tracing from n2 -> n1
-            if not start_edge.visited_backward:
-                face_nodes = self._trace_face(start_edge, start_edge.n2, max_nodes_per_face)
-                if face_nodes:
-                    face_points = [node.point for node in face_nodes]
-                    self.m_model.add_found_face(MyPolygon(face_points))
-                    found_faces_count += 1
-        
-        print(f"Found {found_faces_count} faces.")
+        faces, parents = find_faces(graph)
+        self.add_regions(faces, parents)
+        return faces, parents
+
+    def add_regions(self, faces: list[MyPolygon], parents: list[int]):
+        """Stores faces in the model; parents[i] is the index of the face enclosing face i, or None."""
+        for face, parent in zip(faces, parents):
+            self.m_model.add_found_face(face, faces[parent] if parent is not None else None)
+
+        self.m_model.build_face_index()
+        num_nested = sum(1 for parent in parents if parent is not None)
+        print(f"Found {len(faces)} faces ({num_nested} nested).")
 
-    def _trace_face(self, start_edge: GraphEdge, start_node: GraphNode, max_nodes: int) -> list[GraphNode]:
+    # --- NEW ---
+    def run_boolean_operation(self, op: BooleanOps):
         """
-        Traces a single face (loop) in the graph using clockwise edge sorting.
-        Returns a list of nodes in the face, or None if no face is found.
+        Union/intersection/difference/XOR of the selected faces or, if no
+        face is selected, of the selected closed shapes. Works on the faces
+        of the current arrangement (building it first if needed).
         """
-        current_edge = start_edge
-        current_node = start_node
-        
-        face_nodes = []
-        
-        for _ in range(max_nodes): # Safety break
-            # 1. Mark edge as visited from the node we're leaving
-            if current_edge.was_visited_from(current_node):
-                return None # This path was already part of another face
-            current_edge.set_visited(current_node)
-
-            # 2. Move to the next node
-            current_node = current_edge.get_other_node(current_node)
-            face_nodes.append(current_node)
-
-            # 3. Check if we're back at the start
-            if current_node == start_node:
-                if len(face_nodes) > 2: # A valid face must have at least 3 nodes
-                    return face_nodes
-                else:
-                    return None # Not a valid face (e.g., a line)
+        if self.m_model is None:
+            return
 
-            # 4. Find the next edge to take
-            sorted_edges = current_node.get_sorted_edges(incoming_edge=current_edge)
-            
-            if not sorted_edges:
-                return None # Dead end (dangling edge)
-            
-            # 5. Take the first clockwise edge
-            current_edge = sorted_edges[0]
-            
-        return None # Loop ran too long, likely an error
\ No newline at end of file
+        operands = list(self.m_model.get_selected_faces())
+        if not operands:
+            operands = [s for s in self.m_model.get_selected_shapes() if s.is_closed()]
+            if not operands:
+                print("Select closed shapes or found faces for a boolean operation.")
+                return
+            if self.m_model.get_graph() is None:
+                self.build_intersection_graph()
+
+        graph = self.m_model.get_graph()
+        results = compute_boolean(self.m_model.get_found_faces(), operands, op,
+                                  graph.tolerance if graph is not None else None)
+        self.m_model.set_boolean_results(results)
+        num_holes = sum(len(r.get_holes()) for r in results)
+        print(f"{op.name}: {len(results)} polygons, {num_holes} holes.")
+        self.update()
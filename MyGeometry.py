@@ -1,6 +1,77 @@
 # MyGeometry.py
 from MyShapes import MyPoint
 import math # --- NEW ---
+from fractions import Fraction
+from functools import cmp_to_key
+
+# --- NEW ---: Robust predicates
+# Error bound of the floating-point orientation determinant (Shewchuk's
+# ccwerrboundA): when |det| exceeds it, the sign of the float result is exact.
+_EPSILON = 2.0 ** -53
+_ORIENT_ERRBOUND = (3.0 + 16.0 * _EPSILON) * _EPSILON
+
+def _orient2d(ax: float, ay: float, bx: float, by: float, cx: float, cy: float) -> float:
+    """
+    Orientation of c relative to the line a->b: positive if a, b, c turn
+    counter-clockwise, negative if clockwise, zero if collinear.
+    The sign is always exact. Clear-cut cases cost one float determinant;
+    only when the error filter is uncertain is exact rational arithmetic
+    used (then just -1.0, 0.0 or 1.0 is returned).
+    """
+    detleft = (ax - cx) * (by - cy)
+    detright = (ay - cy) * (bx - cx)
+    det = detleft - detright
+    errbound = _ORIENT_ERRBOUND * (abs(detleft) + abs(detright))
+    if det > errbound or -det > errbound or errbound == 0.0:
+        return det
+
+    exact = (Fraction(ax) - Fraction(cx)) * (Fraction(by) - Fraction(cy)) - \
+            (Fraction(ay) - Fraction(cy)) * (Fraction(bx) - Fraction(cx))
+    return float((exact > 0) - (exact < 0))
+
+def orient2d(a: MyPoint, b: MyPoint, c: MyPoint) -> int:
+    """Exact orientation test: 1 if a, b, c are counter-clockwise, -1 if clockwise, 0 if collinear."""
+    det = _orient2d(a.getX(), a.getY(), b.getX(), b.getY(), c.getX(), c.getY())
+    return (det > 0.0) - (det < 0.0)
+
+def sort_clockwise(origin: MyPoint, ref: MyPoint, points: list[MyPoint]) -> list[int]:
+    """
+    Orders points by the clockwise angle swept from the direction origin->ref
+    to origin->point, in (0, 2*pi]: a point in the ref direction comes last.
+    With ref=None the reference direction is -x.
+    Exact orientation tests are used instead of atan2, so nearly parallel
+    directions always get the same, consistent order. Returns indices.
+    """
+    ox, oy = origin.getX(), origin.getY()
+
+    def half(p: MyPoint) -> int:
+        # 0: clockwise of ref (0, pi), 1: opposite (pi), 2: (pi, 2*pi), 3: along ref (2*pi)
+        px, py = p.getX(), p.getY()
+        if ref is None:
+            side = oy - py # Cross product of (-1, 0) with p - origin
+            along = px < ox
+        else:
+            rx, ry = ref.getX(), ref.getY()
+            side = _orient2d(ox, oy, rx, ry, px, py)
+            along = (rx - ox) * (px - ox) + (ry - oy) * (py - oy) > 0.0
+        if side < 0.0:
+            return 0
+        if side > 0.0:
+            return 2
+        return 3 if along else 1
+
+    halves = [half(p) for p in points]
+
+    def compare(i: int, j: int) -> int:
+        if halves[i] != halves[j]:
+            return halves[i] - halves[j]
+        if halves[i] in (1, 3):
+            return 0
+        # Same open half-plane: i comes first if j is further clockwise
+        det = _orient2d(ox, oy, points[i].getX(), points[i].getY(), points[j].getX(), points[j].getY())
+        return (det > 0.0) - (det < 0.0)
+
+    return sorted(range(len(points)), key=cmp_to_key(compare))
 
 # --- NEW ---
 def dist_sq(p1: MyPoint, p2: MyPoint) -> float:
@@ -15,48 +86,299 @@ def get_angle(p1: MyPoint, p2: MyPoint) -> float:
 
 # --- NEW ---
 def point_on_segment(p: MyPoint, p1: MyPoint, p2: MyPoint, epsilon=1e-6) -> bool:
-    """Checks if a point p lies on the line segment p1-p2."""
+    """
+    Checks if a point p lies on the line segment p1-p2.
+    With epsilon > 0, p may be up to epsilon away (a distance, so the test
+    doesn't depend on the segment's length); epsilon=0 gives an exact test.
+    """
     x, y = p.getX(), p.getY()
     x1, y1 = p1.getX(), p1.getY()
     x2, y2 = p2.getX(), p2.getY()
 
+    if epsilon > 0.0:
+        return _segment_dist_sq(x, y, x1, y1, x2, y2) <= epsilon * epsilon
+
     # 1. Check if p is collinear with p1 and p2
-    #    (y - y1) * (x2 - x1) == (y2 - y1) * (x - x1)
-    cross_product = (y - y1) * (x2 - x1) - (y2 - y1) * (x - x1)
-    if abs(cross_product) > epsilon:
+    if _orient2d(x1, y1, x2, y2, x, y) != 0.0:
         return False # Not collinear
 
     # 2. Check if p is within the bounding box of the segment
-    xmin, xmax = min(x1, x2), max(x1, x2)
-    ymin, ymax = min(y1, y2), max(y1, y2)
-    
-    on_bbox = (xmin - epsilon <= x <= xmax + epsilon) and \
-              (ymin - epsilon <= y <= ymax + epsilon)
-
-    return on_bbox
+    return min(x1, x2) <= x <= max(x1, x2) and min(y1, y2) <= y <= max(y1, y2)
 
 
-def find_segment_intersection(p1: MyPoint, p2: MyPoint, p3: MyPoint, p4: MyPoint) -> MyPoint:
-    # ... (this function is unchanged)
+def find_segment_intersection_params(p1: MyPoint, p2: MyPoint, p3: MyPoint, p4: MyPoint) -> (float, float):
+    """
+    Like find_segment_intersection, but returns the parameters (t, u) of the
+    crossing along p1-p2 and p3-p4, or None. Parallel segments return None.
+    Whether the segments meet is decided with exact orientation tests, so
+    nearly parallel or touching segments are never dropped by a tolerance.
+    """
     x1, y1 = p1.getX(), p1.getY()
     x2, y2 = p2.getX(), p2.getY()
     x3, y3 = p3.getX(), p3.getY()
     x4, y4 = p4.getX(), p4.getY()
 
+    # 1. Each segment's endpoints must not be strictly on one side of the other
+    o1 = _orient2d(x1, y1, x2, y2, x3, y3)
+    o2 = _orient2d(x1, y1, x2, y2, x4, y4)
+    if (o1 > 0.0 and o2 > 0.0) or (o1 < 0.0 and o2 < 0.0):
+        return None
+    o3 = _orient2d(x3, y3, x4, y4, x1, y1)
+    o4 = _orient2d(x3, y3, x4, y4, x2, y2)
+    if (o3 > 0.0 and o4 > 0.0) or (o3 < 0.0 and o4 < 0.0):
+        return None
+    if (o1 == 0.0 and o2 == 0.0) or (o3 == 0.0 and o4 == 0.0):
+        return None # Collinear or degenerate: overlaps are handled separately
+
+    # 2. They meet, so the directions aren't parallel: compute where
     den = (x1 - x2) * (y3 - y4) - (y1 - y2) * (x3 - x4)
+    if den != 0.0:
+        t = ((x1 - x3) * (y3 - y4) - (y1 - y3) * (x3 - x4)) / den
+        u = -((x1 - x2) * (y1 - y3) - (y1 - y2) * (x1 - x3)) / den
+    else: # Underflow: fall back to exact arithmetic
+        x1, y1, x2, y2, x3, y3, x4, y4 = map(Fraction, (x1, y1, x2, y2, x3, y3, x4, y4))
+        den = (x1 - x2) * (y3 - y4) - (y1 - y2) * (x3 - x4)
+        t = float(((x1 - x3) * (y3 - y4) - (y1 - y3) * (x3 - x4)) / den)
+        u = float(-((x1 - x2) * (y1 - y3) - (y1 - y2) * (x1 - x3)) / den)
+
+    # Rounding can put a touching crossing just outside the segment
+    return min(1.0, max(0.0, t)), min(1.0, max(0.0, u))
 
-    if abs(den) < 1e-8:
+def find_segment_intersection(p1: MyPoint, p2: MyPoint, p3: MyPoint, p4: MyPoint) -> MyPoint:
+    """Returns the crossing point of segments p1-p2 and p3-p4, or None."""
+    params = find_segment_intersection_params(p1, p2, p3, p4)
+    if params is None:
         return None
+    t = params[0]
+    x1, y1 = p1.getX(), p1.getY()
+    return MyPoint(x1 + t * (p2.getX() - x1), y1 + t * (p2.getY() - y1))
+
+def _segment_dist_sq(px: float, py: float, x1: float, y1: float, x2: float, y2: float) -> float:
+    """Squared distance from (px, py) to the segment (x1, y1)-(x2, y2), on raw coordinates."""
+    dx = x2 - x1
+    dy = y2 - y1
+    l2 = dx * dx + dy * dy
+    if l2 == 0.0:
+        return (px - x1)**2 + (py - y1)**2
+    t = ((px - x1) * dx + (py - y1) * dy) / l2
+    t = max(0.0, min(1.0, t))
+    return (px - (x1 + t * dx))**2 + (py - (y1 + t * dy))**2
+
+def simplify_polyline(points: list[MyPoint], tolerance: float) -> list[MyPoint]:
+    """
+    Simplifies a polyline with the Douglas-Peucker algorithm.
+    Every dropped vertex lies within 'tolerance' of the returned polyline.
+    The first and last points are always kept (closed loops stay closed).
+    """
+    n = len(points)
+    if n < 3 or tolerance <= 0.0:
+        return list(points)
+
+    tol_sq = tolerance * tolerance
+    keep = [False] * n
+    keep[0] = keep[-1] = True
+
+    # Iterative version, so long polylines can't hit the recursion limit
+    stack = [(0, n - 1)]
+    while stack:
+        first, last = stack.pop()
+        if last - first < 2:
+            continue
+        x1, y1 = points[first].getX(), points[first].getY()
+        x2, y2 = points[last].getX(), points[last].getY()
 
-    t_num = (x1 - x3) * (y3 - y4) - (y1 - y3) * (x3 - x4)
-    u_num = -((x1 - x2) * (y1 - y3) - (y1 - y2) * (x1 - x3))
+        max_dist_sq = -1.0
+        max_index = first
+        for i in range(first + 1, last):
+            d = _segment_dist_sq(points[i].getX(), points[i].getY(), x1, y1, x2, y2)
+            if d > max_dist_sq:
+                max_dist_sq = d
+                max_index = i
 
-    t = t_num / den
-    u = u_num / den
+        if max_dist_sq > tol_sq:
+            keep[max_index] = True
+            stack.append((first, max_index))
+            stack.append((max_index, last))
 
-    if 0.0 <= t <= 1.0 and 0.0 <= u <= 1.0:
-        ix = x1 + t * (x2 - x1)
-        iy = y1 + t * (y2 - y1)
-        return MyPoint(ix, iy)
+    return [p for p, k in zip(points, keep) if k]
 
-    return None
\ No newline at end of file
+def point_in_polygon(p: MyPoint, polygon: list[MyPoint]) -> bool:
+    """
+    Checks if point p lies inside a closed polygon using the winding number.
+    The polygon may be given in either orientation; the closing edge is implicit.
+    """
+    x, y = p.getX(), p.getY()
+    n = len(polygon)
+    if n < 3:
+        return False
+
+    winding = 0
+    for i in range(n):
+        a = polygon[i]
+        b = polygon[(i + 1) % n]
+        ax, ay = a.getX(), a.getY()
+        bx, by = b.getX(), b.getY()
+        is_left = _orient2d(ax, ay, bx, by, x, y)
+        if ay <= y:
+            if by > y and is_left > 0: # Upward crossing, p left of edge
+                winding += 1
+        elif by <= y and is_left < 0:  # Downward crossing, p right of edge
+            winding -= 1
+    return winding != 0
+
+def _point_in_triangle(px, py, ax, ay, bx, by, cx, cy) -> bool:
+    """Inclusive point-in-triangle test for a counter-clockwise triangle."""
+    return (_orient2d(ax, ay, bx, by, px, py) >= 0.0 and
+            _orient2d(bx, by, cx, cy, px, py) >= 0.0 and
+            _orient2d(cx, cy, ax, ay, px, py) >= 0.0)
+
+def _segments_cross(ax, ay, bx, by, cx, cy, dx, dy) -> bool:
+    """True if segments a-b and c-d properly cross (touching does not count)."""
+    d1 = _orient2d(ax, ay, bx, by, cx, cy)
+    d2 = _orient2d(ax, ay, bx, by, dx, dy)
+    d3 = _orient2d(cx, cy, dx, dy, ax, ay)
+    d4 = _orient2d(cx, cy, dx, dy, bx, by)
+    return ((d1 > 0.0 and d2 < 0.0) or (d1 < 0.0 and d2 > 0.0)) and \
+           ((d3 > 0.0 and d4 < 0.0) or (d3 < 0.0 and d4 > 0.0))
+
+def _bridge_holes(xs: list[float], ys: list[float], outer: list[int], holes: list[list[int]]) -> list[int]:
+    """
+    Splices each hole into the outer ring with a zero-width 'bridge' to a
+    visible vertex, giving one weakly-simple ring that ear clipping accepts.
+    Expects 'outer' counter-clockwise and every hole clockwise.
+    """
+    ring = list(outer)
+    # Rightmost holes first, so later bridges can't be blocked by earlier ones
+    holes = sorted(holes, key=lambda h: -max(xs[i] for i in h))
+    for h_pos, hole in enumerate(holes):
+        m_local = max(range(len(hole)), key=lambda k: xs[hole[k]])
+        m = hole[m_local]
+        mx, my = xs[m], ys[m]
+
+        # Edges a bridge must not cross: the current ring and the holes still to come
+        blockers = [(ring[k], ring[(k + 1) % len(ring)]) for k in range(len(ring))]
+        for other in holes[h_pos:]:
+            blockers.extend((other[k], other[(k + 1) % len(other)]) for k in range(len(other)))
+
+        candidates = sorted(range(len(ring)), key=lambda k: (xs[ring[k]] - mx)**2 + (ys[ring[k]] - my)**2)
+        bridge_pos = candidates[0] if candidates else 0
+        for k in candidates:
+            vx, vy = xs[ring[k]], ys[ring[k]]
+            if not any(_segments_cross(mx, my, vx, vy, xs[a], ys[a], xs[b], ys[b]) for a, b in blockers):
+                bridge_pos = k
+                break
+
+        rotated_hole = hole[m_local:] + hole[:m_local]
+        ring = ring[:bridge_pos + 1] + rotated_hole + [m, ring[bridge_pos]] + ring[bridge_pos + 1:]
+    return ring
+
+def _ring_area(xs: list[float], ys: list[float], ring: list[int]) -> float:
+    area = 0.0
+    n = len(ring)
+    for k in range(n):
+        i, j = ring[k], ring[(k + 1) % n]
+        area += xs[i] * ys[j] - xs[j] * ys[i]
+    return area / 2.0
+
+def triangulate_polygon(points: list[MyPoint], holes: list[list[MyPoint]] = None) -> list[tuple[int, int, int]]:
+    """
+    Triangulates a simple polygon (convex or concave) by ear clipping.
+    Returns triangles as counter-clockwise index triples into 'points'.
+    If holes are given, indices run over 'points' followed by each hole's
+    points, in order (see MyPolygon.get_all_points).
+    Collinear and repeated vertices (common in faces traced from a graph)
+    are tolerated: they are skipped instead of producing slivers.
+    """
+    n = len(points)
+    if n < 3:
+        return []
+
+    all_points = list(points)
+    hole_rings = []
+    for hole in holes or []:
+        if len(hole) >= 3:
+            hole_rings.append(list(range(len(all_points), len(all_points) + len(hole))))
+        all_points.extend(hole)
+
+    xs = [p.getX() for p in all_points]
+    ys = [p.getY() for p in all_points]
+
+    # Work with a counter-clockwise outer ring and clockwise holes
+    remaining = list(range(n))
+    if _ring_area(xs, ys, remaining) < 0.0:
+        remaining.reverse()
+    if hole_rings:
+        for ring in hole_rings:
+            if _ring_area(xs, ys, ring) > 0.0:
+                ring.reverse()
+        remaining = _bridge_holes(xs, ys, remaining, hole_rings)
+
+    def cross(i0, i1, i2):
+        return _orient2d(xs[i0], ys[i0], xs[i1], ys[i1], xs[i2], ys[i2])
+
+    triangles = []
+    k = 0
+    misses = 0 # Consecutive vertices that were not ears
+    while len(remaining) > 3:
+        m = len(remaining)
+        k %= m
+        i0, i1, i2 = remaining[k - 1], remaining[k], remaining[(k + 1) % m]
+
+        is_ear = cross(i0, i1, i2) > 0.0
+        if is_ear:
+            for j in remaining:
+                if j in (i0, i1, i2):
+                    continue
+                px, py = xs[j], ys[j]
+                if (px, py) in ((xs[i0], ys[i0]), (xs[i1], ys[i1]), (xs[i2], ys[i2])):
+                    continue # Repeated vertex, not a blocker
+                if _point_in_triangle(px, py, xs[i0], ys[i0], xs[i1], ys[i1], xs[i2], ys[i2]):
+                    is_ear = False
+                    break
+
+        if is_ear:
+            triangles.append((i0, i1, i2))
+            del remaining[k]
+            misses = 0
+            continue
+
+        misses += 1
+        if misses >= m:
+            # No ear left: the rest is degenerate. Drop a zero-area vertex if
+            # there is one, otherwise clip anyway so we always terminate.
+            for idx in range(m):
+                if cross(remaining[idx - 1], remaining[idx], remaining[(idx + 1) % m]) == 0.0:
+                    del remaining[idx]
+                    break
+            else:
+                triangles.append((remaining[k - 1], remaining[k], remaining[(k + 1) % m]))
+                del remaining[k]
+            misses = 0
+            continue
+        k += 1
+
+    if cross(remaining[0], remaining[1], remaining[2]) != 0.0:
+        triangles.append(tuple(remaining))
+    return triangles
+
+def segment_intersects_box(p1: MyPoint, p2: MyPoint, xmin: float, xmax: float, ymin: float, ymax: float) -> bool:
+    """Checks if segment p1-p2 touches the axis-aligned box (Liang-Barsky clipping)."""
+    x1, y1 = p1.getX(), p1.getY()
+    dx = p2.getX() - x1
+    dy = p2.getY() - y1
+    t0, t1 = 0.0, 1.0
+    for p, q in ((-dx, x1 - xmin), (dx, xmax - x1), (-dy, y1 - ymin), (dy, ymax - y1)):
+        if p == 0.0:
+            if q < 0.0:
+                return False # Parallel to and outside this edge
+            continue
+        t = q / p
+        if p < 0.0:
+            if t > t1:
+                return False
+            t0 = max(t0, t)
+        else:
+            if t < t0:
+                return False
+            t1 = min(t1, t)
+    return t0 <= t1
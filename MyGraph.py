@@ -1,6 +1,6 @@
 from MyShapes import MyPoint
 import math
-from MyGeometry import get_angle
+from MyGeometry import sort_clockwise
 
 # --- NEW HELPER ---
 # We need this here for the node-finding logic
@@ -25,45 +25,47 @@ class GraphNode:
         if not self.edges:
             return []
 
-        # 1. Get angle of the incoming edge (vector IN to self)
-        if incoming_edge:
-            # Get the node we came from
-            prev_node = incoming_edge.n1 if incoming_edge.n2 == self else incoming_edge.n2
-            ref_angle = get_angle(self.point, prev_node.point)
-        else:
-            ref_angle = -math.pi # Default (points right)
+        # 1. Reference: the point we came from (the edge may be a compound chain)
+        ref_point = incoming_edge.get_direction_point(self) if incoming_edge else None # Default points left
 
-        # 2. Calculate relative angles for all other edges
-        edge_angles = []
-        for edge in self.edges:
-            if edge == incoming_edge:
-                continue
-            
-            # Get the node we are going to
-            next_node = edge.n1 if edge.n2 == self else edge.n2
-            out_angle = get_angle(self.point, next_node.point)
-            
-            # Calculate angle relative to ref_angle, in range [0, 2*pi]
-            delta = ref_angle - out_angle
-            while delta <= 0:
-                delta += 2 * math.pi
-                
-            edge_angles.append((delta, edge))
-            
-        # 3. Sort by the relative angle (smallest delta is the next one clockwise)
-        edge_angles.sort(key=lambda x: x[0])
-        
-        return [edge for delta, edge in edge_angles]
+        # 2. Order the other edges by their first point, with exact orientation tests
+        other_edges = [edge for edge in self.edges if edge != incoming_edge]
+        order = sort_clockwise(self.point, ref_point, [edge.get_direction_point(self) for edge in other_edges])
+
+        # 3. The first one is the next edge clockwise
+        return [other_edges[i] for i in order]
 
 
 class GraphEdge:
-    """Represents a shattered segment in the graph."""
-    def __init__(self, node1: GraphNode, node2: GraphNode):
+    """
+    Represents a shattered segment in the graph.
+    After chain simplification an edge can stand for a whole chain of
+    segments; 'path' then holds the interior points, ordered from n1 to n2.
+    """
+    def __init__(self, node1: GraphNode, node2: GraphNode, path: list[MyPoint] = None):
         self.n1 = node1
         self.n2 = node2
+        self.path: list[MyPoint] = path if path is not None else []
         self.visited_forward = False  # For n1 -> n2
         self.visited_backward = False # For n2 -> n1
 
+    # --- NEW ---
+    def get_direction_point(self, from_node: GraphNode) -> MyPoint:
+        """The first point after from_node along the edge (sets the edge's angle there)."""
+        if self.path:
+            return self.path[0] if from_node == self.n1 else self.path[-1]
+        return self.get_other_node(from_node).point
+
+    def get_points_from(self, from_node: GraphNode) -> list[MyPoint]:
+        """Interior points of the edge, in order when walking away from from_node."""
+        if from_node == self.n1:
+            return self.path
+        return self.path[::-1]
+
+    def get_polyline(self) -> list[MyPoint]:
+        """All points of the edge from n1 to n2, for drawing."""
+        return [self.n1.point] + self.path + [self.n2.point]
+
     # --- NEW ---
     def set_visited(self, from_node: GraphNode):
         """Marks the edge as visited in the direction *away* from from_node."""
@@ -87,11 +89,18 @@ class GraphEdge:
 
 class MyGraph:
     """Holds all nodes and edges for the planar graph."""
-    def __init__(self, epsilon=1e-6):
+    def __init__(self, epsilon=1e-6, tolerance: float = None):
         self.nodes: list[GraphNode] = []
         self.edges: list[GraphEdge] = []
         self.epsilon = epsilon
         self.epsilon_sq = epsilon**2
+        self.tolerance = tolerance # Curve tessellation tolerance the graph was built with
+        # --- NEW ---: Hash lookups, so building the graph stays near-linear
+        self.node_cells: dict[tuple[int, int], list[GraphNode]] = {} # epsilon-sized cells
+        self.edge_keys: set[tuple[int, int]] = set() # id pairs of connected nodes
+
+    def _cell_of(self, point: MyPoint) -> tuple[int, int]:
+        return (int(point.getX() // self.epsilon), int(point.getY() // self.epsilon))
 
     def get_nodes(self) -> list[GraphNode]:
         return self.nodes
@@ -101,9 +110,13 @@ class MyGraph:
 
     def find_node_at(self, point: MyPoint) -> GraphNode:
         """Finds a node at a given point, checking within an epsilon tolerance."""
-        for node in self.nodes:
-            if dist_sq(node.point, point) < self.epsilon_sq:
-                return node
+        # A match can only be in the point's cell or one of its 8 neighbours
+        cx, cy = self._cell_of(point)
+        for ix in (cx - 1, cx, cx + 1):
+            for iy in (cy - 1, cy, cy + 1):
+                for node in self.node_cells.get((ix, iy), ()):
+                    if dist_sq(node.point, point) < self.epsilon_sq:
+                        return node
         return None
 
     def add_node(self, point: MyPoint) -> GraphNode:
@@ -114,6 +127,7 @@ class MyGraph:
         
         new_node = GraphNode(point)
         self.nodes.append(new_node)
+        self.node_cells.setdefault(self._cell_of(point), []).append(new_node)
         return new_node
 
     def add_edge(self, node1: GraphNode, node2: GraphNode):
@@ -121,11 +135,11 @@ class MyGraph:
         if node1 == node2:
             return # Don't add zero-length edges
 
-        # Check for duplicates
-        for edge in self.edges:
-            if (edge.n1 == node1 and edge.n2 == node2) or \
-               (edge.n1 == node2 and edge.n2 == node1):
-                return
+        # Check for duplicates (overlapping segments collapse into one edge here)
+        key = (id(node1), id(node2)) if id(node1) < id(node2) else (id(node2), id(node1))
+        if key in self.edge_keys:
+            return
+        self.edge_keys.add(key)
         
         new_edge = GraphEdge(node1, node2)
         self.edges.append(new_edge)
@@ -135,9 +149,113 @@ class MyGraph:
     def clear(self):
         self.nodes.clear()
         self.edges.clear()
+        self.node_cells.clear()
+        self.edge_keys.clear()
 
     def reset_visited_flags(self):
         """Resets all edge visited flags to False."""
         for edge in self.edges:
             edge.visited_forward = False
-            edge.visited_backward = False
\ No newline at end of file
+            edge.visited_backward = False
+
+    # --- NEW ---
+    def get_connected_components(self) -> list[list[GraphEdge]]:
+        """Groups the edges by connected component (in order of first appearance)."""
+        component_of = {} # id(node) -> component index
+        components: list[list[GraphEdge]] = []
+        for node in self.nodes:
+            if id(node) in component_of or not node.edges:
+                continue
+            index = len(components)
+            components.append([])
+            component_of[id(node)] = index
+            stack = [node]
+            while stack:
+                current = stack.pop()
+                for edge in current.edges:
+                    other = edge.get_other_node(current)
+                    if id(other) not in component_of:
+                        component_of[id(other)] = index
+                        stack.append(other)
+
+        for edge in self.edges:
+            components[component_of[id(edge.n1)]].append(edge)
+        return components
+
+    # --- NEW ---
+    def simplify_chains(self) -> int:
+        """
+        Collapses chains of degree-2 nodes (e.g. tessellated curves) into
+        compound edges that keep the chain geometry in their 'path'.
+        Junctions and dangling ends are kept; a loop (isolated, or closing
+        back on a single junction) keeps an extra node, so no edge ever
+        starts and ends at the same node.
+        Returns the number of nodes removed.
+        """
+        keep = {id(n) for n in self.nodes if len(n.edges) != 2}
+        visited_edges = set()
+        new_edges = []
+
+        def walk(start: GraphNode, first_edge: GraphEdge):
+            path = []
+            interior = [] # (node, index of its point in path)
+            current_node, current_edge = start, first_edge
+            visited_edges.add(id(current_edge))
+            while True:
+                path.extend(current_edge.get_points_from(current_node))
+                next_node = current_edge.get_other_node(current_node)
+                if next_node is start and interior:
+                    # Back where it started: split the loop at its middle node
+                    anchor, k = interior[len(interior) // 2]
+                    keep.add(id(anchor))
+                    new_edges.append(GraphEdge(start, anchor, path[:k]))
+                    new_edges.append(GraphEdge(anchor, start, path[k + 1:]))
+                    return
+                if id(next_node) in keep:
+                    new_edges.append(GraphEdge(start, next_node, path))
+                    return
+                interior.append((next_node, len(path)))
+                path.append(next_node.point)
+                current_edge = next_node.edges[1] if next_node.edges[0] is current_edge else next_node.edges[0]
+                current_node = next_node
+                visited_edges.add(id(current_edge))
+
+        for node in self.nodes:
+            if id(node) in keep:
+                for edge in node.edges:
+                    if id(edge) not in visited_edges:
+                        walk(node, edge)
+
+        # What is left are isolated loops made only of degree-2 nodes
+        for edge in self.edges:
+            if id(edge) in visited_edges:
+                continue
+            loop_nodes = [edge.n1]
+            current_node, current_edge = edge.n1, edge
+            while True:
+                current_node = current_edge.get_other_node(current_node)
+                if current_node is edge.n1:
+                    break
+                loop_nodes.append(current_node)
+                current_edge = current_node.edges[1] if current_node.edges[0] is current_edge else current_node.edges[0]
+            anchors = [loop_nodes[0], loop_nodes[len(loop_nodes) // 2]]
+            keep.update(id(n) for n in anchors)
+            for anchor in anchors:
+                for e in anchor.edges:
+                    if id(e) not in visited_edges:
+                        walk(anchor, e)
+
+        old_count = len(self.nodes)
+        self.nodes = [n for n in self.nodes if id(n) in keep]
+        for node in self.nodes:
+            node.edges = []
+        for edge in new_edges:
+            edge.n1.edges.append(edge)
+            edge.n2.edges.append(edge)
+        self.edges = new_edges
+
+        self.node_cells.clear()
+        for node in self.nodes:
+            self.node_cells.setdefault(self._cell_of(node.point), []).append(node)
+        self.edge_keys = {(id(e.n1), id(e.n2)) if id(e.n1) < id(e.n2) else (id(e.n2), id(e.n1)) for e in new_edges}
+        return old_count - len(self.nodes)
@@ -0,0 +1,457 @@
+# MyGraphBuilder.py
+import bisect
+import logging
+import math
+import os
+import pickle
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from MyShapes import MyPoint, MyPolygon, Shape, polygon_signed_area
+from MyGraph import MyGraph, GraphEdge, GraphNode
+from MyGeometry import find_segment_intersection_params, point_in_polygon
+from MySpatialIndex import StaticRTree
+from MyIntersectionCache import IntersectionCache
+
+_log = logging.getLogger(__name__)
+
+# A segment is (p1, p2, shape). 'splits' maps a segment index to the list of
+# (t, point) positions along it where it must be cut.
+
+def collect_segments(shapes: list[Shape], tolerance: float = None) -> list[tuple[MyPoint, MyPoint, Shape]]:
+    """
+    Gets all segments from the geometry tessellation of the given shapes
+    (curves within tolerance of the true curve; the display tessellation
+    if tolerance is None).
+    """
+    all_segments = []
+    for shape in shapes:
+        points = shape.get_geometry_points(tolerance)
+        if not points:
+            continue
+        for i in range(len(points) - 1):
+            all_segments.append( (points[i], points[i+1], shape) )
+        # Close loops that don't repeat their first point (e.g. polygons)
+        if shape.is_closed() and len(points) > 1 and points[-1] is not points[0] and \
+           (points[-1].getX(), points[-1].getY()) != (points[0].getX(), points[0].getY()):
+            all_segments.append( (points[-1], points[0], shape) )
+    return all_segments
+
+def _shape_ranges(all_segments: list) -> dict:
+    """shape -> (first segment index, end index, box of its segments); a shape's segments are contiguous."""
+    ranges = {}
+    for idx, (p1, p2, shape) in enumerate(all_segments):
+        xmin, xmax = min(p1.getX(), p2.getX()), max(p1.getX(), p2.getX())
+        ymin, ymax = min(p1.getY(), p2.getY()), max(p1.getY(), p2.getY())
+        entry = ranges.get(shape)
+        if entry is None:
+            ranges[shape] = (idx, idx + 1, (xmin, xmax, ymin, ymax))
+        else:
+            start, end, box = entry
+            ranges[shape] = (start, idx + 1, (min(box[0], xmin), max(box[1], xmax), min(box[2], ymin), max(box[3], ymax)))
+    return ranges
+
+def _pair_crossings(all_segments: list, start1: int, end1: int, start2: int, end2: int) -> tuple:
+    """
+    Crossings between the segments of two shapes as (i, j, t, u), with i
+    and j counted from each shape's first segment (so they stay valid as
+    long as both tessellations do).
+    """
+    crossings = []
+    for i in range(start1, end1):
+        p1, p2, _ = all_segments[i]
+        x_lo, x_hi = min(p1.getX(), p2.getX()), max(p1.getX(), p2.getX())
+        y_lo, y_hi = min(p1.getY(), p2.getY()), max(p1.getY(), p2.getY())
+        for j in range(start2, end2):
+            p3, p4, _ = all_segments[j]
+            if max(p3.getX(), p4.getX()) < x_lo or min(p3.getX(), p4.getX()) > x_hi or \
+               max(p3.getY(), p4.getY()) < y_lo or min(p3.getY(), p4.getY()) > y_hi:
+                continue
+            params = find_segment_intersection_params(p1, p2, p3, p4)
+            if params is not None:
+                crossings.append((i - start1, j - start2) + params)
+    return tuple(crossings)
+
+def find_crossings(all_segments: list, splits: dict, cache: IntersectionCache = None,
+                   tolerance: float = None) -> list[MyPoint]:
+    """
+    Finds the crossings between segments of different shapes and records
+    them as splits. Shapes are paired by the boxes of their segments; with
+    a cache, the crossings of a pair are reused for as long as neither
+    shape changed (tolerance must be the one the segments came from).
+    """
+    ranges = _shape_ranges(all_segments)
+    tree = StaticRTree([(box, shape) for shape, (start, end, box) in ranges.items()])
+    raw_intersection_points = []
+    for shape1, (start1, end1, box1) in ranges.items():
+        for shape2 in tree.query_box(*box1):
+            if shape2.get_id() <= shape1.get_id(): # Each pair once, lower id first
+                continue
+            start2, end2, box2 = ranges[shape2]
+            crossings = None
+            if cache is not None:
+                key = ((shape1.get_id(), shape1.get_version()), (shape2.get_id(), shape2.get_version()), tolerance)
+                crossings = cache.get(key)
+            if crossings is None:
+                crossings = _pair_crossings(all_segments, start1, end1, start2, end2)
+                if cache is not None:
+                    cache.put(key, crossings)
+
+            for i, j, t, u in crossings:
+                i += start1
+                j += start2
+                p1, p2, _ = all_segments[i]
+                intersection_pt = MyPoint(p1.getX() + t * (p2.getX() - p1.getX()),
+                                          p1.getY() + t * (p2.getY() - p1.getY()))
+                raw_intersection_points.append(intersection_pt)
+                splits.setdefault(i, []).append((t, intersection_pt))
+                splits.setdefault(j, []).append((u, intersection_pt))
+    return raw_intersection_points
+
+def _line_key(p1: MyPoint, p2: MyPoint, angle_step: float, offset_step: float):
+    """
+    Hashes the infinite line through p1-p2 as (angle bucket, offset bucket),
+    plus its unit direction. Direction is canonical, so angle is in [0, pi).
+    """
+    dx = p2.getX() - p1.getX()
+    dy = p2.getY() - p1.getY()
+    length = math.hypot(dx, dy)
+    if length == 0.0:
+        return None
+    if dx < 0.0 or (dx == 0.0 and dy < 0.0):
+        dx, dy = -dx, -dy
+    ux, uy = dx / length, dy / length
+    angle = math.atan2(uy, ux)
+    if angle >= math.pi: # atan2 can return pi for (-1, +0)
+        angle -= math.pi
+    offset = ux * p1.getY() - uy * p1.getX() # Signed distance of the line from the origin
+    return (int(angle // angle_step), int(offset // offset_step)), ux, uy
+
+def find_collinear_overlaps(all_segments: list, splits: dict, epsilon=1e-6, angle_step=1e-6):
+    """
+    Finds segments lying on the same line and overlapping (shared polygon
+    edges, duplicate lines), which the crossing test skips as parallel.
+    Each such segment is split at the overlap endpoints, so the shattered
+    pieces coincide and merge into single graph edges.
+
+    Segments are hashed by line key (angle, offset); only segments in the
+    same or a neighbouring bucket are compared, and endpoints are looked up
+    by binary search along the line, so this runs in near-linear time.
+    """
+    offset_step = max(epsilon * 4.0, 1e-12)
+    num_angle_buckets = int(math.pi // angle_step) + 1
+
+    buckets = {}
+    seg_keys = {}
+    max_coord = 0.0
+    for idx, (p1, p2, shape) in enumerate(all_segments):
+        key_data = _line_key(p1, p2, angle_step, offset_step)
+        if key_data is None:
+            continue
+        seg_keys[idx] = key_data
+        buckets.setdefault(key_data[0], []).append(idx)
+        max_coord = max(max_coord, abs(p1.getX()), abs(p1.getY()), abs(p2.getX()), abs(p2.getY()))
+
+    # Lines in one bucket differ slightly in direction, so projections on a
+    # shared direction are only approximate; the exact test below decides.
+    margin = 2.0 * angle_step * max_coord + epsilon
+
+    eps_sq = epsilon * epsilon
+    for key, members in buckets.items():
+        a_key, o_key = key
+
+        # Candidates: this bucket and its neighbours. Angles wrap around at
+        # pi, where the canonical direction (and so the offset sign) flips.
+        candidates = []
+        for da in (-1, 0, 1):
+            a = a_key + da
+            o = o_key
+            if a < 0 or a >= num_angle_buckets:
+                a %= num_angle_buckets
+                o = -o_key - 1
+            for do in (-1, 0, 1):
+                candidates.extend(buckets.get((a, o + do), ()))
+        if len(candidates) < 2:
+            continue
+
+        # Project every candidate endpoint on this bucket's line direction
+        _, ux, uy = seg_keys[members[0]]
+        endpoints = []
+        for c in set(candidates):
+            p1, p2, shape = all_segments[c]
+            for p in (p1, p2):
+                endpoints.append((p.getX() * ux + p.getY() * uy, id(p), p))
+        endpoints.sort(key=lambda e: e[0])
+        projections = [e[0] for e in endpoints]
+
+        for idx in members:
+            p1, p2, shape = all_segments[idx]
+            s1 = p1.getX() * ux + p1.getY() * uy
+            s2 = p2.getX() * ux + p2.getY() * uy
+            lo, hi = min(s1, s2), max(s1, s2)
+            x1, y1 = p1.getX(), p1.getY()
+            dx, dy = p2.getX() - x1, p2.getY() - y1
+            l2 = dx * dx + dy * dy
+            length = math.sqrt(l2)
+            if length <= epsilon:
+                continue
+            t_margin = epsilon / length
+            existing = {id(pt) for t, pt in splits.get(idx, ())}
+
+            start = bisect.bisect_left(projections, lo - margin)
+            end = bisect.bisect_right(projections, hi + margin)
+            for k in range(start, end):
+                _, pid, p = endpoints[k]
+                if pid in existing:
+                    continue
+                # Endpoint must lie strictly inside this segment (not just on a parallel line nearby)
+                t = ((p.getX() - x1) * dx + (p.getY() - y1) * dy) / l2
+                if t <= t_margin or t >= 1.0 - t_margin:
+                    continue
+                if (x1 + t * dx - p.getX())**2 + (y1 + t * dy - p.getY())**2 > eps_sq:
+                    continue
+                splits.setdefault(idx, []).append((t, p))
+                existing.add(pid)
+
+def build_graph(shapes: list[Shape], epsilon=1e-6, simplify_chains=False, tolerance: float = None,
+                cache: IntersectionCache = None) -> (MyGraph, list[MyPoint]):
+    """
+    Finds intersections, shatters segments, and builds the planar graph.
+    Curves are tessellated within tolerance (world units), independently
+    of how they are drawn; None uses the display tessellation.
+    With simplify_chains, degree-2 chains are collapsed into compound edges.
+    With a cache, shape pairs intersected by an earlier build are reused.
+    Returns (graph, raw_intersection_points).
+    """
+    graph = MyGraph(epsilon, tolerance)
+
+    # 1. Get all segments from all shapes
+    all_segments = collect_segments(shapes, tolerance)
+
+    # 2. Find where every segment must be cut: crossings, then collinear overlaps
+    splits = {}
+    raw_intersection_points = find_crossings(all_segments, splits, cache, tolerance)
+    find_collinear_overlaps(all_segments, splits, epsilon)
+
+    # 3. Create shattered edges (nodes are merged within epsilon by the graph)
+    for idx, (p1, p2, shape) in enumerate(all_segments):
+        current_node = graph.add_node(p1)
+        for t, point in sorted(splits.get(idx, ()), key=lambda s: s[0]):
+            next_node = graph.add_node(point)
+            graph.add_edge(current_node, next_node)
+            current_node = next_node
+        graph.add_edge(current_node, graph.add_node(p2))
+
+    # 4. Optional: collapse degree-2 chains so face tracing visits fewer nodes
+    if simplify_chains:
+        graph.simplify_chains()
+
+    return graph, raw_intersection_points
+
+# --- Face finding ---
+
+def _remove_spikes(points: list[MyPoint]) -> list[MyPoint]:
+    """
+    Removes back-and-forth runs (a, b, a) from a closed loop. They come from
+    dangling edges walked out and back, and enclose no area.
+    """
+    ring = []
+    for p in points:
+        if len(ring) >= 2 and ring[-2] is p:
+            ring.pop() # Drop the tip; p is already the last point
+        else:
+            ring.append(p)
+    # The loop is closed, so spikes can also straddle its ends
+    while len(ring) >= 3:
+        if ring[-1] is ring[1]:
+            del ring[:2]
+        elif ring[-2] is ring[0]:
+            del ring[-2:]
+        else:
+            break
+    return ring
+
+def _trace_face(start_edge: GraphEdge, start_node: GraphNode, max_steps: int) -> (list[MyPoint], float):
+    """
+    Traces the face to the right of start_edge (leaving start_node) by always
+    taking the first edge clockwise. Dead ends are walked back along the
+    same edge. Returns (points, signed_area), accumulating the area while
+    tracing, or (None, 0.0) if the walk didn't close.
+    """
+    current_edge = start_edge
+    current_node = start_node
+    face_points = []
+    area2 = 0.0 # Twice the signed area (shoelace), accumulated as we go
+    prev = start_node.point
+
+    for _ in range(max_steps): # Safety break
+        # 1. Mark edge as visited from the node we're leaving
+        if current_edge.was_visited_from(current_node):
+            return None, 0.0 # This path was already part of another face
+        current_edge.set_visited(current_node)
+
+        # 2. Move to the next node, collecting the edge's own points on the way
+        leaving_node = current_node
+        current_node = current_edge.get_other_node(current_node)
+        for p in current_edge.get_points_from(leaving_node) + [current_node.point]:
+            area2 += prev.getX() * p.getY() - p.getX() * prev.getY()
+            face_points.append(p)
+            prev = p
+
+        # 3. Take the first clockwise edge (or turn back at a dead end)
+        sorted_edges = current_node.get_sorted_edges(incoming_edge=current_edge)
+        current_edge = sorted_edges[0] if sorted_edges else current_edge
+
+        # 4. Closed once we are about to walk the start edge again
+        if current_node is start_node and current_edge is start_edge:
+            return face_points, area2 / 2.0
+
+    return None, 0.0 # Loop ran too long, likely an error
+
+def trace_faces(edges: list[GraphEdge]) -> (list[list[MyPoint]], list[list[MyPoint]]):
+    """
+    Traces every face of one connected component (visited flags must be
+    reset). Faces are classified by their signed area as they are traced:
+    counter-clockwise loops are bounded faces, the clockwise loop is the
+    component's outer boundary. Returns (bounded_faces, outer_boundaries).
+    """
+    max_steps = 2 * len(edges) + 1 # Every directed edge is walked at most once
+    bounded_faces = []
+    outer_boundaries = []
+    for start_edge in edges:
+        for start_node in (start_edge.n1, start_edge.n2):
+            if start_edge.was_visited_from(start_node):
+                continue
+            face_points, area = _trace_face(start_edge, start_node, max_steps)
+            if face_points is None or area == 0.0:
+                continue
+            face_points = _remove_spikes(face_points)
+            if len(face_points) < 3: # A valid face must have at least 3 points
+                continue
+            if area > 0.0:
+                bounded_faces.append(face_points)
+            else:
+                outer_boundaries.append(face_points)
+    return bounded_faces, outer_boundaries
+
+def _points_box(points: list[MyPoint]):
+    xs = [p.getX() for p in points]
+    ys = [p.getY() for p in points]
+    return min(xs), max(xs), min(ys), max(ys)
+
+def nest_faces(faces: list[list[MyPoint]], face_components: list[int],
+               outer_boundaries: list[tuple[int, list[MyPoint]]]) -> (list[int], list[list[list[MyPoint]]]):
+    """
+    Resolves nesting between disconnected components. Every component whose
+    outer boundary lies inside a face of another component is attached to
+    the smallest such face: the boundary becomes a hole of that face, and
+    the component's faces become its children.
+    Candidates come from a bbox R-tree over the faces.
+    Returns (parent index or None per face, holes per face).
+    """
+    boxes = [_points_box(points) for points in faces]
+    areas = [polygon_signed_area(points) for points in faces]
+    index = StaticRTree([(box, i) for i, box in enumerate(boxes)])
+
+    holes = [[] for _ in faces]
+    component_parent = {}
+    for component, boundary in outer_boundaries:
+        bxmin, bxmax, bymin, bymax = _points_box(boundary)
+        probe = boundary[0] # Components don't touch, so any vertex is strictly inside or outside
+        best, best_area = None, float('inf')
+        for i in index.query_point(probe.getX(), probe.getY()):
+            if face_components[i] == component or areas[i] >= best_area:
+                continue
+            xmin, xmax, ymin, ymax = boxes[i]
+            if bxmin < xmin or bxmax > xmax or bymin < ymin or bymax > ymax:
+                continue
+            if point_in_polygon(probe, faces[i]):
+                best, best_area = i, areas[i]
+        if best is not None:
+            component_parent[component] = best
+            holes[best].append(boundary)
+
+    parents = [component_parent.get(component) for component in face_components]
+    return parents, holes
+
+# --- Parallel tracing ---
+# Components are sent to worker processes as plain coordinates (picklable
+# and compact), rebuilt there, traced, and sent back the same way.
+
+def _component_payload(edges: list[GraphEdge]) -> (list[tuple[float, float]], list[tuple]):
+    """Flattens a component into (node coordinates, [(i, j, path coordinates)])."""
+    node_ids = {}
+    nodes = []
+    edge_data = []
+    for edge in edges:
+        for node in (edge.n1, edge.n2):
+            if id(node) not in node_ids:
+                node_ids[id(node)] = len(nodes)
+                nodes.append((node.point.getX(), node.point.getY()))
+        path = [(p.getX(), p.getY()) for p in edge.path]
+        edge_data.append((node_ids[id(edge.n1)], node_ids[id(edge.n2)], path))
+    return nodes, edge_data
+
+def _trace_component_payload(payload) -> (list[list[tuple[float, float]]], list[list[tuple[float, float]]]):
+    """Worker side: rebuilds the component and traces its faces."""
+    nodes_xy, edge_data = payload
+    nodes = [GraphNode(MyPoint(x, y)) for x, y in nodes_xy]
+    edges = []
+    for i, j, path in edge_data:
+        edge = GraphEdge(nodes[i], nodes[j], [MyPoint(x, y) for x, y in path])
+        nodes[i].edges.append(edge)
+        nodes[j].edges.append(edge)
+        edges.append(edge)
+    bounded_faces, outer_boundaries = trace_faces(edges)
+    return ([[(p.getX(), p.getY()) for p in face] for face in bounded_faces],
+            [[(p.getX(), p.getY()) for p in outer] for outer in outer_boundaries])
+
+def trace_components(components: list[list[GraphEdge]], workers: int = None,
+                     min_parallel_edges=20000) -> list[tuple[list, list]]:
+    """
+    Traces the faces of every component, returning (bounded_faces,
+    outer_boundaries) per component, in component order.
+    Big multi-component graphs are spread over a process pool (workers=None
+    uses every core); small ones, or workers=1, are traced in this process,
+    where starting a pool would cost more than it saves. Results are the
+    same either way, and a pool that can't run falls back to tracing here
+    (logged as a warning).
+    """
+    num_edges = sum(len(edges) for edges in components)
+    workers = workers or os.cpu_count() or 1
+    if workers > 1 and len(components) > 1 and num_edges >= min_parallel_edges:
+        try:
+            payloads = [_component_payload(edges) for edges in components]
+            chunksize = max(1, len(payloads) // (workers * 4))
+            with ProcessPoolExecutor(max_workers=min(workers, len(payloads))) as executor:
+                results = list(executor.map(_trace_component_payload, payloads, chunksize=chunksize))
+            return [([[MyPoint(x, y) for x, y in face] for face in bounded],
+                     [[MyPoint(x, y) for x, y in outer] for outer in outers])
+                    for bounded, outers in results]
+        except (OSError, BrokenProcessPool, pickle.PicklingError) as e: # No pool here, or it died
+            _log.warning("Parallel face tracing failed (%s), tracing serially", e)
+
+    for edges in components:
+        for edge in edges:
+            edge.visited_forward = False
+            edge.visited_backward = False
+    return [trace_faces(edges) for edges in components]
+
+def find_faces(graph: MyGraph, workers: int = None) -> (list[MyPolygon], list[int]):
+    """
+    Finds the bounded faces of the graph, with nested components cut out
+    as holes. Outer boundaries are not returned as faces. Components are
+    traced in parallel when the graph is big enough (see trace_components).
+    Returns (faces, parents), where parents[i] is the index of the face
+    that encloses face i, or None for top-level faces.
+    """
+    faces = []
+    face_components = []
+    outer_boundaries = []
+    components = graph.get_connected_components()
+    for component, (bounded_faces, outers) in enumerate(trace_components(components, workers)):
+        faces.extend(bounded_faces)
+        face_components.extend([component] * len(bounded_faces))
+        outer_boundaries.extend((component, outer) for outer in outers)
+
+    parents, holes = nest_faces(faces, face_components, outer_boundaries)
+    return [MyPolygon(points, holes[i]) for i, points in enumerate(faces)], parents
@@ -0,0 +1,71 @@
+# MyIntersectionCache.py
+from collections import OrderedDict
+
+class IntersectionCache:
+    """
+    Bounded LRU cache of the crossings between two shapes, keyed by both
+    shapes' (id, version) and the tessellation tolerance, so a rebuild after
+    a small change to the selection only intersects the pairs involving new
+    or edited shapes. Size is counted in stored crossings (an entry counts
+    at least one, so pairs that don't cross are bounded too).
+    """
+    def __init__(self, max_size=1000000):
+        self.m_entries = OrderedDict()
+        self.m_max_size = max_size
+        self.m_size = 0
+        self.m_hits = 0
+        self.m_misses = 0
+        self.m_evictions = 0
+
+    @staticmethod
+    def _cost(crossings: tuple) -> int:
+        return max(1, len(crossings))
+
+    def get(self, key) -> tuple:
+        """The cached crossings for key, or None."""
+        crossings = self.m_entries.get(key)
+        if crossings is None:
+            self.m_misses += 1
+            return None
+        self.m_entries.move_to_end(key)
+        self.m_hits += 1
+        return crossings
+
+    def put(self, key, crossings: tuple):
+        old = self.m_entries.pop(key, None)
+        if old is not None:
+            self.m_size -= self._cost(old)
+        self.m_entries[key] = crossings
+        self.m_size += self._cost(crossings)
+        self._shrink()
+
+    def _shrink(self):
+        while self.m_size > self.m_max_size and self.m_entries:
+            key, crossings = self.m_entries.popitem(last=False) # Least recently used
+            self.m_size -= self._cost(crossings)
+            self.m_evictions += 1
+
+    def set_max_size(self, max_size: int):
+        self.m_max_size = max_size
+        self._shrink()
+
+    def clear(self):
+        self.m_entries.clear()
+        self.m_size = 0
+
+    def reset_stats(self):
+        self.m_hits = 0
+        self.m_misses = 0
+        self.m_evictions = 0
+
+    def get_stats(self) -> dict:
+        lookups = self.m_hits + self.m_misses
+        return {
+            'hits': self.m_hits,
+            'misses': self.m_misses,
+            'hit_rate': self.m_hits / lookups if lookups else 0.0,
+            'evictions': self.m_evictions,
+            'entries': len(self.m_entries),
+            'size': self.m_size,
+            'max_size': self.m_max_size,
+        }
@@ -0,0 +1,292 @@
+# MyMemoryReport.py
+import gc
+import sys
+import tracemalloc
+from contextlib import contextmanager
+from MyShapes import MyPoint, Shape
+from MyTessellationCache import TESSELLATION_CACHE
+
+def format_bytes(size: int) -> str:
+    for unit in ('B', 'KB', 'MB'):
+        if abs(size) < 1024:
+            return f"{size:.0f} {unit}" if unit == 'B' else f"{size:.1f} {unit}"
+        size /= 1024.0
+    return f"{size:.1f} GB"
+
+class MemorySizer():
+    """
+    Approximate deep sizes: sys.getsizeof of the objects, their attribute
+    dicts and the containers holding them. Every object is counted once per
+    sizer, so memory shared by two subsystems goes to the first one sized.
+    """
+    def __init__(self):
+        self.m_seen: set[int] = set()
+        self.m_point_count = 0
+
+    def _first_time(self, obj) -> bool:
+        key = id(obj)
+        if key in self.m_seen:
+            return False
+        self.m_seen.add(key)
+        return True
+
+    def object(self, obj) -> int:
+        """The object and its attribute dict (not what its attributes refer to)."""
+        if obj is None or not self._first_time(obj):
+            return 0
+        attributes = getattr(obj, '__dict__', None)
+        return sys.getsizeof(obj) + (sys.getsizeof(attributes) if attributes is not None else 0)
+
+    def point(self, point: MyPoint) -> int:
+        size = self.object(point)
+        if size:
+            self.m_point_count += 1
+            size += sys.getsizeof(point.getX()) + sys.getsizeof(point.getY())
+        return size
+
+    def points(self, points: list[MyPoint]) -> int:
+        if points is None or not self._first_time(points):
+            return 0
+        return sys.getsizeof(points) + sum(self.point(p) for p in points)
+
+    def floats(self, values: list[float]) -> int:
+        if values is None or not self._first_time(values):
+            return 0
+        return sys.getsizeof(values) + sum(sys.getsizeof(v) for v in values)
+
+    def tuples(self, items) -> int:
+        """A container of flat tuples (boxes, triangles, ...)."""
+        if items is None or not self._first_time(items):
+            return 0
+        return sys.getsizeof(items) + sum(sys.getsizeof(t) for t in items)
+
+    def array(self, array) -> int:
+        """numpy arrays (nbytes: a view counts its own extent) and ctypes or array.array buffers."""
+        if array is None or not self._first_time(array):
+            return 0
+        return getattr(array, 'nbytes', None) or sys.getsizeof(array)
+
+    def container(self, container) -> int:
+        """The container alone, not its items."""
+        if container is None or not self._first_time(container):
+            return 0
+        return sys.getsizeof(container)
+
+    def shape(self, shape: Shape) -> int:
+        """A shape's own data: control points, holes and triangles (not its tessellation)."""
+        size = self.object(shape) + self.points(shape.get_control_points())
+        for hole in getattr(shape, '_holes', None) or ():
+            size += self.points(hole)
+        if getattr(shape, '_holes', None) is not None:
+            size += self.container(shape._holes)
+        return size + self.tuples(getattr(shape, '_triangles', None))
+
+    def tessellation(self, shape: Shape) -> (int, int):
+        """(size, count) of the tessellations a shape holds that weren't sized yet."""
+        size, count = 0, 0
+        for part in (self.points(getattr(shape, '_tessellated_points', None)),
+                     self.array(getattr(shape, '_tessellated_coords', None))):
+            if part:
+                size += part
+                count += 1
+        return size, count
+
+# --- Subsystems: each returns (items, size) ---
+
+def _size_shapes(sizer: MemorySizer, model) -> (int, int):
+    shapes = model.getShapes()
+    size = sizer.container(shapes) + sizer.container(model.m_selected_shapes)
+    return len(shapes), size + sum(sizer.shape(shape) for shape in shapes)
+
+def _size_tessellations(sizer: MemorySizer, model) -> (int, int):
+    items, size = 0, 0
+    for shape in model.getShapes():
+        shape_size, count = sizer.tessellation(shape)
+        items += count
+        size += shape_size
+    return items, size
+
+def _size_tessellation_cache(sizer: MemorySizer) -> (int, int):
+    """The cache's own table, plus the cached lists no shape of the model uses."""
+    entries = list(TESSELLATION_CACHE.m_entries.items())
+    size = sizer.container(TESSELLATION_CACHE.m_entries)
+    for key, points in entries:
+        size += sys.getsizeof(key) + sizer.points(points)
+    return len(entries), size
+
+def _size_spatial_indexes(sizer: MemorySizer, model) -> (int, int):
+    index = model.get_shape_index()
+    size = sizer.container(index.m_cells) + sizer.container(index.m_boxes)
+    size += sum(sys.getsizeof(box) for box in index.m_boxes.values())
+    size += sum(sys.getsizeof(key) + sizer.container(cell) for key, cell in index.m_cells.items())
+    size += sizer.container(index.m_oversized)
+    return len(index.m_cells), size
+
+def _size_graph(sizer: MemorySizer, model) -> (int, int):
+    graph = model.get_graph()
+    size = sizer.points(model.get_intersection_points())
+    if graph is None:
+        return 0, size
+    for node in graph.get_nodes():
+        size += sizer.object(node) + sizer.point(node.point) + sizer.container(node.edges)
+    for edge in graph.get_edges():
+        size += sizer.object(edge) + sizer.points(edge.path)
+    size += sizer.container(graph.nodes) + sizer.container(graph.edges)
+    size += sizer.container(graph.node_cells) + sum(sizer.container(cell) for cell in graph.node_cells.values())
+    size += sizer.tuples(graph.edge_keys)
+    return len(graph.get_nodes()) + len(graph.get_edges()), size
+
+def _size_faces(sizer: MemorySizer, model) -> (int, int):
+    faces = model.get_found_faces() + model.get_boolean_results()
+    size = sum(sizer.shape(face) for face in faces)
+    size += sizer.container(model.m_face_parents) + sizer.container(model.m_face_children)
+    size += sum(sizer.container(children) for children in model.m_face_children.values())
+    size += sizer.floats(model.m_face_fill_buffer)
+    return len(faces), size
+
+def _size_lod_cache(sizer: MemorySizer, lod_manager) -> (int, int):
+    entries = list(lod_manager.m_cache.values())
+    size = 0
+    for entry in entries:
+        size += sizer.container(entry) + sys.getsizeof(entry['bbox']) + sizer.container(entry['buckets'])
+        size += sum(sizer.points(points) for points in entry['buckets'].values())
+    return len(entries), size
+
+def _size_render_batches(sizer: MemorySizer, renderer) -> (int, int):
+    batches = list(renderer.m_batches.values())
+    size = 0
+    for batch in batches:
+        size += sizer.object(batch) + sizer.container(batch.m_shapes) + sizer.container(batch.m_pending)
+        for part in batch.m_parts:
+            size += sizer.container(part) + sum(sizer.array(array) for array in part)
+        for values in (batch.m_triangles, batch.m_lines, batch.m_points, batch.m_control_points):
+            size += sizer.floats(values)
+    return len(batches), size
+
+def _size_intersection_cache(sizer: MemorySizer, cache) -> (int, int):
+    size = sizer.container(cache.m_entries)
+    for key, crossings in cache.m_entries.items():
+        size += sys.getsizeof(key) + sum(sys.getsizeof(part) for part in key[:2])
+        size += sys.getsizeof(crossings)
+        size += sum(sys.getsizeof(c) + sys.getsizeof(c[2]) + sys.getsizeof(c[3]) for c in crossings)
+    return len(cache.m_entries), size
+
+def memory_report(model, lod_manager=None, renderer=None, intersection_cache=None) -> list[tuple]:
+    """
+    Approximate memory held by each subsystem, as (name, items, points,
+    bytes) rows; points counts the MyPoint instances first reached from
+    that subsystem. Shared objects are counted once, with the first row
+    that holds them (shapes, then tessellations, then the rest). For a
+    TiledModel, only the loaded tiles are counted.
+    """
+    sizer = MemorySizer()
+    rows = []
+
+    def add_row(name: str, measure):
+        points_before = sizer.m_point_count
+        items, size = measure()
+        rows.append((name, items, sizer.m_point_count - points_before, size))
+
+    add_row("Model shapes", lambda: _size_shapes(sizer, model))
+    add_row("Tessellations", lambda: _size_tessellations(sizer, model))
+    add_row("Tessellation cache", lambda: _size_tessellation_cache(sizer))
+    add_row("Spatial index", lambda: _size_spatial_indexes(sizer, model))
+    add_row("MyGraph", lambda: _size_graph(sizer, model))
+    add_row("Faces", lambda: _size_faces(sizer, model))
+    if lod_manager is not None:
+        add_row("LOD cache", lambda: _size_lod_cache(sizer, lod_manager))
+    if renderer is not None:
+        add_row("Render batches", lambda: _size_render_batches(sizer, renderer))
+    if intersection_cache is not None:
+        add_row("Intersection cache", lambda: _size_intersection_cache(sizer, intersection_cache))
+    return rows
+
+def count_instances(cls: type) -> int:
+    """Live instances of exactly cls, found through the garbage collector (slow on big drawings)."""
+    return sum(1 for obj in gc.get_objects() if type(obj) is cls)
+
+def format_memory_report(rows: list[tuple], count_points=True) -> str:
+    lines = [f"{'Subsystem':<20} {'Items':>10} {'MyPoints':>10} {'Size':>12}"]
+    for name, items, points, size in rows:
+        lines.append(f"{name:<20} {items:>10} {points:>10} {format_bytes(size):>12}")
+    total_points = sum(row[2] for row in rows)
+    lines.append(f"{'Total':<20} {'':>10} {total_points:>10} {format_bytes(sum(row[3] for row in rows)):>12}")
+    if count_points:
+        alive = count_instances(MyPoint)
+        lines.append(f"MyPoint instances alive: {alive} ({alive - total_points} not reached from the subsystems above)")
+    if tracemalloc.is_tracing():
+        current, peak = tracemalloc.get_traced_memory()
+        lines.append(f"tracemalloc: {format_bytes(current)} allocated, peak {format_bytes(peak)}")
+    return '\n'.join(lines)
+
+class AllocationTracer():
+    """
+    Traces Python allocations (tracemalloc) over a block of work split in
+    named phases, then prints the peak each phase reached above what was
+    allocated when it started, the peak of the whole block, and the source
+    lines that allocated what the block left behind. A disabled tracer
+    does nothing, so call sites can keep it in place. Tracing makes
+    allocation several times slower while it runs.
+    """
+    def __init__(self, label: str, enabled=True, top=10):
+        self.m_label = label
+        self.m_enabled = enabled
+        self.m_top = top
+        self.m_phases: list[tuple[str, int, int]] = [] # (name, peak, retained) in bytes
+        self.m_report = None
+
+    def __enter__(self):
+        if not self.m_enabled:
+            return self
+        self.m_started = not tracemalloc.is_tracing()
+        if self.m_started:
+            tracemalloc.start()
+        self.m_snapshot = tracemalloc.take_snapshot()
+        tracemalloc.reset_peak()
+        self.m_base = tracemalloc.get_traced_memory()[0]
+        self.m_peak = self.m_base
+        return self
+
+    @contextmanager
+    def phase(self, name: str):
+        if not self.m_enabled:
+            yield
+            return
+        self.m_peak = max(self.m_peak, tracemalloc.get_traced_memory()[1])
+        tracemalloc.reset_peak()
+        start = tracemalloc.get_traced_memory()[0]
+        try:
+            yield
+        finally:
+            current, peak = tracemalloc.get_traced_memory()
+            self.m_peak = max(self.m_peak, peak)
+            self.m_phases.append((name, peak - start, current - start))
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if not self.m_enabled:
+            return False
+        current, peak = tracemalloc.get_traced_memory()
+        self.m_peak = max(self.m_peak, peak)
+        snapshot = tracemalloc.take_snapshot().filter_traces([tracemalloc.Filter(False, tracemalloc.__file__)])
+        growth = [stat for stat in snapshot.compare_to(self.m_snapshot, 'lineno') if stat.size_diff > 0]
+        growth.sort(key=lambda stat: stat.size_diff, reverse=True)
+        if self.m_started:
+            tracemalloc.stop()
+        self.m_snapshot = None
+
+        lines = [f"Allocations in {self.m_label}: peak {format_bytes(self.m_peak - self.m_base)}, "
+                 f"retained {format_bytes(current - self.m_base)}"]
+        for name, phase_peak, retained in self.m_phases:
+            lines.append(f"  {name:<24} peak {format_bytes(phase_peak):>10}  retained {format_bytes(retained):>10}")
+        if growth:
+            lines.append("  Retained by line:")
+        for stat in growth[:self.m_top]:
+            frame = stat.traceback[0]
+            lines.append(f"    {format_bytes(stat.size_diff):>10} in {stat.count_diff:>8} blocks  {frame.filename}:{frame.lineno}")
+        self.m_report = '\n'.join(lines)
+        print(self.m_report)
+        return False
+
+    def get_report(self) -> str:
+        """The printed report, once the block is over (None if disabled)."""
+        return self.m_report
@@ -1,21 +1,73 @@
 # MyModel.py
-from MyShapes import MyPolygon, Shape, MyPoint
+from MyShapes import MyPolygon, Shape, MyPoint, tessellate_shapes
 from MyGraph import MyGraph # --- NEW ---
+from MyGeometry import point_in_polygon, triangulate_polygon, segment_intersects_box
+from MySpatialIndex import StaticRTree, GridIndex
+from MyTransforms import transform_shapes
+from enum import Enum
 import math
 
+class ModelEvents(Enum):
+    SHAPES_ADDED = 0
+    SHAPES_REMOVED = 1
+    SHAPES_MODIFIED = 2 # Control points (and so geometry) changed
+    SELECTION_CHANGED = 3
+    GRAPH_CHANGED = 4 # Graph (and its faces) replaced or cleared
+    CLEARED = 5
+
 class MyModel:
     def __init__(self):
+        self.m_observers = [] # Callables taking (event: ModelEvents, shapes: list[Shape])
         self.m_shapes = []
-        self.m_selected_shapes = [] 
+        self.m_extents = None # Union of the shapes' boxes, None when unknown
+        self.m_shape_index = GridIndex() # Bounding boxes of m_shapes, kept in sync
+        self.m_selected_shapes: dict[Shape, bool] = {} # Insertion-ordered set: O(1) membership
         self.m_intersection_points = []
         self.m_graph: MyGraph = None   
         self.m_found_faces: list[MyPolygon] = []
+        self.m_selected_faces: list[MyPolygon] = []
+        # Face tree: nested components hang below the face that encloses them
+        self.m_root_faces: list[MyPolygon] = []
+        self.m_face_parents: dict[MyPolygon, MyPolygon] = {}
+        self.m_face_children: dict[MyPolygon, list[MyPolygon]] = {}
+        self.m_face_index: StaticRTree = None # Point-location index over found faces
+        self.m_face_fill_buffer: list[float] = None # Packed triangles of all faces
+        self.m_boolean_results: list[MyPolygon] = []
+
+    # --- NEW ---: Change notification
+    def subscribe(self, callback):
+        """
+        Registers callback(event, shapes) to be told about every change, so
+        caches can be updated incrementally instead of rescanning the model.
+        """
+        if callback not in self.m_observers:
+            self.m_observers.append(callback)
+
+    def unsubscribe(self, callback):
+        if callback in self.m_observers:
+            self.m_observers.remove(callback)
+
+    def _notify(self, event: ModelEvents, shapes: list[Shape] = ()):
+        for callback in list(self.m_observers):
+            callback(event, list(shapes))
 
     def getShapes(self):
         return self.m_shapes
+
+    def iter_all_shapes(self):
+        """Every shape of the drawing, including any not held in memory (see TiledModel)."""
+        return iter(self.m_shapes)
     
-    def get_selected_shapes(self):
-        return self.m_selected_shapes
+    def get_selected_shapes(self) -> list[Shape]:
+        """Selected shapes, in selection order (a copy; use is_selected for membership)."""
+        return list(self.m_selected_shapes)
+
+    # --- NEW ---
+    def is_selected(self, shape: Shape) -> bool:
+        return shape in self.m_selected_shapes
+
+    def get_selection_count(self) -> int:
+        return len(self.m_selected_shapes)
     
     def get_intersection_points(self):
         return self.m_intersection_points
@@ -28,12 +80,126 @@ class MyModel:
         return self.m_found_faces
         
     # --- NEW ---
-    def add_found_face(self, polygon: MyPolygon):
+    def add_found_face(self, polygon: MyPolygon, parent: MyPolygon = None):
+        """Adds a face, below 'parent' in the face tree (None for a top-level face)."""
+        # Triangulate once, here, so concave faces fill correctly
+        if polygon.get_triangles() is None:
+            polygon.set_triangles(triangulate_polygon(polygon.get_tessellated_points(), polygon.get_holes()))
         self.m_found_faces.append(polygon)
+        self.m_face_parents[polygon] = parent
+        if parent is None:
+            self.m_root_faces.append(polygon)
+        else:
+            self.m_face_children.setdefault(parent, []).append(polygon)
+        self.m_face_index = None # Rebuilt on the next query
+        self.m_face_fill_buffer = None
         
     # --- NEW ---
     def clear_found_faces(self):
         self.m_found_faces.clear()
+        self.m_selected_faces.clear()
+        self.m_root_faces.clear()
+        self.m_face_parents.clear()
+        self.m_face_children.clear()
+        self.m_face_index = None
+        self.m_face_fill_buffer = None
+
+    # --- NEW ---
+    def get_root_faces(self) -> list[MyPolygon]:
+        """Top-level faces (not enclosed by another found face)."""
+        return self.m_root_faces
+
+    def get_face_parent(self, face: MyPolygon) -> MyPolygon:
+        return self.m_face_parents.get(face)
+
+    def get_face_children(self, face: MyPolygon) -> list[MyPolygon]:
+        """Faces of the components nested directly inside face (its holes)."""
+        return self.m_face_children.get(face, [])
+
+    def get_face_depth(self, face: MyPolygon) -> int:
+        depth = 0
+        parent = self.m_face_parents.get(face)
+        while parent is not None:
+            depth += 1
+            parent = self.m_face_parents.get(parent)
+        return depth
+
+    # --- NEW ---
+    def get_face_fill_buffer(self) -> list[float]:
+        """
+        Returns the triangles of all found faces packed into one flat
+        [x0, y0, x1, y1, ...] list (3 vertices per triangle), ready to be
+        uploaded as a single vertex array. Cached until the faces change.
+        """
+        if self.m_face_fill_buffer is None:
+            buffer = []
+            for face in self.m_found_faces:
+                points = face.get_all_points()
+                for tri in face.get_triangles():
+                    for i in tri:
+                        buffer.append(points[i].getX())
+                        buffer.append(points[i].getY())
+            self.m_face_fill_buffer = buffer
+        return self.m_face_fill_buffer
+
+    # --- NEW ---
+    def build_face_index(self):
+        """Builds the point-location index (bbox R-tree) over the found faces."""
+        entries = [(face.get_bounding_box(), face) for face in self.m_found_faces]
+        self.m_face_index = StaticRTree(entries)
+
+    def find_face_at(self, point: MyPoint) -> MyPolygon:
+        """
+        Returns the found face containing the point, or None.
+        Candidates come from the bbox R-tree and are confirmed with a
+        winding test (points in a face's holes are outside it).
+        """
+        if not self.m_found_faces:
+            return None
+        if self.m_face_index is None:
+            self.build_face_index()
+
+        best_face = None
+        best_area = float('inf')
+        for face in self.m_face_index.query_point(point.getX(), point.getY()):
+            area = abs(face.get_signed_area())
+            if area < best_area and point_in_polygon(point, face.get_tessellated_points()) and \
+               not any(point_in_polygon(point, hole) for hole in face.get_holes()):
+                best_face = face
+                best_area = area
+        return best_face
+
+    def find_faces_at(self, points: list[MyPoint]) -> list[MyPolygon]:
+        """Batch version of find_face_at (one result per query point)."""
+        return [self.find_face_at(p) for p in points]
+
+    # --- NEW ---
+    def get_boolean_results(self) -> list[MyPolygon]:
+        return self.m_boolean_results
+
+    def set_boolean_results(self, polygons: list[MyPolygon]):
+        for polygon in polygons:
+            if polygon.get_triangles() is None:
+                polygon.set_triangles(triangulate_polygon(polygon.get_tessellated_points(), polygon.get_holes()))
+        self.m_boolean_results = polygons
+
+    def clear_boolean_results(self):
+        self.m_boolean_results = []
+
+    # --- NEW ---
+    def get_selected_faces(self) -> list[MyPolygon]:
+        return self.m_selected_faces
+
+    def add_face_to_selection(self, face: MyPolygon):
+        if face not in self.m_selected_faces:
+            self.m_selected_faces.append(face)
+
+    def remove_face_from_selection(self, face: MyPolygon):
+        if face in self.m_selected_faces:
+            self.m_selected_faces.remove(face)
+
+    def clear_face_selection(self):
+        self.m_selected_faces.clear()
 
     # --- MODIFIED ---
     def set_intersection_points(self, points_list: list[MyPoint]):
@@ -45,28 +211,158 @@ class MyModel:
     # --- NEW ---
     def set_graph(self, graph: MyGraph):
         self.m_graph = graph
+        self._notify(ModelEvents.GRAPH_CHANGED)
         
     # --- NEW ---
     def clear_graph(self):
+        had_graph = self.m_graph is not None
         if self.m_graph:
             self.m_graph.clear()
         self.m_graph = None
+        if had_graph:
+            self._notify(ModelEvents.GRAPH_CHANGED)
+
+    def _invalidate_graph(self, shapes: list[Shape]):
+        """Drops the graph and its faces if it was built from any of the shapes."""
+        if self.m_graph is None:
+            return
+        if any(shape in self.m_selected_shapes for shape in shapes):
+            self.clear_intersections()
+            self.clear_found_faces()
+            self.clear_graph()
+
+    def _grow_extents(self, box):
+        if self.m_extents is None:
+            if len(self.m_shapes) == 1:
+                self.m_extents = box
+            return # Otherwise unknown: recomputed by getBoundBox
+        xmin, xmax, ymin, ymax = self.m_extents
+        self.m_extents = (min(xmin, box[0]), max(xmax, box[1]), min(ymin, box[2]), max(ymax, box[3]))
 
     def addShape(self, shape: Shape):
+        self._add_shape(shape)
+        self._notify(ModelEvents.SHAPES_ADDED, [shape])
+
+    def _add_shape(self, shape: Shape):
+        box = shape.get_bounding_box()
         self.m_shapes.append(shape)
+        self.m_shape_index.insert(shape, box)
+        self._grow_extents(box)
+
+    # --- NEW ---
+    def remove_shape(self, shape: Shape):
+        self.remove_shapes([shape])
+
+    def remove_shapes(self, shapes: list[Shape]):
+        """Bulk remove: one pass over the shape list and a single SHAPES_REMOVED."""
+        shapes = [shape for shape in shapes if shape in self.m_shape_index]
+        if not shapes:
+            return
+        removed = set(shapes)
+        self.m_shapes = [shape for shape in self.m_shapes if shape not in removed]
+        for shape in shapes:
+            self.m_shape_index.remove(shape)
+        self.m_extents = None
+        self._invalidate_graph(shapes)
+        deselected = [shape for shape in shapes if self.m_selected_shapes.pop(shape, None)]
+        if deselected:
+            self._notify(ModelEvents.SELECTION_CHANGED, deselected)
+        self._notify(ModelEvents.SHAPES_REMOVED, shapes)
+
+    def notify_shapes_modified(self, shapes: list[Shape]):
+        """
+        Call after changing the control points of shapes in the model:
+        refreshes their tessellation and index entries, then tells observers.
+        """
+        for shape in shapes:
+            if hasattr(shape, 'invalidate_tessellation'):
+                shape.invalidate_tessellation()
+            shape.mark_modified()
+            self.m_shape_index.update(shape, shape.get_bounding_box())
+        self.m_extents = None
+        self._invalidate_graph(shapes)
+        self._notify(ModelEvents.SHAPES_MODIFIED, shapes)
+
+    def move_control_point(self, shape: Shape, index: int, x: float, y: float):
+        """Moves one control point of a shape in the model (e.g. while dragging it)."""
+        point = shape.get_control_points()[index]
+        point.setX(x)
+        point.setY(y)
+        self.notify_shapes_modified([shape])
+
+    def apply_transform(self, shapes: list[Shape], matrix: tuple):
+        """
+        Applies an affine matrix (see MyTransforms) to shapes in the model as
+        one bulk edit: the points move in one array operation, the index is
+        refreshed in one pass and observers get a single SHAPES_MODIFIED.
+        """
+        shapes = [shape for shape in shapes if shape in self.m_shape_index]
+        if not shapes:
+            return
+        boxes = transform_shapes(shapes, matrix)
+        self.m_shape_index.update_many(list(zip(shapes, boxes)))
+        self.m_extents = None
+        self._invalidate_graph(shapes)
+        self._notify(ModelEvents.SHAPES_MODIFIED, shapes)
+
+    # --- NEW ---
+    def add_shapes(self, shapes: list[Shape], tessellate=True):
+        """
+        Bulk add. With tessellate, curves are tessellated up front in batches
+        per shape type (vectorized when numpy is available); otherwise they
+        stay lazy until first drawn.
+        """
+        if tessellate:
+            tessellate_shapes(shapes)
+        for shape in shapes:
+            self._add_shape(shape)
+        self._notify(ModelEvents.SHAPES_ADDED, shapes) # One event for the whole batch
+
+    # --- NEW ---
+    def get_shape_index(self) -> GridIndex:
+        return self.m_shape_index
+
+    def query_shapes_in_box(self, xmin: float, xmax: float, ymin: float, ymax: float,
+                            crossing=False) -> list[Shape]:
+        """
+        Window query: shapes lying fully inside the box.
+        With crossing=True, shapes that touch the box at all are also returned.
+        Candidates come from the spatial index, not from a scan of all shapes.
+        """
+        hits = []
+        for shape in self.m_shape_index.query_box(xmin, xmax, ymin, ymax):
+            s_xmin, s_xmax, s_ymin, s_ymax = self.m_shape_index.get_box(shape)
+            if xmin <= s_xmin and s_xmax <= xmax and ymin <= s_ymin and s_ymax <= ymax:
+                hits.append(shape) # Fully inside: a hit in both modes
+                continue
+            if not crossing:
+                continue
+            points = shape.get_tessellated_points()
+            if len(points) == 1:
+                continue # A single point outside the window can't touch it
+            for i in range(len(points) - 1):
+                if segment_intersects_box(points[i], points[i + 1], xmin, xmax, ymin, ymax):
+                    hits.append(shape)
+                    break
+        return hits
 
     def add_to_selection(self, shape: Shape):
         if shape not in self.m_selected_shapes:
-            self.m_selected_shapes.append(shape)
+            self.m_selected_shapes[shape] = True
+            self._notify(ModelEvents.SELECTION_CHANGED, [shape])
 
     def remove_from_selection(self, shape: Shape):
-        if shape in self.m_selected_shapes:
-            self.m_selected_shapes.remove(shape)
+        if self.m_selected_shapes.pop(shape, None):
+            self._notify(ModelEvents.SELECTION_CHANGED, [shape])
 
     def clear_selection(self):
+        deselected = list(self.m_selected_shapes)
         self.m_selected_shapes.clear()
         self.clear_intersections()
+        self.clear_found_faces() # Faces are only meaningful with their graph
         self.clear_graph() # --- NEW ---
+        if deselected:
+            self._notify(ModelEvents.SELECTION_CHANGED, deselected)
 
     def isEmpty(self):
         return len(self.m_shapes) == 0
@@ -75,22 +371,15 @@ class MyModel:
         # ... (this function is unchanged)
         if self.isEmpty():
             return -1000.0, 1000.0, -1000.0, 1000.0
-        
-        first_shape = self.m_shapes[0]
-        xmin, xmax, ymin, ymax = first_shape.get_bounding_box()
-        if xmin == xmax and ymin == ymax: 
-            xmin, xmax, ymin, ymax = first_shape.get_control_points()[0].getX(), \
-                                     first_shape.get_control_points()[0].getX(), \
-                                     first_shape.get_control_points()[0].getY(), \
-                                     first_shape.get_control_points()[0].getY()
-
-        for i in range(1, len(self.m_shapes)):
-            s_xmin, s_xmax, s_ymin, s_ymax = self.m_shapes[i].get_bounding_box()
-            if s_xmin < xmin: xmin = s_xmin
-            if s_xmax > xmax: xmax = s_xmax
-            if s_ymin < ymin: ymin = s_ymin
-            if s_ymax > ymax: ymax = s_ymax
-            
+
+        # --- MODIFIED ---: Extents are kept up to date as shapes are added,
+        # and only rescanned (from the index) after a removal or an edit
+        if self.m_extents is None:
+            boxes = [self.m_shape_index.get_box(shape) for shape in self.m_shapes]
+            self.m_extents = (min(b[0] for b in boxes), max(b[1] for b in boxes),
+                              min(b[2] for b in boxes), max(b[3] for b in boxes))
+        xmin, xmax, ymin, ymax = self.m_extents
+
         if abs(xmin - xmax) < 1e-6:
             xmin -= 1.0
             xmax += 1.0
@@ -103,7 +392,11 @@ class MyModel:
     def clear(self):
         """Removes all shapes from the model."""
         self.m_shapes.clear()
-        self.clear_selection() # This already clears intersections and graph
+        self.m_shape_index.clear()
+        self.m_extents = None
+        self.clear_boolean_results()
+        self.clear_selection() # This already clears intersections, graph and faces
+        self._notify(ModelEvents.CLEARED)
 
     def find_closest_shape(self, query_point: MyPoint, tolerance: float):
         # ... (this function is unchanged)
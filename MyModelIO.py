@@ -0,0 +1,169 @@
+# MyModelIO.py
+import json
+from MyShapes import (
+    MyPoint, MyLine, MyPolyline, MyQuadBezier, MyCubicBezier, MyCircle,
+    MyCircleArc, MyPolygon, CurveShape, Shape
+)
+
+# Drawings are JSON lines: a header line, then one shape per line, so a
+# file can be read (and shown) a chunk at a time.
+FORMAT_NAME = "MyGLDrawer"
+FORMAT_VERSION = 1
+
+SHAPE_TYPES = {
+    'line': MyLine,
+    'polyline': MyPolyline,
+    'quad_bezier': MyQuadBezier,
+    'cubic_bezier': MyCubicBezier,
+    'circle': MyCircle,
+    'arc': MyCircleArc,
+    'polygon': MyPolygon,
+}
+_TYPE_NAMES = {shape_type: name for name, shape_type in SHAPE_TYPES.items()}
+
+# (min, max) control points per type; None: no maximum
+_POINT_COUNTS = {
+    MyLine: (2, 2),
+    MyPolyline: (2, None),
+    MyQuadBezier: (3, 3),
+    MyCubicBezier: (4, 4),
+    MyCircle: (1, 1),
+    MyCircleArc: (3, 3),
+    MyPolygon: (3, None),
+}
+
+def shape_to_record(shape: Shape) -> dict:
+    record = {
+        'type': _TYPE_NAMES[type(shape)],
+        'points': [[p.getX(), p.getY()] for p in shape.get_control_points()],
+    }
+    if isinstance(shape, MyCircle):
+        record['radius'] = shape.radius
+    if isinstance(shape, CurveShape):
+        record['steps'] = shape.get_steps()
+    if isinstance(shape, MyPolygon) and shape.get_holes():
+        record['holes'] = [[[p.getX(), p.getY()] for p in hole] for hole in shape.get_holes()]
+    return record
+
+def _number(value) -> float:
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        raise ValueError(f"Not a number: {value!r}")
+    return float(value)
+
+def _points_from(values) -> list[MyPoint]:
+    if not isinstance(values, list):
+        raise ValueError(f"Points must be a list, not {values!r}")
+    points = []
+    for value in values:
+        if not isinstance(value, list) or len(value) != 2:
+            raise ValueError(f"Bad point: {value!r}")
+        points.append(MyPoint(_number(value[0]), _number(value[1])))
+    return points
+
+def shape_from_record(record: dict) -> Shape:
+    """Builds the shape of a record; raises ValueError if the record isn't a valid shape."""
+    if not isinstance(record, dict):
+        raise ValueError(f"A shape record must be an object, not {record!r}")
+    shape_type = SHAPE_TYPES.get(record.get('type'))
+    if shape_type is None:
+        raise ValueError(f"Unknown shape type: {record.get('type')!r}")
+    if 'points' not in record:
+        raise ValueError(f"{record['type']} record without points")
+    points = _points_from(record['points'])
+    min_count, max_count = _POINT_COUNTS[shape_type]
+    if len(points) < min_count or (max_count is not None and len(points) > max_count):
+        raise ValueError(f"{record['type']} record with {len(points)} points")
+    steps = record.get('steps')
+    if steps is not None and (not isinstance(steps, int) or isinstance(steps, bool) or steps < 1):
+        raise ValueError(f"Bad step count: {steps!r}")
+
+    if shape_type is MyPolyline:
+        return MyPolyline(points)
+    if shape_type is MyPolygon:
+        holes = record.get('holes', [])
+        if not isinstance(holes, list):
+            raise ValueError(f"Holes must be a list, not {holes!r}")
+        return MyPolygon(points, [_points_from(hole) for hole in holes])
+    if shape_type is MyCircle:
+        if 'radius' not in record:
+            raise ValueError("circle record without radius")
+        return MyCircle(points[0], _number(record['radius']), steps or 40)
+    if shape_type is MyLine:
+        return MyLine(*points)
+    return shape_type(*points, steps=steps) if steps is not None else shape_type(*points)
+
+def save_shapes(path: str, shapes) -> int:
+    """Writes shapes (any iterable) as a drawing. Returns how many were written."""
+    count = 0
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(json.dumps({'format': FORMAT_NAME, 'version': FORMAT_VERSION}) + '\n')
+        for shape in shapes:
+            f.write(json.dumps(shape_to_record(shape), separators=(',', ':')) + '\n')
+            count += 1
+    return count
+
+def _iter_records(path: str):
+    """Yields (line number, record) for every shape line, after checking the header."""
+    with open(path, 'r', encoding='utf-8') as f:
+        try:
+            header = json.loads(f.readline() or '{}')
+        except ValueError as e:
+            raise ValueError(f"{path} is not a {FORMAT_NAME} drawing ({e})") from e
+        if not isinstance(header, dict) or header.get('format') != FORMAT_NAME:
+            raise ValueError(f"{path} is not a {FORMAT_NAME} drawing")
+        if header.get('version', 0) > FORMAT_VERSION:
+            raise ValueError(f"{path} needs a newer version (format {header.get('version')})")
+        for line_number, line in enumerate(f, 2):
+            if not line.strip():
+                continue
+            try:
+                yield line_number, json.loads(line)
+            except ValueError as e:
+                raise ValueError(f"{path}:{line_number}: {e}") from e
+
+def iter_shape_chunks(path: str, first_chunk_size=1000, max_chunk_size=20000):
+    """
+    Yields the shapes of a drawing as lists. The first chunk is small so
+    something can be shown quickly; later chunks double up to max_chunk_size.
+    """
+    chunk = []
+    chunk_size = first_chunk_size
+    for line_number, record in _iter_records(path):
+        try:
+            chunk.append(shape_from_record(record))
+        except (ValueError, KeyError, TypeError) as e:
+            raise ValueError(f"{path}:{line_number}: {e}") from e
+        if len(chunk) >= chunk_size:
+            yield chunk
+            chunk = []
+            chunk_size = min(chunk_size * 2, max_chunk_size)
+    if chunk:
+        yield chunk
+
+def scan_drawing(path: str) -> (tuple, int):
+    """
+    Extents and shape count of a drawing, from its records alone (no shapes
+    are built). Arcs and Beziers are boxed by their control points.
+    """
+    count = 0
+    xmin = ymin = float('inf')
+    xmax = ymax = float('-inf')
+    for line_number, record in _iter_records(path):
+        try:
+            if not isinstance(record, dict):
+                raise ValueError(f"A shape record must be an object, not {record!r}")
+            r = float(record.get('radius', 0.0))
+            for x, y in record['points']:
+                xmin, xmax = min(xmin, x - r), max(xmax, x + r)
+                ymin, ymax = min(ymin, y - r), max(ymax, y + r)
+        except (ValueError, KeyError, TypeError) as e:
+            raise ValueError(f"{path}:{line_number}: {e}") from e
+        count += 1
+    return ((xmin, xmax, ymin, ymax) if count else None), count
+
+def load_shapes(path: str) -> list[Shape]:
+    """Reads a whole drawing at once (see LoadManager for progressive loading)."""
+    shapes = []
+    for chunk in iter_shape_chunks(path):
+        shapes.extend(chunk)
+    return shapes
@@ -0,0 +1,179 @@
+# MyRegionCache.py
+import hashlib
+import json
+import os
+import tempfile
+from MyShapes import MyPoint, MyPolygon, CurveShape, MyCircle, Shape
+from MyGraph import MyGraph, GraphNode, GraphEdge
+
+# Bump when the build or the record layout changes: old entries then just miss
+REGION_CACHE_VERSION = 3
+
+def default_cache_dir() -> str:
+    return os.path.join(os.path.expanduser('~'), '.cache', 'MyGLDrawer', 'regions')
+
+def _shape_digest(shape: Shape) -> bytes:
+    """Hash of what a shape contributes to a build: type, control geometry, tessellation parameters."""
+    parts = [type(shape).__name__, [(p.getX(), p.getY()) for p in shape.get_control_points()]]
+    if isinstance(shape, MyCircle):
+        parts.append(shape.radius)
+    if isinstance(shape, CurveShape):
+        parts.append(shape.get_steps())
+    if isinstance(shape, MyPolygon):
+        parts.append([[(p.getX(), p.getY()) for p in hole] for hole in shape.get_holes()])
+    return hashlib.sha256(repr(parts).encode()).digest()
+
+def region_key(shapes: list[Shape], epsilon: float, tolerance: float, simplify_chains: bool) -> str:
+    """
+    Stable key of a region build: the build parameters and the shapes'
+    geometry, in any order (the same shapes selected differently build
+    the same regions).
+    """
+    h = hashlib.sha256(repr((REGION_CACHE_VERSION, epsilon, tolerance, simplify_chains)).encode())
+    for digest in sorted(_shape_digest(shape) for shape in shapes):
+        h.update(digest)
+    return h.hexdigest()
+
+# --- Records: plain lists and numbers, stored as JSON ---
+
+def _coords(points: list[MyPoint]) -> list[tuple]:
+    return [(p.getX(), p.getY()) for p in points]
+
+def _points(coords: list[tuple]) -> list[MyPoint]:
+    return [MyPoint(x, y) for x, y in coords]
+
+def regions_to_record(graph: MyGraph, intersection_points: list[MyPoint],
+                      faces: list[MyPolygon], parents: list[int]) -> dict:
+    node_index = {id(node): i for i, node in enumerate(graph.get_nodes())}
+    return {
+        'version': REGION_CACHE_VERSION,
+        'epsilon': graph.epsilon,
+        'tolerance': graph.tolerance,
+        'nodes': _coords([node.point for node in graph.get_nodes()]),
+        'edges': [(node_index[id(e.n1)], node_index[id(e.n2)], _coords(e.path)) for e in graph.get_edges()],
+        'intersections': _coords(intersection_points),
+        'faces': [(_coords(face.get_tessellated_points()), [_coords(hole) for hole in face.get_holes()],
+                   face.get_triangles(), parent) for face, parent in zip(faces, parents)],
+    }
+
+def regions_from_record(record: dict) -> (MyGraph, list[MyPoint], list[MyPolygon], list[int]):
+    graph = MyGraph(record['epsilon'], record['tolerance'])
+    nodes = [GraphNode(MyPoint(x, y)) for x, y in record['nodes']]
+    for node in nodes:
+        graph.nodes.append(node)
+        graph.node_cells.setdefault(graph._cell_of(node.point), []).append(node)
+    # Edges go in as they were: compound edges may share both end nodes
+    for i1, i2, path in record['edges']:
+        edge = GraphEdge(nodes[i1], nodes[i2], _points(path))
+        graph.edges.append(edge)
+        nodes[i1].edges.append(edge)
+        nodes[i2].edges.append(edge)
+        graph.edge_keys.add((id(edge.n1), id(edge.n2)) if id(edge.n1) < id(edge.n2) else (id(edge.n2), id(edge.n1)))
+
+    faces, parents = [], []
+    for outline, holes, triangles, parent in record['faces']:
+        face = MyPolygon(_points(outline), [_points(hole) for hole in holes])
+        face.set_triangles([tuple(t) for t in triangles] if triangles is not None else None)
+        faces.append(face)
+        parents.append(parent)
+    return graph, _points(record['intersections']), faces, parents
+
+class RegionCache():
+    """
+    On-disk cache of region builds (graph, intersection points and faces),
+    one JSON file per key in a directory. Hits refresh the file's time,
+    and once the directory holds more than max_bytes the least recently
+    used files are deleted. A file that can't be read or rebuilt is a
+    miss, and is deleted.
+    """
+    def __init__(self, directory: str = None, max_bytes=256 * 1024 * 1024):
+        self.m_directory = directory or default_cache_dir()
+        self.m_max_bytes = max_bytes
+        self.m_hits = 0
+        self.m_misses = 0
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.m_directory, key + '.regions')
+
+    def load(self, key: str) -> (MyGraph, list[MyPoint], list[MyPolygon], list[int]):
+        """The cached build for key, or None."""
+        path = self._path(key)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                record = json.load(f)
+            if not isinstance(record, dict) or record.get('version') != REGION_CACHE_VERSION:
+                raise ValueError("not a current cache entry")
+            result = regions_from_record(record)
+            os.utime(path) # Most recently used
+        except FileNotFoundError:
+            self.m_misses += 1
+            return None
+        except Exception as e: # Whatever is wrong with the entry, it is only a miss
+            print(f"Ignoring region cache entry {path}: {e!r}")
+            self._remove(path)
+            self.m_misses += 1
+            return None
+        self.m_hits += 1
+        return result
+
+    def store(self, key: str, graph: MyGraph, intersection_points: list[MyPoint],
+              faces: list[MyPolygon], parents: list[int]):
+        """Saves a build (faces triangulated already, so loading skips that too)."""
+        record = regions_to_record(graph, intersection_points, faces, parents)
+        tmp_path = None
+        try:
+            os.makedirs(self.m_directory, exist_ok=True)
+            # Write aside and rename, so a reader never sees half a file
+            fd, tmp_path = tempfile.mkstemp(dir=self.m_directory, suffix='.tmp')
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(record, f, separators=(',', ':'))
+            os.replace(tmp_path, self._path(key))
+        except (OSError, ValueError) as e:
+            print(f"Could not write the region cache: {e}")
+            if tmp_path is not None:
+                self._remove(tmp_path)
+            return
+        self.evict()
+
+    def evict(self):
+        """Deletes the least recently used entries until the directory fits in max_bytes."""
+        entries = []
+        try:
+            for entry in os.scandir(self.m_directory):
+                if entry.name.endswith('.regions') and entry.is_file():
+                    stat = entry.stat()
+                    entries.append((stat.st_mtime, stat.st_size, entry.path))
+        except OSError:
+            return
+        total = sum(size for mtime, size, path in entries)
+        for mtime, size, path in sorted(entries):
+            if total <= self.m_max_bytes:
+                break
+            self._remove(path)
+            total -= size
+
+    @staticmethod
+    def _remove(path: str):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+    def clear(self):
+        try:
+            names = os.listdir(self.m_directory)
+        except OSError:
+            return
+        for name in names:
+            if name.endswith('.regions'):
+                self._remove(os.path.join(self.m_directory, name))
+
+    def get_stats(self) -> dict:
+        lookups = self.m_hits + self.m_misses
+        return {
+            'hits': self.m_hits,
+            'misses': self.m_misses,
+            'hit_rate': self.m_hits / lookups if lookups else 0.0,
+            'directory': self.m_directory,
+            'max_bytes': self.m_max_bytes,
+        }
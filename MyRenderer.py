@@ -0,0 +1,265 @@
+# MyRenderer.py
+import time
+from OpenGL.GL import *
+from MyShapes import PrimitiveKinds, Shape
+from MyModel import ModelEvents
+
+# The geometry core (MyShapes, MyGeometry, MyGraph, MyModel) has no GL
+# dependency; this module maps its primitive kinds to OpenGL.
+GL_PRIMITIVES = {
+    PrimitiveKinds.LINES: GL_LINES,
+    PrimitiveKinds.LINE_STRIP: GL_LINE_STRIP,
+    PrimitiveKinds.LINE_LOOP: GL_LINE_LOOP,
+    PrimitiveKinds.TRIANGLE_FAN: GL_TRIANGLE_FAN,
+}
+
+def get_gl_primitive(shape: Shape):
+    """Returns the OpenGL primitive type for drawing the shape (e.g., GL_LINES)."""
+    return GL_PRIMITIVES[shape.get_primitive_kind()]
+
+def _to_gl_array(values: list[float]):
+    return (GLfloat * len(values))(*values) if values else None
+
+def _draw_array(primitive, array, runs: list[tuple[int, int]] = None):
+    """Draws the whole array, or only the (first vertex, count) runs given."""
+    if array is not None:
+        glVertexPointer(2, GL_FLOAT, 0, array)
+        if runs is None:
+            glDrawArrays(primitive, 0, len(array) // 2)
+        else:
+            for first, count in runs:
+                glDrawArrays(primitive, first, count)
+
+def unroll_primitive(shape: Shape, points: list) -> (list[float], list[float]):
+    """
+    Flattens a shape's points into ([triangle coords], [GL_LINES coords]),
+    so shapes of every primitive kind can share two draw calls.
+    """
+    triangles, lines = [], []
+    kind = shape.get_primitive_kind()
+    xy = [(p.getX(), p.getY()) for p in points]
+    if kind == PrimitiveKinds.TRIANGLE_FAN:
+        for i in range(1, len(xy) - 1):
+            triangles += (*xy[0], *xy[i], *xy[i + 1])
+    elif kind == PrimitiveKinds.LINES:
+        for i in range(0, len(xy) - 1, 2):
+            lines += (*xy[i], *xy[i + 1])
+    else:
+        for i in range(len(xy) - 1):
+            lines += (*xy[i], *xy[i + 1])
+        if kind == PrimitiveKinds.LINE_LOOP and len(xy) > 2:
+            lines += (*xy[-1], *xy[0])
+    return triangles, lines
+
+class ShapeBatch():
+    """
+    Packed vertex arrays of one group of shapes, for one zoom bucket.
+    Shapes added later (see ShapeBatchRenderer's growing group) are packed
+    as extra parts instead of rebuilding the arrays already made. Removed
+    shapes stay in the arrays but are drawn around, until the batch is
+    rebuilt.
+    """
+    def __init__(self, zoom_bucket: int):
+        self.m_zoom_bucket = zoom_bucket
+        self.m_shapes = set() # What the arrays were built from
+        self.m_parts = [] # (triangles, lines, points, control_points) GL arrays
+        self.m_pending: list[Shape] = [] # Added to the group, not packed yet
+        self.m_triangles = [] # Filled shapes (triangle fans, unrolled)
+        self.m_lines = [] # Every outline as GL_LINES segments
+        self.m_points = [] # Sub-pixel shapes
+        self.m_control_points = []
+        self.m_ranges: dict[Shape, tuple] = {} # shape -> (part, its (start, end) vertices in each array)
+        self.m_hidden: dict[int, list] = {} # part -> vertex ranges of the shapes removed from it
+        self.m_runs: dict[int, list] = {} # part -> per array, the (first, count) runs still drawn
+        self.m_removed_count = 0
+
+    def _vertex_counts(self) -> tuple:
+        return (len(self.m_triangles) // 2, len(self.m_lines) // 2,
+                len(self.m_points) // 2, len(self.m_control_points) // 2)
+
+    def add_shape(self, shape: Shape, points: list, is_sub_pixel: bool):
+        self.m_shapes.add(shape)
+        starts = self._vertex_counts()
+        if is_sub_pixel:
+            for p in points:
+                self.m_points += (p.getX(), p.getY())
+        else:
+            triangles, lines = unroll_primitive(shape, points)
+            self.m_triangles += triangles
+            self.m_lines += lines
+            for p in shape.get_control_points():
+                self.m_control_points += (p.getX(), p.getY())
+        # The next pack() makes part len(m_parts)
+        self.m_ranges[shape] = (len(self.m_parts), tuple(zip(starts, self._vertex_counts())))
+
+    def remove_shapes(self, shapes: list[Shape]):
+        """Takes shapes out of the batch without repacking: their vertices are skipped when drawing."""
+        if self.m_pending:
+            removed = set(shapes)
+            self.m_pending = [s for s in self.m_pending if s not in removed]
+        for shape in shapes:
+            entry = self.m_ranges.pop(shape, None)
+            if entry is None:
+                continue
+            self.m_shapes.discard(shape)
+            part, ranges = entry
+            self.m_hidden.setdefault(part, []).append(ranges)
+            self.m_runs.pop(part, None)
+            self.m_removed_count += 1
+
+    def get_part_runs(self, part: int) -> tuple:
+        """Per array of the part, the (first, count) vertex runs to draw, or None to draw it all."""
+        hidden = self.m_hidden.get(part)
+        if not hidden:
+            return (None, None, None, None)
+        runs = self.m_runs.get(part)
+        if runs is None:
+            runs = []
+            for k, array in enumerate(self.m_parts[part]):
+                total = len(array) // 2 if array is not None else 0
+                array_runs, first = [], 0
+                for start, end in sorted(r[k] for r in hidden):
+                    if start > first:
+                        array_runs.append((first, start - first))
+                    first = max(first, end)
+                if total > first:
+                    array_runs.append((first, total - first))
+                runs.append(array_runs)
+            runs = tuple(runs)
+            self.m_runs[part] = runs
+        return runs
+
+    def pack(self):
+        """Converts the coordinates added since the last pack into a new part of GL arrays."""
+        self.m_parts.append((_to_gl_array(self.m_triangles), _to_gl_array(self.m_lines),
+                             _to_gl_array(self.m_points), _to_gl_array(self.m_control_points)))
+        self.m_triangles, self.m_lines, self.m_points, self.m_control_points = [], [], [], []
+
+class ShapeBatchRenderer():
+    """
+    Draws groups of shapes (e.g. unselected / selected) with one state setup
+    and a handful of glDrawArrays calls per group, instead of switching
+    color and point size for every shape. The packed arrays of a group are
+    kept until the model changes (see on_model_event) or the zoom bucket
+    of the level-of-detail changes. Edits only rebuild the groups holding
+    the edited shapes, so a shape being dragged is best drawn in a group
+    of its own. New shapes are appended to the growing group (the one
+    they belong to, e.g. 'unselected'), leaving the other groups alone;
+    each draw packs them for at most append_budget_ms, so a stream of new
+    shapes (e.g. a file being loaded) shows up over several frames.
+    """
+    def __init__(self, lod_manager, growing_group: str = None, append_budget_ms=20.0):
+        self.m_lod_manager = lod_manager
+        self.m_growing_group = growing_group
+        self.m_append_budget = append_budget_ms / 1000.0
+        self.m_batches: dict[str, ShapeBatch] = {}
+        self.m_selection_groups = None # (selected group, unselected group, is_selected)
+        self.m_unfinished: set[str] = set() # Drawn groups that still had shapes to pack
+
+    def set_selection_groups(self, selected_group: str, unselected_group: str, is_selected):
+        """
+        Lets selection changes move just the shapes concerned between the
+        two groups, instead of dropping every group. is_selected(shape)
+        gives a shape's state after the change.
+        """
+        self.m_selection_groups = (selected_group, unselected_group, is_selected)
+
+    def has_pending(self) -> bool:
+        """True if a group drawn last still has added shapes to pack (draw again to show them)."""
+        return bool(self.m_unfinished)
+
+    def invalidate(self, group: str = None):
+        """Drops the arrays of one group, or of every group."""
+        if group is None:
+            self.m_batches.clear()
+            self.m_unfinished.clear()
+        else:
+            self.m_batches.pop(group, None)
+            self.m_unfinished.discard(group)
+
+    def on_model_event(self, event, shapes):
+        """
+        Model observer: edits drop the groups that contain the shapes,
+        removed shapes are taken out of every group (packed or pending),
+        added shapes are queued on the growing group, selection
+        changes move the shapes between the selection groups (see
+        set_selection_groups), and anything else drops every group.
+        """
+        if event == ModelEvents.SHAPES_MODIFIED:
+            # Shapes still pending get packed with their new geometry anyway
+            for group, batch in list(self.m_batches.items()):
+                if any(shape in batch.m_shapes for shape in shapes):
+                    self.invalidate(group)
+        elif event == ModelEvents.SHAPES_REMOVED:
+            for batch in self.m_batches.values():
+                batch.remove_shapes(shapes)
+        elif event == ModelEvents.SHAPES_ADDED and self.m_growing_group is not None:
+            batch = self.m_batches.get(self.m_growing_group)
+            if batch is not None:
+                batch.m_pending.extend(shapes)
+        elif event == ModelEvents.SELECTION_CHANGED and self.m_selection_groups is not None:
+            selected_group, unselected_group, is_selected = self.m_selection_groups
+            selected = [shape for shape in shapes if is_selected(shape)]
+            deselected = [shape for shape in shapes if not is_selected(shape)]
+            self._move_shapes(unselected_group, selected_group, selected)
+            self._move_shapes(selected_group, unselected_group, deselected)
+        elif event == ModelEvents.GRAPH_CHANGED:
+            pass # The arrays don't depend on the graph
+        else:
+            self.invalidate()
+
+    def _move_shapes(self, from_group: str, to_group: str, shapes: list[Shape]):
+        if not shapes:
+            return
+        batch = self.m_batches.get(from_group)
+        if batch is not None:
+            batch.remove_shapes(shapes)
+        batch = self.m_batches.get(to_group)
+        if batch is not None: # Otherwise the group is built whole when next drawn
+            batch.m_pending.extend(shapes)
+
+    def get_batch(self, group: str, get_shapes, world_per_pixel: float) -> ShapeBatch:
+        """get_shapes is only called when the group's arrays must be rebuilt."""
+        zoom_bucket = self.m_lod_manager.get_zoom_bucket(world_per_pixel)
+        batch = self.m_batches.get(group)
+        # Rebuilt once more shapes were removed than are left, so skipping them stays cheap
+        if batch is None or batch.m_zoom_bucket != zoom_bucket or batch.m_removed_count > max(len(batch.m_shapes), 64):
+            batch = ShapeBatch(zoom_bucket)
+            for shape in get_shapes():
+                batch.add_shape(shape, *self.m_lod_manager.get_render_points(shape, world_per_pixel))
+            batch.pack()
+            self.m_batches[group] = batch
+            self.m_unfinished.discard(group)
+        elif batch.m_pending:
+            deadline = time.perf_counter() + self.m_append_budget
+            count = 0
+            for shape in batch.m_pending:
+                batch.add_shape(shape, *self.m_lod_manager.get_render_points(shape, world_per_pixel))
+                count += 1
+                if count % 64 == 0 and time.perf_counter() > deadline:
+                    break
+            batch.m_pending = batch.m_pending[count:]
+            batch.pack()
+            if batch.m_pending:
+                self.m_unfinished.add(group)
+            else:
+                self.m_unfinished.discard(group)
+        return batch
+
+    def draw(self, group: str, get_shapes, world_per_pixel: float,
+             color, line_width: float, control_point_color, control_point_size: float):
+        batch = self.get_batch(group, get_shapes, world_per_pixel)
+        glEnableClientState(GL_VERTEX_ARRAY)
+        glColor3f(*color)
+        glLineWidth(line_width)
+        glPointSize(1.0)
+        for part, (triangles, lines, points, control_points) in enumerate(batch.m_parts):
+            runs = batch.get_part_runs(part)
+            _draw_array(GL_TRIANGLES, triangles, runs[0])
+            _draw_array(GL_LINES, lines, runs[1])
+            _draw_array(GL_POINTS, points, runs[2])
+        glColor3f(*control_point_color)
+        glPointSize(control_point_size)
+        for part, (triangles, lines, points, control_points) in enumerate(batch.m_parts):
+            _draw_array(GL_POINTS, control_points, batch.get_part_runs(part)[3])
+        glDisableClientState(GL_VERTEX_ARRAY)
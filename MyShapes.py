@@ -1,10 +1,91 @@
 # MyShapes.py
 from abc import ABC, abstractmethod
-from OpenGL.GL import *
+from enum import Enum
+import itertools
 import math
+from MyTessellationCache import TESSELLATION_CACHE
+
+_numpy = None
+
+def _get_numpy():
+    """
+    numpy is optional and only needed by batch tessellation, so it is
+    imported on first use. Returns None if it isn't installed.
+    """
+    global _numpy
+    if _numpy is None:
+        try:
+            import numpy
+            _numpy = numpy
+        except ImportError: # Batch tessellation falls back to one shape at a time
+            _numpy = False
+    return _numpy or None
 
 # --- NEW HELPER FUNCTIONS ---
 
+# Geometry tessellation never goes beyond this many segments per curve
+MAX_GEOMETRY_STEPS = 4096
+
+def arc_steps_for_tolerance(radius: float, sweep: float, tolerance: float, min_steps=1) -> int:
+    """
+    Segments for an arc of the given sweep (radians) so that the chord
+    error r * (1 - cos(a / 2)) of each segment stays within tolerance.
+    """
+    if radius <= 0.0:
+        return min_steps
+    max_angle = 2.0 * math.acos(max(-1.0, 1.0 - tolerance / radius))
+    steps = math.ceil(sweep / max_angle) if max_angle > 0.0 else MAX_GEOMETRY_STEPS
+    return min(max(steps, min_steps), MAX_GEOMETRY_STEPS)
+
+def bezier_steps_for_tolerance(control_points: list['MyPoint'], tolerance: float) -> int:
+    """
+    Uniform segments for a Bezier of any degree within tolerance (Wang's
+    formula): n = sqrt(d * (d - 1) * M / (8 * tolerance)), with M the
+    largest second difference of the control points.
+    """
+    degree = len(control_points) - 1
+    m = 0.0
+    for p0, p1, p2 in zip(control_points, control_points[1:], control_points[2:]):
+        m = max(m, math.hypot(p0.getX() - 2.0 * p1.getX() + p2.getX(),
+                              p0.getY() - 2.0 * p1.getY() + p2.getY()))
+    if m == 0.0: # Straight
+        return 1
+    steps = math.ceil(math.sqrt(degree * (degree - 1) * m / (8.0 * tolerance)))
+    return min(max(steps, 1), MAX_GEOMETRY_STEPS)
+
+def _bezier_range(c: list[float]) -> (float, float):
+    """Exact range of one coordinate of a quadratic or cubic Bezier: its ends and the roots of its derivative."""
+    if len(c) == 3:
+        # B'(t) / 2 = (c1 - c0) + (c0 - 2 c1 + c2) t
+        a, b = c[0] - 2.0 * c[1] + c[2], c[1] - c[0]
+        roots = [-b / a] if a != 0.0 else []
+    else:
+        # B'(t) / 3 = a t^2 + b t + k
+        a = -c[0] + 3.0 * c[1] - 3.0 * c[2] + c[3]
+        b = 2.0 * (c[0] - 2.0 * c[1] + c[2])
+        k = c[1] - c[0]
+        if abs(a) < 1e-12 * (abs(b) + abs(k) + 1e-300):
+            roots = [-k / b] if b != 0.0 else []
+        else:
+            disc = b * b - 4.0 * a * k
+            roots = [] if disc < 0.0 else [(-b + sign * math.sqrt(disc)) / (2.0 * a) for sign in (-1.0, 1.0)]
+    lo, hi = min(c[0], c[-1]), max(c[0], c[-1])
+    for t in roots:
+        if 0.0 < t < 1.0:
+            inv_t = 1.0 - t
+            if len(c) == 3:
+                v = inv_t**2 * c[0] + 2.0 * inv_t * t * c[1] + t**2 * c[2]
+            else:
+                v = inv_t**3 * c[0] + 3.0 * inv_t**2 * t * c[1] + 3.0 * inv_t * t**2 * c[2] + t**3 * c[3]
+            lo, hi = min(lo, v), max(hi, v)
+    return lo, hi
+
+def bezier_bounding_box(control_points: list['MyPoint']) -> (float, float, float, float):
+    """Tight (xmin, xmax, ymin, ymax) of a quadratic or cubic Bezier, not just its control points' hull."""
+    xmin, xmax = _bezier_range([p.getX() for p in control_points])
+    ymin, ymax = _bezier_range([p.getY() for p in control_points])
+    return xmin, xmax, ymin, ymax
+
 def point_dist_sq(p1: 'MyPoint', p2: 'MyPoint') -> float:
     """Calculates the squared distance between two MyPoint objects."""
     dx = p1.getX() - p2.getX()
@@ -42,6 +123,16 @@ def check_box_intersection(xmin1, xmax1, ymin1, ymax1, xmin2, xmax2, ymin2, ymax
         return False
     return True # Overlap on both axes
 
+def polygon_signed_area(points: list['MyPoint']) -> float:
+    """Shoelace formula. Positive for counter-clockwise polygons."""
+    area = 0.0
+    n = len(points)
+    for i in range(n):
+        p1 = points[i]
+        p2 = points[(i + 1) % n]
+        area += p1.getX() * p2.getY() - p2.getX() * p1.getY()
+    return area / 2.0
+
 # --- END NEW HELPER FUNCTIONS ---
 
 
@@ -63,22 +154,55 @@ class MyPoint:
     def getY(self):
         return self.m_y
 
+class PrimitiveKinds(Enum):
+    """How a shape's tessellated points are connected (mapped to GL by MyRenderer)."""
+    LINES = 0
+    LINE_STRIP = 1
+    LINE_LOOP = 2
+    TRIANGLE_FAN = 3
+
+_shape_ids = itertools.count(1)
+
 class Shape(ABC):
     """Abstract base class for all shapes."""
     def __init__(self):
         self.control_points = []
+        self._id = next(_shape_ids) # Unique for the session, never reused
+        self._version = 0 # Bumped on every edit (see mark_modified)
 
     def get_control_points(self):
         return self.control_points
 
+    def get_id(self) -> int:
+        return self._id
+
+    def get_version(self) -> int:
+        return self._version
+
+    def mark_modified(self):
+        """Call after changing the shape's geometry, so caches keyed by (id, version) see the change."""
+        self._version += 1
+
     @abstractmethod
     def get_tessellated_points(self):
         """Returns a list of vertices for drawing the shape."""
         pass
 
+    def get_geometry_points(self, tolerance: float = None) -> list[MyPoint]:
+        """
+        Vertices for geometric work (graph building, booleans). Curves are
+        split so that no chord strays more than tolerance (world units)
+        from the true curve; straight shapes are exact already.
+        """
+        return self.get_tessellated_points()
+
+    def is_closed(self) -> bool:
+        """True if the shape bounds a region (used by boolean operations)."""
+        return False
+
     @abstractmethod
-    def get_gl_primitive(self):
-        """Returns the OpenGL primitive type for drawing (e.g., GL_LINES)."""
+    def get_primitive_kind(self) -> PrimitiveKinds:
+        """Returns how the tessellated points are connected (e.g., LINES)."""
         pass
         
     # --- NEW ---
@@ -90,6 +214,13 @@ class Shape(ABC):
         """
         pass
 
+    def get_end_points(self) -> (MyPoint, MyPoint):
+        """First and last tessellated point (None, None if there are none)."""
+        points = self.get_tessellated_points()
+        if not points:
+            return None, None
+        return points[0], points[-1]
+
     def get_bounding_box(self):
         """Calculates the bounding box of the shape's tessellated points."""
         # --- MODIFIED ---: Check control points if tessellated points are empty
@@ -152,8 +283,8 @@ class MyLine(Shape):
     def get_tessellated_points(self):
         return self.control_points
 
-    def get_gl_primitive(self):
-        return GL_LINES
+    def get_primitive_kind(self):
+        return PrimitiveKinds.LINES
 
     # --- NEW ---
     def find_closest_point(self, query_point: MyPoint) -> (MyPoint, float):
@@ -169,88 +300,244 @@ class MyPolyline(Shape):
     def get_tessellated_points(self):
         return self.control_points
 
-    def get_gl_primitive(self):
-        return GL_LINE_STRIP
+    def get_primitive_kind(self):
+        return PrimitiveKinds.LINE_STRIP
+
+    def is_closed(self) -> bool:
+        # A polyline that ends where it started bounds a region
+        pts = self.control_points
+        return len(pts) > 3 and point_dist_sq(pts[0], pts[-1]) < 1e-12
 
     # --- NEW ---
     def find_closest_point(self, query_point: MyPoint) -> (MyPoint, float):
         return self._find_closest_point_on_polyline(query_point, self.control_points, is_loop=False)
 
-class MyQuadBezier(Shape):
-    def __init__(self, p1: MyPoint, p2: MyPoint, p3: MyPoint, steps=20):
+class CurveShape(Shape):
+    """
+    Base class for shapes tessellated from their control points.
+    Tessellation is lazy (done on first access) and shared through the
+    content-addressed TESSELLATION_CACHE, so the returned list must not be
+    modified in place. Many shapes of one type can also be tessellated at
+    once with tessellate_batch().
+    """
+    def __init__(self, steps: int):
         super().__init__()
+        self._steps = steps
+        self._tessellated_points = None
+        self._tessellated_coords = None # (steps+1, 2) slice of a batch buffer
+
+    @abstractmethod
+    def _tessellate(self, steps) -> list[MyPoint]:
+        """Returns a new list of points approximating the curve."""
+        pass
+
+    @classmethod
+    def _tessellate_coords_batch(cls, shapes: list['CurveShape'], steps: int):
+        """
+        Returns an (N, steps+1, 2) array with the tessellation of every shape,
+        or None for shapes the subclass can't batch.
+        """
+        return None
+
+    @classmethod
+    def tessellate_batch(cls, shapes: list['CurveShape'], steps: int):
+        """
+        Tessellates shapes of this type (all with the given step count) in one
+        go. Each shape keeps a slice of the shared result buffer; its MyPoint
+        list is only built when get_tessellated_points() is called.
+        """
+        coords = cls._tessellate_coords_batch(shapes, steps) if _get_numpy() and shapes else None
+        if coords is None:
+            for shape in shapes:
+                shape.get_tessellated_points()
+            return
+        for i, shape in enumerate(shapes):
+            shape.set_tessellated_coords(coords[i])
+
+    def get_tessellated_coords(self):
+        """
+        The current tessellation as an (n, 2) numpy array, without building
+        MyPoints, or None if the shape isn't tessellated. Needs numpy.
+        """
+        if self._tessellated_coords is not None:
+            return self._tessellated_coords
+        if self._tessellated_points is not None:
+            return _get_numpy().array([(p.getX(), p.getY()) for p in self._tessellated_points], dtype=float).reshape(-1, 2)
+        return None
+
+    def set_tessellated_coords(self, coords):
+        """Replaces the tessellation with an (n, 2) array (MyPoints are built lazily)."""
+        self._tessellated_points = None
+        self._tessellated_coords = coords
+
+    def _tessellation_key(self, steps: int):
+        """Shape type, control coordinates and step count."""
+        coords = tuple((p.getX(), p.getY()) for p in self.control_points)
+        return (type(self).__name__, coords, steps)
+
+    def get_tessellated_points(self):
+        if self._tessellated_points is None:
+            if self._tessellated_coords is not None: # From a batch
+                self._tessellated_points = [MyPoint(x, y) for x, y in self._tessellated_coords.tolist()]
+                self._tessellated_coords = None
+            else:
+                self._tessellated_points = TESSELLATION_CACHE.get_or_compute(
+                    self._tessellation_key(self._steps), lambda: self._tessellate(self._steps))
+        return self._tessellated_points
+
+    def get_steps_for_tolerance(self, tolerance: float) -> int:
+        """Step count keeping the chord error within tolerance (subclasses estimate it)."""
+        return self._steps
+
+    def get_geometry_points(self, tolerance: float = None) -> list[MyPoint]:
+        """
+        Tessellation for geometric work, sized by tolerance rather than by
+        the display step count, so small curves get few segments and large
+        ones stay accurate. Without a tolerance it is the display tessellation.
+        Shares TESSELLATION_CACHE, so the list must not be modified either.
+        """
+        if tolerance is None or tolerance <= 0.0:
+            return self.get_tessellated_points()
+        steps = self.get_steps_for_tolerance(tolerance)
+        if steps == self._steps:
+            return self.get_tessellated_points()
+        return TESSELLATION_CACHE.get_or_compute(self._tessellation_key(steps), lambda: self._tessellate(steps))
+
+    def get_end_points(self) -> (MyPoint, MyPoint):
+        if self._tessellated_points is None and self._tessellated_coords is not None:
+            # Don't build every MyPoint of a batch tessellation just for its ends
+            (x0, y0), (x1, y1) = self._tessellated_coords[[0, -1]].tolist()
+            return MyPoint(x0, y0), MyPoint(x1, y1)
+        return super().get_end_points()
+
+    def is_tessellated(self) -> bool:
+        return self._tessellated_points is not None or self._tessellated_coords is not None
+
+    def invalidate_tessellation(self):
+        """Call after the control points changed."""
+        self._tessellated_points = None
+        self._tessellated_coords = None
+
+    def get_steps(self) -> int:
+        return self._steps
+
+    def _control_points_box(self):
+        xs = [p.getX() for p in self.control_points]
+        ys = [p.getY() for p in self.control_points]
+        return min(xs), max(xs), min(ys), max(ys)
+
+class MyQuadBezier(CurveShape):
+    def __init__(self, p1: MyPoint, p2: MyPoint, p3: MyPoint, steps=20):
+        super().__init__(steps)
         self.control_points.extend([p1, p2, p3])
-        self._tessellated_points = []
-        self._tessellate(steps)
 
     def _tessellate(self, steps):
         p0, p1, p2 = self.control_points
+        points = []
         for i in range(steps + 1):
             t = i / steps
             inv_t = 1 - t
             x = (inv_t**2 * p0.getX()) + (2 * inv_t * t * p1.getX()) + (t**2 * p2.getX())
             y = (inv_t**2 * p0.getY()) + (2 * inv_t * t * p1.getY()) + (t**2 * p2.getY())
-            self._tessellated_points.append(MyPoint(x, y))
+            points.append(MyPoint(x, y))
+        return points
 
-    def get_tessellated_points(self):
-        return self._tessellated_points
+    @classmethod
+    def _tessellate_coords_batch(cls, shapes, steps):
+        return _bezier_coords_batch(shapes, steps, 2)
+
+    def get_steps_for_tolerance(self, tolerance):
+        return bezier_steps_for_tolerance(self.control_points, tolerance)
+
+    def get_bounding_box(self):
+        # Exact, from the derivative's roots; no tessellation needed
+        return bezier_bounding_box(self.control_points)
 
-    def get_gl_primitive(self):
-        return GL_LINE_STRIP
+    def get_primitive_kind(self):
+        return PrimitiveKinds.LINE_STRIP
 
     # --- NEW ---
     def find_closest_point(self, query_point: MyPoint) -> (MyPoint, float):
         # Approximate by checking tessellated segments
-        return self._find_closest_point_on_polyline(query_point, self._tessellated_points, is_loop=False)
+        return self._find_closest_point_on_polyline(query_point, self.get_tessellated_points(), is_loop=False)
 
-class MyCubicBezier(Shape):
+class MyCubicBezier(CurveShape):
     def __init__(self, p1: MyPoint, p2: MyPoint, p3: MyPoint, p4: MyPoint, steps=30):
-        super().__init__()
+        super().__init__(steps)
         self.control_points.extend([p1, p2, p3, p4])
-        self._tessellated_points = []
-        self._tessellate(steps)
 
     def _tessellate(self, steps):
         p0, p1, p2, p3 = self.control_points
+        points = []
         for i in range(steps + 1):
             t = i / steps
             inv_t = 1 - t
             x = (inv_t**3 * p0.getX()) + (3 * inv_t**2 * t * p1.getX()) + (3 * inv_t * t**2 * p2.getX()) + (t**3 * p3.getX())
             y = (inv_t**3 * p0.getY()) + (3 * inv_t**2 * t * p1.getY()) + (3 * inv_t * t**2 * p2.getY()) + (t**3 * p3.getY())
-            self._tessellated_points.append(MyPoint(x, y))
+            points.append(MyPoint(x, y))
+        return points
 
-    def get_tessellated_points(self):
-        return self._tessellated_points
+    @classmethod
+    def _tessellate_coords_batch(cls, shapes, steps):
+        return _bezier_coords_batch(shapes, steps, 3)
+
+    def get_steps_for_tolerance(self, tolerance):
+        return bezier_steps_for_tolerance(self.control_points, tolerance)
+
+    def get_bounding_box(self):
+        # Exact, from the derivative's roots; no tessellation needed
+        return bezier_bounding_box(self.control_points)
         
-    def get_gl_primitive(self):
-        return GL_LINE_STRIP
+    def get_primitive_kind(self):
+        return PrimitiveKinds.LINE_STRIP
 
     # --- NEW ---
     def find_closest_point(self, query_point: MyPoint) -> (MyPoint, float):
         # Approximate by checking tessellated segments
-        return self._find_closest_point_on_polyline(query_point, self._tessellated_points, is_loop=False)
+        return self._find_closest_point_on_polyline(query_point, self.get_tessellated_points(), is_loop=False)
 
-class MyCircle(Shape):
+class MyCircle(CurveShape):
     def __init__(self, center: MyPoint, radius: float, steps=40):
-        super().__init__()
+        super().__init__(steps)
         self.control_points.append(center)
         self.radius = radius
-        self._tessellated_points = []
-        self._tessellate(steps)
     
     def _tessellate(self, steps):
         cx, cy = self.control_points[0].getX(), self.control_points[0].getY()
+        points = []
         for i in range(steps + 1):
             angle = 2.0 * math.pi * i / steps
             x = cx + self.radius * math.cos(angle)
             y = cy + self.radius * math.sin(angle)
-            self._tessellated_points.append(MyPoint(x, y))
+            points.append(MyPoint(x, y))
+        return points
+
+    def _tessellation_key(self, steps):
+        return super()._tessellation_key(steps) + (self.radius,)
+
+    def get_steps_for_tolerance(self, tolerance):
+        return arc_steps_for_tolerance(self.radius, 2.0 * math.pi, tolerance, min_steps=3)
+
+    @classmethod
+    def _tessellate_coords_batch(cls, shapes, steps):
+        np = _get_numpy()
+        centers = np.array([(s.control_points[0].getX(), s.control_points[0].getY()) for s in shapes], dtype=float)
+        radii = np.array([s.radius for s in shapes], dtype=float)
+        angles = 2.0 * math.pi * np.arange(steps + 1) / steps
+        coords = np.empty((len(shapes), steps + 1, 2))
+        coords[:, :, 0] = centers[:, 0:1] + radii[:, None] * np.cos(angles)[None, :]
+        coords[:, :, 1] = centers[:, 1:2] + radii[:, None] * np.sin(angles)[None, :]
+        return coords
 
-    def get_tessellated_points(self):
-        return self._tessellated_points
+    def get_bounding_box(self):
+        cx, cy = self.control_points[0].getX(), self.control_points[0].getY()
+        return cx - self.radius, cx + self.radius, cy - self.radius, cy + self.radius
     
-    def get_gl_primitive(self):
-        return GL_LINE_LOOP
+    def get_primitive_kind(self):
+        return PrimitiveKinds.LINE_LOOP
+
+    def is_closed(self) -> bool:
+        return True
 
     # --- NEW ---
     def find_closest_point(self, query_point: MyPoint) -> (MyPoint, float):
@@ -274,14 +561,16 @@ class MyCircle(Shape):
         
         return closest_pt, dist
 
-class MyCircleArc(Shape):
+class MyCircleArc(CurveShape):
     def __init__(self, p_start: MyPoint, p_end: MyPoint, p_on_arc: MyPoint, steps=40):
-        super().__init__()
+        super().__init__(steps)
         self.control_points.extend([p_start, p_end, p_on_arc])
-        self._tessellated_points = []
-        self._calculate_and_tessellate(steps)
 
-    def _calculate_and_tessellate(self, steps):
+    def _get_arc_params(self):
+        """
+        Returns (cx, cy, radius, start_angle, angle_range) of the arc through
+        the three control points, or None if they are collinear.
+        """
         p1, p2, p3 = self.control_points
         x1, y1 = p1.getX(), p1.getY()
         x2, y2 = p2.getX(), p2.getY()
@@ -289,9 +578,8 @@ class MyCircleArc(Shape):
 
         # Denominator for circumcenter calculation
         D = 2 * (x1 * (y2 - y3) + x2 * (y3 - y1) + x3 * (y1 - y2))
-        if abs(D) < 1e-8: # Points are collinear, draw a line
-            self._tessellated_points = [p1, p2]
-            return
+        if abs(D) < 1e-8: # Points are collinear
+            return None
 
         # Calculate circumcenter (cx, cy)
         sq1, sq2, sq3 = x1**2 + y1**2, x2**2 + y2**2, x3**2 + y3**2
@@ -303,7 +591,7 @@ class MyCircleArc(Shape):
         # Calculate angles
         start_angle = math.atan2(y1 - cy, x1 - cx)
         end_angle = math.atan2(y2 - cy, x2 - cx)
-        on_arc_angle = math.atan2(y3 - cy, y3 - cx)
+        on_arc_angle = math.atan2(y3 - cy, x3 - cx)
 
         # Ensure correct winding order
         angle_range = end_angle - start_angle
@@ -318,40 +606,151 @@ class MyCircleArc(Shape):
              angle_range = end_angle - start_angle
              while angle_range <= 0: angle_range += 2 * math.pi
 
-        # Tessellate
+        return cx, cy, radius, start_angle, angle_range
+
+    def get_steps_for_tolerance(self, tolerance):
+        params = self._get_arc_params()
+        if params is None: # Collinear: a straight line whatever the step count
+            return 1
+        return arc_steps_for_tolerance(params[2], params[4], tolerance)
+
+    def _tessellate(self, steps):
+        params = self._get_arc_params()
+        if params is None: # Collinear, draw a line (copies: the list may be shared)
+            p1, p2 = self.control_points[0], self.control_points[1]
+            return [MyPoint(p1.getX(), p1.getY()), MyPoint(p2.getX(), p2.getY())]
+        cx, cy, radius, start_angle, angle_range = params
+
+        points = []
         for i in range(steps + 1):
             angle = start_angle + (angle_range * i / steps)
             x = cx + radius * math.cos(angle)
             y = cy + radius * math.sin(angle)
-            self._tessellated_points.append(MyPoint(x, y))
-
-    def get_tessellated_points(self):
-        return self._tessellated_points
+            points.append(MyPoint(x, y))
+        return points
+
+    @classmethod
+    def tessellate_batch(cls, shapes, steps):
+        np = _get_numpy()
+        arcs = []
+        params = []
+        for shape in shapes:
+            prm = shape._get_arc_params()
+            if prm is None or np is None: # Collinear arcs are plain lines
+                shape.get_tessellated_points()
+            else:
+                arcs.append(shape)
+                params.append(prm)
+        if not arcs:
+            return
+        cx, cy, radius, start, sweep = np.array(params, dtype=float).T
+        angles = start[:, None] + sweep[:, None] * (np.arange(steps + 1) / steps)[None, :]
+        coords = np.empty((len(arcs), steps + 1, 2))
+        coords[:, :, 0] = cx[:, None] + radius[:, None] * np.cos(angles)
+        coords[:, :, 1] = cy[:, None] + radius[:, None] * np.sin(angles)
+        for i, shape in enumerate(arcs):
+            shape.set_tessellated_coords(coords[i])
 
-    def get_gl_primitive(self):
-        return GL_LINE_STRIP
+    def get_bounding_box(self):
+        params = self._get_arc_params()
+        if params is None:
+            return self._control_points_box()
+        cx, cy, radius, start_angle, angle_range = params
+        xs = [cx + radius * math.cos(start_angle), cx + radius * math.cos(start_angle + angle_range)]
+        ys = [cy + radius * math.sin(start_angle), cy + radius * math.sin(start_angle + angle_range)]
+        # Add the axis extremes swept by the arc
+        k = math.ceil(start_angle / (math.pi / 2))
+        while k * (math.pi / 2) <= start_angle + angle_range:
+            angle = k * (math.pi / 2)
+            xs.append(cx + radius * math.cos(angle))
+            ys.append(cy + radius * math.sin(angle))
+            k += 1
+        return min(xs), max(xs), min(ys), max(ys)
+
+    def get_primitive_kind(self):
+        return PrimitiveKinds.LINE_STRIP
 
     # --- NEW ---
     def find_closest_point(self, query_point: MyPoint) -> (MyPoint, float):
         # Approximate by checking tessellated segments
-        return self._find_closest_point_on_polyline(query_point, self._tessellated_points, is_loop=False)
+        return self._find_closest_point_on_polyline(query_point, self.get_tessellated_points(), is_loop=False)
     
 
+def _bezier_coords_batch(shapes: list[CurveShape], steps: int, degree: int):
+    """Evaluates N Beziers of one degree as (steps+1, degree+1) @ (N, degree+1, 2)."""
+    np = _get_numpy()
+    t = np.arange(steps + 1) / steps
+    basis = np.stack([math.comb(degree, k) * t**k * (1.0 - t)**(degree - k) for k in range(degree + 1)], axis=1)
+    controls = np.array([[(p.getX(), p.getY()) for p in s.control_points] for s in shapes], dtype=float)
+    return basis @ controls
+
+def tessellate_shapes(shapes: list[Shape]) -> int:
+    """
+    Batch-tessellates every curve in shapes that isn't tessellated yet,
+    grouped by type and step count. Returns how many shapes were processed.
+    """
+    groups = {}
+    for shape in shapes:
+        if isinstance(shape, CurveShape) and not shape.is_tessellated():
+            groups.setdefault((type(shape), shape.get_steps()), []).append(shape)
+    for (shape_type, steps), group in groups.items():
+        shape_type.tessellate_batch(group, steps)
+    return sum(len(group) for group in groups.values())
+
+
 class MyPolygon(Shape):
-    """Represents a simple, non-self-intersecting polygon."""
-    def __init__(self, points: list[MyPoint]):
+    """
+    Represents a simple, non-self-intersecting polygon, optionally with holes.
+    Holes are lists of points strictly inside the outline.
+    """
+    def __init__(self, points: list[MyPoint], holes: list[list[MyPoint]] = None):
         super().__init__()
         self.control_points.extend(points)
         # For a simple polygon, tessellated points are the same as control points
         self._tessellated_points = self.control_points
+        self._holes = [list(h) for h in holes] if holes else []
+        self._signed_area = None
+        self._triangles = None # Index triples, filled in by the model
 
     def get_tessellated_points(self):
         return self._tessellated_points
 
-    def get_gl_primitive(self):
-        # GL_TRIANGLE_FAN is a good, efficient way to draw a simple polygon
-        return GL_TRIANGLE_FAN
+    def get_primitive_kind(self):
+        # A triangle fan is a good, efficient way to draw a simple polygon
+        return PrimitiveKinds.TRIANGLE_FAN
+
+    def is_closed(self) -> bool:
+        return True
+
+    def get_holes(self) -> list[list[MyPoint]]:
+        return self._holes
+
+    def get_all_points(self) -> list[MyPoint]:
+        """Outline points followed by every hole's points (what triangle indices refer to)."""
+        if not self._holes:
+            return self._tessellated_points
+        all_points = list(self._tessellated_points)
+        for hole in self._holes:
+            all_points.extend(hole)
+        return all_points
 
     def find_closest_point(self, query_point: MyPoint) -> (MyPoint, float):
         # Find closest point on the polygon's boundary (edges)
-        return self._find_closest_point_on_polyline(query_point, self._tessellated_points, is_loop=True)
\ No newline at end of file
+        return self._find_closest_point_on_polyline(query_point, self._tessellated_points, is_loop=True)
+
+    def invalidate_signed_area(self):
+        """Call after the points moved (the triangulation stays valid under affine maps)."""
+        self._signed_area = None
+
+    def get_signed_area(self) -> float:
+        """Signed area of the outline (positive if counter-clockwise). Holes are not subtracted. Cached."""
+        if self._signed_area is None:
+            self._signed_area = polygon_signed_area(self._tessellated_points)
+        return self._signed_area
+
+    def get_triangles(self) -> list[tuple[int, int, int]]:
+        """Cached triangulation (index triples into the tessellated points)."""
+        return self._triangles
+
+    def set_triangles(self, triangles: list[tuple[int, int, int]]):
+        self._triangles = triangles
@@ -0,0 +1,253 @@
+# MySpatialIndex.py
+import math
+
+class StaticRTree:
+    """
+    Bulk-loaded (Sort-Tile-Recursive) R-tree over axis-aligned bounding boxes.
+    Built once from a list of (bbox, item) pairs and queried many times;
+    point and box queries cost O(log n) plus the number of hits.
+    """
+    def __init__(self, entries: list, node_capacity=16):
+        """entries: list of ((xmin, xmax, ymin, ymax), item)."""
+        self.m_node_capacity = max(2, node_capacity)
+        self.m_size = len(entries)
+        self.m_root = None
+
+        if not entries:
+            return
+
+        # Leaf level: (xmin, xmax, ymin, ymax, item)
+        level = [(b[0], b[1], b[2], b[3], item) for b, item in entries]
+        is_leaf = True
+        while True:
+            level = self._pack(level, is_leaf)
+            is_leaf = False
+            if len(level) == 1:
+                break
+        self.m_root = level[0]
+
+    def _pack(self, entries: list, is_leaf: bool) -> list:
+        """Groups one level of entries into parent nodes (STR packing)."""
+        cap = self.m_node_capacity
+        num_nodes = math.ceil(len(entries) / cap)
+        num_slices = math.ceil(math.sqrt(num_nodes))
+        slice_size = num_slices * cap
+
+        entries.sort(key=lambda e: e[0] + e[1]) # By x center
+        nodes = []
+        for s in range(0, len(entries), slice_size):
+            vertical_slice = sorted(entries[s:s + slice_size], key=lambda e: e[2] + e[3]) # By y center
+            for k in range(0, len(vertical_slice), cap):
+                group = vertical_slice[k:k + cap]
+                nodes.append((min(e[0] for e in group), max(e[1] for e in group),
+                              min(e[2] for e in group), max(e[3] for e in group),
+                              group, is_leaf))
+        return nodes
+
+    def __len__(self):
+        return self.m_size
+
+    def query_box(self, xmin: float, xmax: float, ymin: float, ymax: float) -> list:
+        """Returns all items whose bounding box intersects the given box."""
+        if self.m_root is None:
+            return []
+
+        hits = []
+        stack = [self.m_root]
+        while stack:
+            node = stack.pop()
+            if node[1] < xmin or node[0] > xmax or node[3] < ymin or node[2] > ymax:
+                continue
+            children, is_leaf = node[4], node[5]
+            if is_leaf:
+                for e in children:
+                    if not (e[1] < xmin or e[0] > xmax or e[3] < ymin or e[2] > ymax):
+                        hits.append(e[4])
+            else:
+                stack.extend(children)
+        return hits
+
+    def query_point(self, x: float, y: float) -> list:
+        """Returns all items whose bounding box contains the point (x, y)."""
+        return self.query_box(x, x, y, y)
+
+
+class GridIndex:
+    """
+    Uniform hash grid over axis-aligned bounding boxes.
+    Unlike StaticRTree it is updated incrementally (insert/update/remove
+    are O(cells covered)), which suits the model's shape list.
+    Items covering too many cells are kept in a separate 'oversized' set
+    that every query checks directly.
+    """
+    def __init__(self, cell_size: float = None, max_cells_per_item=64):
+        self.m_cell_size = cell_size
+        self.m_max_cells_per_item = max_cells_per_item
+        self.m_cells = {}        # (ix, iy) -> set of items
+        self.m_boxes = {}        # item -> (xmin, xmax, ymin, ymax)
+        self.m_oversized = set()
+        self.m_extent_sum = 0.0  # Running sum of item sizes, for tuning the cell size
+        self.m_next_tune = 64
+
+    def __len__(self):
+        return len(self.m_boxes)
+
+    def __contains__(self, item):
+        return item in self.m_boxes
+
+    def get_box(self, item):
+        return self.m_boxes.get(item)
+
+    def get_cell_size(self) -> float:
+        return self.m_cell_size
+
+    def clear(self):
+        self.m_cells.clear()
+        self.m_boxes.clear()
+        self.m_oversized.clear()
+        self.m_extent_sum = 0.0
+        self.m_next_tune = 64
+
+    def _cell_range(self, xmin, xmax, ymin, ymax):
+        cs = self.m_cell_size
+        return (int(xmin // cs), int(xmax // cs), int(ymin // cs), int(ymax // cs))
+
+    def _add_to_cells(self, item, box):
+        ix0, ix1, iy0, iy1 = self._cell_range(*box)
+        if (ix1 - ix0 + 1) * (iy1 - iy0 + 1) > self.m_max_cells_per_item:
+            self.m_oversized.add(item)
+            return
+        cells = self.m_cells
+        for ix in range(ix0, ix1 + 1):
+            for iy in range(iy0, iy1 + 1):
+                bucket = cells.get((ix, iy))
+                if bucket is None:
+                    cells[(ix, iy)] = bucket = set()
+                bucket.add(item)
+
+    def _remove_from_cells(self, item, box):
+        if item in self.m_oversized:
+            self.m_oversized.discard(item)
+            return
+        cells = self.m_cells
+        ix0, ix1, iy0, iy1 = self._cell_range(*box)
+        for ix in range(ix0, ix1 + 1):
+            for iy in range(iy0, iy1 + 1):
+                bucket = cells.get((ix, iy))
+                if bucket is not None:
+                    bucket.discard(item)
+                    if not bucket:
+                        del cells[(ix, iy)]
+
+    def insert(self, item, box):
+        """Adds an item with its (xmin, xmax, ymin, ymax) box."""
+        if item in self.m_boxes:
+            self.update(item, box)
+            return
+        if self.m_cell_size is None:
+            self.m_cell_size = max(box[1] - box[0], box[3] - box[2]) * 2.0 or 1.0
+        self.m_boxes[item] = box
+        self.m_extent_sum += max(box[1] - box[0], box[3] - box[2])
+        self._add_to_cells(item, box)
+        if len(self.m_boxes) >= self.m_next_tune:
+            self.m_next_tune *= 2
+            self._tune_cell_size()
+
+    def update(self, item, box):
+        """Moves an item to a new box."""
+        old_box = self.m_boxes.get(item)
+        if old_box is None:
+            self.insert(item, box)
+            return
+        self._remove_from_cells(item, old_box)
+        self.m_extent_sum += max(box[1] - box[0], box[3] - box[2]) - max(old_box[1] - old_box[0], old_box[3] - old_box[2])
+        self.m_boxes[item] = box
+        self._add_to_cells(item, box)
+
+    def update_many(self, entries: list):
+        """
+        Moves many items at once; entries: list of (item, box). When a large
+        part of the index moves, the grid is rebuilt in one pass instead of
+        updating the cells item by item.
+        """
+        if len(entries) * 4 < len(self.m_boxes):
+            for item, box in entries:
+                self.update(item, box)
+            return
+        for item, box in entries:
+            self.m_boxes[item] = box
+        self.m_extent_sum = sum(max(b[1] - b[0], b[3] - b[2]) for b in self.m_boxes.values())
+        avg = self.m_extent_sum / len(self.m_boxes) if self.m_boxes else 0.0
+        self.rebuild(avg * 2.0 if avg > 0.0 else (self._spread_cell_size() or self.m_cell_size or 1.0))
+
+    def remove(self, item):
+        box = self.m_boxes.pop(item, None)
+        if box is None:
+            return
+        self.m_extent_sum -= max(box[1] - box[0], box[3] - box[2])
+        self._remove_from_cells(item, box)
+
+    def _tune_cell_size(self):
+        """Rebuilds the grid if the average item size drifted far from the cell size."""
+        avg = self.m_extent_sum / len(self.m_boxes)
+        if avg <= 0.0:
+            # Points (e.g. snap points): their size says nothing, their spread does
+            cell_size = self._spread_cell_size()
+            if cell_size and not self.m_cell_size / 2.0 <= cell_size <= self.m_cell_size * 2.0:
+                self.rebuild(cell_size)
+            return
+        if avg < self.m_cell_size / 8.0 or avg > self.m_cell_size:
+            self.rebuild(avg * 2.0)
+
+    def _spread_cell_size(self, items_per_cell=4.0) -> float:
+        """
+        Cell size giving about items_per_cell items per cell if the items
+        were spread evenly over their extents (None if they all coincide).
+        """
+        boxes = self.m_boxes.values()
+        width = max(b[1] for b in boxes) - min(b[0] for b in boxes)
+        height = max(b[3] for b in boxes) - min(b[2] for b in boxes)
+        if width <= 0.0 and height <= 0.0:
+            return None
+        per_item = items_per_cell / len(self.m_boxes)
+        # The second term covers items spread along a line
+        return max(math.sqrt(width * height * per_item), max(width, height) * per_item)
+
+    def rebuild(self, cell_size: float):
+        self.m_cell_size = cell_size
+        self.m_cells.clear()
+        self.m_oversized.clear()
+        for item, box in self.m_boxes.items():
+            self._add_to_cells(item, box)
+
+    def query_box(self, xmin: float, xmax: float, ymin: float, ymax: float) -> list:
+        """Returns all items whose box intersects the given box."""
+        if not self.m_boxes:
+            return []
+
+        candidates = set(self.m_oversized)
+        ix0, ix1, iy0, iy1 = self._cell_range(xmin, xmax, ymin, ymax)
+        num_query_cells = (ix1 - ix0 + 1) * (iy1 - iy0 + 1)
+        if num_query_cells > len(self.m_cells):
+            # Huge query box: walking the occupied cells is cheaper
+            for (ix, iy), bucket in self.m_cells.items():
+                if ix0 <= ix <= ix1 and iy0 <= iy <= iy1:
+                    candidates.update(bucket)
+        else:
+            cells = self.m_cells
+            for ix in range(ix0, ix1 + 1):
+                for iy in range(iy0, iy1 + 1):
+                    bucket = cells.get((ix, iy))
+                    if bucket:
+                        candidates.update(bucket)
+
+        boxes = self.m_boxes
+        hits = []
+        for item in candidates:
+            b = boxes[item]
+            if not (b[1] < xmin or b[0] > xmax or b[3] < ymin or b[2] > ymax):
+                hits.append(item)
+        return hits
+
+    def query_point(self, x: float, y: float) -> list:
+        return self.query_box(x, x, y, y)
@@ -0,0 +1,62 @@
+# MyTessellationCache.py
+import threading
+from collections import OrderedDict
+
+class TessellationCache:
+    """
+    Bounded LRU cache of tessellations, keyed by content: shape type,
+    control coordinates and step count. Shapes with the same geometry
+    (and the temporary shapes built for creation previews) share one list.
+    Cached lists are shared, so callers must treat them as read-only.
+    Safe to use from a loader thread as well as the GUI thread.
+    """
+    def __init__(self, max_entries=4096):
+        self.m_entries = OrderedDict()
+        self.m_max_entries = max_entries
+        self.m_hits = 0
+        self.m_misses = 0
+        self.m_lock = threading.Lock()
+
+    def get_or_compute(self, key, compute):
+        """Returns the cached value for key, calling compute() on a miss."""
+        with self.m_lock:
+            value = self.m_entries.get(key)
+            if value is not None:
+                self.m_entries.move_to_end(key)
+                self.m_hits += 1
+                return value
+            self.m_misses += 1
+
+        value = compute() # Outside the lock: two threads may both compute a key, which is harmless
+        with self.m_lock:
+            self.m_entries[key] = value
+            if len(self.m_entries) > self.m_max_entries:
+                self.m_entries.popitem(last=False) # Least recently used
+        return value
+
+    def set_max_entries(self, max_entries: int):
+        with self.m_lock:
+            self.m_max_entries = max_entries
+            while len(self.m_entries) > self.m_max_entries:
+                self.m_entries.popitem(last=False)
+
+    def clear(self):
+        with self.m_lock:
+            self.m_entries.clear()
+
+    def reset_stats(self):
+        self.m_hits = 0
+        self.m_misses = 0
+
+    def get_stats(self) -> dict:
+        lookups = self.m_hits + self.m_misses
+        return {
+            'hits': self.m_hits,
+            'misses': self.m_misses,
+            'hit_rate': self.m_hits / lookups if lookups else 0.0,
+            'entries': len(self.m_entries),
+            'max_entries': self.m_max_entries,
+        }
+
+# Shared by every shape
+TESSELLATION_CACHE = TessellationCache()
@@ -0,0 +1,194 @@
+# MyTileStore.py
+import json
+import math
+import os
+import sqlite3
+import sys
+from MyShapes import Shape
+from MyModelIO import shape_to_record, shape_from_record, iter_shape_chunks, scan_drawing
+
+# A tiled drawing is a single sqlite file
+TILES_EXTENSION = '.tiles'
+TILES_FORMAT_NAME = "MyGLDrawerTiles"
+TILES_FORMAT_VERSION = 1
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+CREATE TABLE IF NOT EXISTS tiles (tx INTEGER, ty INTEGER, count INTEGER,
+                                  xmin REAL, xmax REAL, ymin REAL, ymax REAL,
+                                  PRIMARY KEY (tx, ty));
+CREATE TABLE IF NOT EXISTS shapes (tx INTEGER, ty INTEGER, record TEXT);
+CREATE INDEX IF NOT EXISTS shapes_by_tile ON shapes (tx, ty);
+"""
+
+def _union_box(box1, box2):
+    if box1 is None:
+        return box2
+    return (min(box1[0], box2[0]), max(box1[1], box2[1]), min(box1[2], box2[2]), max(box1[3], box2[3]))
+
+class TileStore():
+    """
+    A drawing bucketed into square tiles, on disk. Every shape goes to the
+    tile holding the center of its bounding box; a tile keeps the box of its
+    content (which can stick out of the square), and window queries test
+    that box. The tile table is small and held in memory; shapes are only
+    read and written a whole tile at a time.
+    """
+    def __init__(self, path: str, tile_size: float = None):
+        self.m_path = path
+        self.m_db = sqlite3.connect(path)
+        try:
+            self.m_db.executescript(_SCHEMA)
+            meta = dict(self.m_db.execute("SELECT key, value FROM meta"))
+        except sqlite3.DatabaseError as e:
+            self.m_db.close()
+            raise ValueError(f"{path} is not a tiled drawing ({e})") from e
+
+        if meta:
+            if meta.get('format') != TILES_FORMAT_NAME:
+                self.m_db.close()
+                raise ValueError(f"{path} is not a tiled drawing")
+            if int(meta.get('version', 0)) > TILES_FORMAT_VERSION:
+                self.m_db.close()
+                raise ValueError(f"{path} needs a newer version (format {meta.get('version')})")
+            self.m_tile_size = float(meta['tile_size'])
+        else:
+            if not tile_size or tile_size <= 0.0:
+                self.m_db.close()
+                raise ValueError(f"{path}: a new tiled drawing needs a tile size")
+            self.m_tile_size = float(tile_size)
+            with self.m_db:
+                self.m_db.executemany("INSERT INTO meta VALUES (?, ?)",
+                                      [('format', TILES_FORMAT_NAME), ('version', str(TILES_FORMAT_VERSION)),
+                                       ('tile_size', repr(self.m_tile_size))])
+
+        # (tx, ty) -> (shape count, content box)
+        self.m_tiles: dict[tuple[int, int], tuple[int, tuple]] = {
+            (tx, ty): (count, (xmin, xmax, ymin, ymax))
+            for tx, ty, count, xmin, xmax, ymin, ymax in self.m_db.execute("SELECT * FROM tiles")}
+
+    def get_path(self) -> str:
+        return self.m_path
+
+    def get_tile_size(self) -> float:
+        return self.m_tile_size
+
+    def tile_of(self, box: tuple) -> tuple[int, int]:
+        """Key of the tile a shape with this bounding box belongs to."""
+        xmin, xmax, ymin, ymax = box
+        return (math.floor((xmin + xmax) * 0.5 / self.m_tile_size),
+                math.floor((ymin + ymax) * 0.5 / self.m_tile_size))
+
+    def has_tile(self, key: tuple[int, int]) -> bool:
+        return key in self.m_tiles
+
+    def get_tile_keys(self) -> list[tuple[int, int]]:
+        return list(self.m_tiles)
+
+    def get_tile_count(self, key: tuple[int, int]) -> int:
+        return self.m_tiles[key][0] if key in self.m_tiles else 0
+
+    def get_tile_box(self, key: tuple[int, int]) -> tuple:
+        return self.m_tiles[key][1] if key in self.m_tiles else None
+
+    def get_shape_count(self) -> int:
+        return sum(count for count, box in self.m_tiles.values())
+
+    def get_extents(self) -> tuple:
+        """Union of every tile's content box, or None if the store is empty."""
+        extents = None
+        for count, box in self.m_tiles.values():
+            extents = _union_box(extents, box)
+        return extents
+
+    def find_tiles(self, xmin: float, xmax: float, ymin: float, ymax: float) -> list[tuple[int, int]]:
+        """Tiles whose content touches the box."""
+        return [key for key, (count, box) in self.m_tiles.items()
+                if box[0] <= xmax and xmin <= box[1] and box[2] <= ymax and ymin <= box[3]]
+
+    def read_tile(self, key: tuple[int, int]) -> list[Shape]:
+        """New shapes for the content of a tile (empty if there is no such tile)."""
+        rows = self.m_db.execute("SELECT record FROM shapes WHERE tx = ? AND ty = ?", key)
+        return [shape_from_record(json.loads(record)) for (record,) in rows]
+
+    def write_tile(self, key: tuple[int, int], shapes: list[Shape]):
+        """Replaces the content of a tile (an empty list deletes it)."""
+        tx, ty = key
+        box = None
+        for shape in shapes:
+            box = _union_box(box, shape.get_bounding_box())
+        with self.m_db:
+            self.m_db.execute("DELETE FROM shapes WHERE tx = ? AND ty = ?", key)
+            self.m_db.executemany("INSERT INTO shapes VALUES (?, ?, ?)",
+                                  ((tx, ty, json.dumps(shape_to_record(s), separators=(',', ':'))) for s in shapes))
+            if shapes:
+                self.m_db.execute("INSERT OR REPLACE INTO tiles VALUES (?, ?, ?, ?, ?, ?, ?)", (tx, ty, len(shapes)) + box)
+                self.m_tiles[key] = (len(shapes), box)
+            else:
+                self.m_db.execute("DELETE FROM tiles WHERE tx = ? AND ty = ?", key)
+                self.m_tiles.pop(key, None)
+
+    def append_shapes(self, shapes: list[Shape]):
+        """Adds shapes to the tiles they belong to, in one transaction."""
+        groups = {}
+        for shape in shapes:
+            box = shape.get_bounding_box()
+            groups.setdefault(self.tile_of(box), []).append((shape, box))
+        with self.m_db:
+            for key, group in groups.items():
+                tx, ty = key
+                count, box = self.m_tiles.get(key, (0, None))
+                for shape, shape_box in group:
+                    box = _union_box(box, shape_box)
+                self.m_db.executemany("INSERT INTO shapes VALUES (?, ?, ?)",
+                                      ((tx, ty, json.dumps(shape_to_record(s), separators=(',', ':'))) for s, b in group))
+                self.m_db.execute("INSERT OR REPLACE INTO tiles VALUES (?, ?, ?, ?, ?, ?, ?)",
+                                  (tx, ty, count + len(group)) + box)
+                self.m_tiles[key] = (count + len(group), box)
+
+    def close(self):
+        self.m_db.close()
+
+def estimate_tile_size(extents: tuple, count: int, shapes_per_tile=1000) -> float:
+    """Tile side giving about shapes_per_tile shapes per tile if they are spread evenly."""
+    if extents is None or count == 0:
+        return 1.0
+    width, height = extents[1] - extents[0], extents[3] - extents[2]
+    area = width * height if width > 0.0 and height > 0.0 else max(width, height, 1.0)**2
+    return math.sqrt(area * shapes_per_tile / count)
+
+def build_tile_store(path: str, chunks, tile_size: float) -> TileStore:
+    """
+    Writes a new tiled drawing (replacing any file at path) from an
+    iterable of shape lists, one chunk in memory at a time.
+    """
+    if os.path.exists(path):
+        os.remove(path)
+    store = TileStore(path, tile_size)
+    for chunk in chunks:
+        store.append_shapes(chunk)
+    return store
+
+def save_tiled(path: str, shapes: list[Shape], shapes_per_tile=1000) -> TileStore:
+    """Writes shapes held in memory as a new tiled drawing."""
+    extents = None
+    for shape in shapes:
+        extents = _union_box(extents, shape.get_bounding_box())
+    return build_tile_store(path, [shapes], estimate_tile_size(extents, len(shapes), shapes_per_tile))
+
+def import_drawing(source: str, path: str, tile_size: float = None, shapes_per_tile=1000) -> TileStore:
+    """
+    Converts a JSON lines drawing (see MyModelIO) to a tiled one, streaming
+    it. Without a tile_size, a first pass over the records sizes the tiles.
+    """
+    if not tile_size:
+        tile_size = estimate_tile_size(*scan_drawing(source), shapes_per_tile)
+    return build_tile_store(path, iter_shape_chunks(source), tile_size)
+
+if __name__ == '__main__':
+    if len(sys.argv) not in (3, 4):
+        print(f"Usage: {sys.argv[0]} drawing.jsonl drawing{TILES_EXTENSION} [tile_size]")
+        sys.exit(1)
+    store = import_drawing(sys.argv[1], sys.argv[2], float(sys.argv[3]) if len(sys.argv) == 4 else None)
+    print(f"{store.get_shape_count()} shapes in {len(store.get_tile_keys())} tiles of {store.get_tile_size():.6g}")
+    store.close()
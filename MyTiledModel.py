@@ -0,0 +1,242 @@
+# MyTiledModel.py
+import time
+from collections import OrderedDict
+from MyModel import MyModel, ModelEvents
+from MyShapes import Shape, tessellate_shapes
+from MyTileStore import TileStore
+
+class TiledModel(MyModel):
+    """
+    Out-of-core model: the drawing lives in a TileStore and only some of
+    its tiles are held as shapes (indexed and observed like any model's).
+    set_view_window() picks the tiles the view needs and loads them a few
+    at a time; once more than max_resident_shapes are loaded, the least
+    recently viewed tiles are dropped. Edited tiles are written back when
+    dropped or on flush(). Tiles in view or with selected shapes stay.
+    """
+    def __init__(self, store: TileStore, max_resident_shapes=500000, load_budget_ms=30.0):
+        super().__init__()
+        self.m_store = store
+        self.m_max_resident = max_resident_shapes
+        self.m_load_budget = load_budget_ms / 1000.0
+        self.m_tiles: OrderedDict[tuple, list[Shape]] = OrderedDict() # Loaded tiles, least recently used first
+        self.m_shape_tiles: dict[Shape, tuple] = {}
+        self.m_dirty_tiles: set[tuple] = set()
+        self.m_view_window = None
+        self.m_view_tiles: set[tuple] = set()
+        self.m_wanted_tiles: list[tuple] = [] # View tiles still to load, nearest to the view center first
+        self.m_skipped_tiles: list[tuple] = [] # View tiles that don't fit in memory with the rest
+        self.m_write_count = 0 # Tiles written back to the store so far
+
+    def get_store(self) -> TileStore:
+        return self.m_store
+
+    def get_loaded_tile_count(self) -> int:
+        return len(self.m_tiles)
+
+    def get_write_count(self) -> int:
+        return self.m_write_count
+
+    def get_missing_tiles_in_box(self, xmin: float, xmax: float, ymin: float, ymax: float) -> list[tuple]:
+        """Stored tiles touching the box that aren't loaded."""
+        return [key for key in self.m_store.find_tiles(xmin, xmax, ymin, ymax) if key not in self.m_tiles]
+
+    def has_pending_tiles(self) -> bool:
+        return bool(self.m_wanted_tiles)
+
+    def get_unloaded_tile_boxes(self) -> list[tuple]:
+        """Content boxes of the view tiles left out to stay within max_resident_shapes."""
+        return [self.m_store.get_tile_box(key) for key in self.m_skipped_tiles if key not in self.m_tiles]
+
+    # --- Tile loading ---
+
+    def set_view_window(self, xmin: float, xmax: float, ymin: float, ymax: float) -> bool:
+        """
+        Call whenever the view may have moved (e.g. on every paint). Loads
+        tiles for the window until the time budget is spent; returns True
+        if some are still pending, so the caller should come back soon.
+        """
+        window = (xmin, xmax, ymin, ymax)
+        if window != self.m_view_window:
+            self.m_view_window = window
+            cx, cy = (xmin + xmax) * 0.5, (ymin + ymax) * 0.5
+            size = self.m_store.get_tile_size()
+            keys = self.m_store.find_tiles(xmin, xmax, ymin, ymax)
+            keys.sort(key=lambda k: ((k[0] + 0.5) * size - cx)**2 + ((k[1] + 0.5) * size - cy)**2)
+            self.m_view_tiles = set(keys)
+            for key in reversed(keys): # Nearest ends up most recently used
+                if key in self.m_tiles:
+                    self.m_tiles.move_to_end(key)
+            self.m_wanted_tiles = [key for key in keys if key not in self.m_tiles]
+            self.m_skipped_tiles = []
+        self.load_pending_tiles()
+        return self.has_pending_tiles()
+
+    def load_pending_tiles(self):
+        deadline = time.perf_counter() + self.m_load_budget
+        while self.m_wanted_tiles and time.perf_counter() < deadline:
+            key = self.m_wanted_tiles[0]
+            count = self.m_store.get_tile_count(key)
+            if not self._make_room(count):
+                # The view holds more than fits: the rest is only outlined
+                self.m_skipped_tiles.extend(self.m_wanted_tiles)
+                self.m_wanted_tiles = []
+                print(f"View needs more than {self.m_max_resident} shapes: "
+                      f"{len(self.m_skipped_tiles)} tiles not loaded (zoom in to see them)")
+                break
+            self.m_wanted_tiles.pop(0)
+            if key not in self.m_tiles:
+                self._load_tile(key)
+
+    def ensure_tiles_in_box(self, xmin: float, xmax: float, ymin: float, ymax: float):
+        """Loads every tile touching the box, whatever the memory budget (e.g. for a selection)."""
+        for key in self.m_store.find_tiles(xmin, xmax, ymin, ymax):
+            if key in self.m_tiles:
+                self.m_tiles.move_to_end(key)
+            else:
+                self._load_tile(key)
+
+    def add_read_tile(self, key: tuple, shapes: list[Shape], write_count: int):
+        """
+        Adds a tile read and tessellated elsewhere (see LoadManager.start_tiles),
+        write_count being get_write_count() from before the read. Skipped if
+        the tile got loaded meanwhile; read again if tiles were written back
+        since, as the copy may then be stale.
+        """
+        if key in self.m_tiles:
+            return
+        self._load_tile(key, shapes if write_count == self.m_write_count else None)
+
+    def _pinned_tiles(self) -> set[tuple]:
+        pinned = set(self.m_view_tiles)
+        pinned.update(self.m_shape_tiles[s] for s in self.m_selected_shapes if s in self.m_shape_tiles)
+        return pinned
+
+    def _make_room(self, count: int) -> bool:
+        """
+        Evicts unpinned tiles, least recently used first, down to three
+        quarters of the budget (so eviction isn't repeated for every tile).
+        Returns False if count more shapes still don't fit.
+        """
+        if len(self.m_shapes) + count <= self.m_max_resident:
+            return True
+        target = self.m_max_resident * 3 // 4 - count
+        pinned = self._pinned_tiles()
+        evicted, remaining = [], len(self.m_shapes)
+        for key, shapes in self.m_tiles.items():
+            if remaining <= target:
+                break
+            if key not in pinned:
+                evicted.append(key)
+                remaining -= len(shapes)
+        self._unload_tiles(evicted)
+        return len(self.m_shapes) + count <= self.m_max_resident
+
+    def _load_tile(self, key: tuple, shapes: list[Shape] = None):
+        if shapes is None:
+            shapes = self.m_store.read_tile(key)
+            tessellate_shapes(shapes)
+        for shape in shapes:
+            super()._add_shape(shape) # Not a user edit: the tile stays clean
+            self.m_shape_tiles[shape] = key
+        self.m_tiles[key] = shapes
+        self._notify(ModelEvents.SHAPES_ADDED, shapes)
+
+    def _unload_tiles(self, keys: list[tuple]):
+        shapes = []
+        for key in keys:
+            if key in self.m_dirty_tiles:
+                self._write_tile(key, self.m_tiles[key])
+                self.m_dirty_tiles.discard(key)
+            for shape in self.m_tiles.pop(key):
+                del self.m_shape_tiles[shape]
+                shapes.append(shape)
+        super().remove_shapes(shapes)
+
+    def flush(self):
+        """Writes every edited tile back to the store."""
+        for key in self.m_dirty_tiles:
+            self._write_tile(key, self.m_tiles.get(key, []))
+        self.m_dirty_tiles.clear()
+
+    def _write_tile(self, key: tuple, shapes: list[Shape]):
+        self.m_store.write_tile(key, shapes)
+        self.m_write_count += 1
+
+    def close(self):
+        self.flush()
+        self.m_store.close()
+
+    # --- Edits: keep track of the tiles to write back ---
+
+    def _add_shape(self, shape: Shape):
+        super()._add_shape(shape)
+        key = self.m_store.tile_of(shape.get_bounding_box())
+        if key not in self.m_tiles:
+            if self.m_store.has_tile(key):
+                self._load_tile(key) # The tile is rewritten whole, so it needs its stored shapes
+            else:
+                self.m_tiles[key] = []
+        self.m_tiles[key].append(shape)
+        self.m_shape_tiles[shape] = key
+        self.m_dirty_tiles.add(key)
+
+    def remove_shapes(self, shapes: list[Shape]):
+        for shape in shapes:
+            key = self.m_shape_tiles.pop(shape, None)
+            if key is not None:
+                self.m_tiles[key].remove(shape)
+                self.m_dirty_tiles.add(key)
+        super().remove_shapes(shapes)
+
+    def notify_shapes_modified(self, shapes: list[Shape]):
+        self._mark_dirty(shapes)
+        super().notify_shapes_modified(shapes)
+
+    def apply_transform(self, shapes: list[Shape], matrix: tuple):
+        self._mark_dirty(shapes)
+        super().apply_transform(shapes, matrix)
+
+    def _mark_dirty(self, shapes: list[Shape]):
+        for shape in shapes:
+            key = self.m_shape_tiles.get(shape)
+            if key is not None:
+                self.m_dirty_tiles.add(key)
+
+    # --- The whole drawing, not just the loaded tiles ---
+    # (query_shapes_in_box only sees the loaded tiles: see get_missing_tiles_in_box)
+
+    def iter_tiles(self):
+        """Shape lists of every tile: the loaded ones, then the others streamed from the store (not kept)."""
+        yield from list(self.m_tiles.values())
+        for key in self.m_store.get_tile_keys():
+            if key not in self.m_tiles:
+                yield self.m_store.read_tile(key)
+
+    def iter_all_shapes(self):
+        for shapes in self.iter_tiles():
+            yield from shapes
+
+    def isEmpty(self):
+        return super().isEmpty() and self.m_store.get_shape_count() == 0
+
+    def getBoundBox(self):
+        stored = self.m_store.get_extents()
+        if super().isEmpty():
+            return stored if stored is not None else super().getBoundBox()
+        loaded = super().getBoundBox() # Edited shapes may not be in the store yet
+        if stored is None:
+            return loaded
+        return (min(stored[0], loaded[0]), max(stored[1], loaded[1]),
+                min(stored[2], loaded[2]), max(stored[3], loaded[3]))
+
+    def clear(self):
+        """Unloads every tile (edits are written back first; the file keeps the drawing)."""
+        self.flush()
+        self.m_tiles.clear()
+        self.m_shape_tiles.clear()
+        self.m_view_window = None
+        self.m_view_tiles = set()
+        self.m_wanted_tiles = []
+        self.m_skipped_tiles = []
+        super().clear()
@@ -0,0 +1,159 @@
+# MyTransforms.py
+import math
+from MyShapes import (
+    Shape, CurveShape, MyLine, MyPolyline,
+    MyCircle, MyCircleArc, MyPolygon, _get_numpy
+)
+
+# An affine transform is a 6-tuple (a, b, c, d, e, f):
+#     x' = a * x + b * y + c
+#     y' = d * x + e * y + f
+IDENTITY = (1.0, 0.0, 0.0, 0.0, 1.0, 0.0)
+
+# Shapes whose bounding box is the box of their control points (Beziers have
+# a tighter, exact box of their own)
+_HULL_BOX_TYPES = (MyLine, MyPolyline, MyPolygon)
+
+def translation(dx: float, dy: float) -> tuple:
+    return (1.0, 0.0, dx, 0.0, 1.0, dy)
+
+def rotation(angle: float, cx=0.0, cy=0.0) -> tuple:
+    """Counter-clockwise rotation by angle (radians) about (cx, cy)."""
+    c, s = math.cos(angle), math.sin(angle)
+    return (c, -s, cx - c * cx + s * cy, s, c, cy - s * cx - c * cy)
+
+def scaling(sx: float, sy: float = None, cx=0.0, cy=0.0) -> tuple:
+    """Scales about (cx, cy); uniform if sy is None."""
+    sy = sx if sy is None else sy
+    return (sx, 0.0, cx - sx * cx, 0.0, sy, cy - sy * cy)
+
+def mirroring(angle: float, cx=0.0, cy=0.0) -> tuple:
+    """Reflection across the line through (cx, cy) at angle (0 is horizontal, so y flips)."""
+    c, s = math.cos(2.0 * angle), math.sin(2.0 * angle)
+    return (c, s, cx - c * cx - s * cy, s, -c, cy - s * cx + c * cy)
+
+def compose(outer: tuple, inner: tuple) -> tuple:
+    """The transform applying inner first, then outer."""
+    a1, b1, c1, d1, e1, f1 = outer
+    a2, b2, c2, d2, e2, f2 = inner
+    return (a1 * a2 + b1 * d2, a1 * b2 + b1 * e2, a1 * c2 + b1 * f2 + c1,
+            d1 * a2 + e1 * d2, d1 * b2 + e1 * e2, d1 * c2 + e1 * f2 + f1)
+
+def determinant(matrix: tuple) -> float:
+    a, b, _, d, e, _ = matrix
+    return a * e - b * d
+
+def is_similarity(matrix: tuple, rel_tol=1e-9) -> bool:
+    """True if the transform keeps circles circular (rotation, uniform scale, mirror, move)."""
+    a, b, _, d, e, _ = matrix
+    tol = rel_tol * max(abs(a), abs(b), abs(d), abs(e), 1e-300)
+    rotates = abs(a - e) <= tol and abs(b + d) <= tol
+    reflects = abs(a + e) <= tol and abs(b - d) <= tol
+    return rotates or reflects
+
+def _gather_points(shapes: list[Shape]) -> (list, list[list[int]]):
+    """
+    Unique control points (and polygon hole points) of shapes, and for each
+    shape the indices of its points in that list. Points shared between
+    shapes are only transformed once.
+    """
+    points = []
+    index_of = {}
+    shape_indices = []
+    for shape in shapes:
+        own = shape.get_control_points()
+        if isinstance(shape, MyPolygon):
+            own = own + [p for hole in shape.get_holes() for p in hole]
+        indices = []
+        for p in own:
+            i = index_of.get(id(p))
+            if i is None:
+                i = index_of[id(p)] = len(points)
+                points.append(p)
+            indices.append(i)
+        shape_indices.append(indices)
+    return points, shape_indices
+
+def _update_shape_data(shapes: list[Shape], matrix: tuple):
+    """Non-point data: circle radii, cached polygon areas and shape versions."""
+    scale = math.sqrt(abs(determinant(matrix)))
+    for shape in shapes:
+        shape.mark_modified()
+        if isinstance(shape, MyCircle):
+            shape.radius *= scale
+        elif isinstance(shape, MyPolygon):
+            shape.invalidate_signed_area()
+
+def transform_shapes(shapes: list[Shape], matrix: tuple) -> list[tuple]:
+    """
+    Applies the affine matrix to shapes in place and returns their new
+    bounding boxes, in order.
+    With numpy, all control points and every existing tessellation go
+    through a single array operation, and the transformed tessellations
+    are kept (as arrays, without re-tessellating). Circles and arcs are
+    only re-tessellated if the transform isn't a similarity: a circle then
+    keeps its (transformed) center with the radius scaled by sqrt(|det|),
+    and an arc is redrawn through its three transformed points.
+    """
+    np = _get_numpy()
+    points, shape_indices = _gather_points(shapes)
+    similar = is_similarity(matrix)
+    a, b, c, d, e, f = matrix
+
+    if np is None:
+        for p in points:
+            x, y = p.getX(), p.getY()
+            p.setX(a * x + b * y + c)
+            p.setY(d * x + e * y + f)
+        for shape in shapes:
+            if isinstance(shape, CurveShape):
+                shape.invalidate_tessellation()
+        _update_shape_data(shapes, matrix)
+        return [shape.get_bounding_box() for shape in shapes]
+
+    # 1. One (N, 2) block: control points first, then the tessellations to carry along
+    blocks = [np.array([(p.getX(), p.getY()) for p in points], dtype=float).reshape(-1, 2)]
+    carried = []
+    for shape in shapes:
+        if not isinstance(shape, CurveShape) or not shape.is_tessellated():
+            continue
+        if similar or not isinstance(shape, (MyCircle, MyCircleArc)):
+            coords = shape.get_tessellated_coords()
+            blocks.append(coords)
+            carried.append((shape, len(coords)))
+        else:
+            shape.invalidate_tessellation()
+    xy = np.concatenate(blocks)
+
+    # 2. The transform itself
+    out = np.empty_like(xy)
+    out[:, 0] = a * xy[:, 0] + b * xy[:, 1] + c
+    out[:, 1] = d * xy[:, 0] + e * xy[:, 1] + f
+
+    # 3. Scatter back
+    num_points = len(points)
+    for p, (x, y) in zip(points, out[:num_points].tolist()):
+        p.setX(x)
+        p.setY(y)
+    offset = num_points
+    for shape, n in carried:
+        shape.set_tessellated_coords(out[offset:offset + n])
+        offset += n
+    _update_shape_data(shapes, matrix)
+
+    # 4. Boxes: per-shape min/max over the control points in one reduction
+    boxes = [None] * len(shapes)
+    hull = [i for i, shape in enumerate(shapes) if isinstance(shape, _HULL_BOX_TYPES) and shape_indices[i]]
+    if hull:
+        lengths = [len(shape_indices[i]) for i in hull]
+        flat = np.fromiter((j for i in hull for j in shape_indices[i]), dtype=np.intp, count=sum(lengths))
+        starts = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+        gathered = out[flat]
+        mins = np.minimum.reduceat(gathered, starts).tolist()
+        maxs = np.maximum.reduceat(gathered, starts).tolist()
+        for k, i in enumerate(hull):
+            boxes[i] = (mins[k][0], maxs[k][0], mins[k][1], maxs[k][1])
+    for i, shape in enumerate(shapes):
+        if boxes[i] is None:
+            boxes[i] = shape.get_bounding_box() # Circles, arcs and Beziers are analytic
+    return boxes
@@ -1,8 +1,10 @@
 # MyWindow.py
-from PySide6.QtWidgets import QMainWindow
+from PySide6.QtWidgets import QMainWindow, QFileDialog
 from PySide6.QtGui import QAction, QIcon, QActionGroup
 from MyCanvas import MyCanvas, CanvasModes
+from MyBooleanOps import BooleanOps
 from MyModel import MyModel
+from HoverManager import PickModes
 
 class MyWindow(QMainWindow):
     def __init__(self):
@@ -24,6 +26,10 @@ class MyWindow(QMainWindow):
         select_action = QAction(QIcon("icons/select.png"), "Select", self)
         select_action.setCheckable(True)
         
+        # --- NEW ---
+        open_action = QAction(QIcon("icons/open.png"), "Open", self)
+        save_action = QAction(QIcon("icons/save.png"), "Save", self)
+
         fit_action = QAction(QIcon("icons/fit.png"), "Fit", self)
         clear_action = QAction(QIcon("icons/clear.png"), "Clear All", self)
         
@@ -44,15 +50,59 @@ class MyWindow(QMainWindow):
         arc_action = QAction(QIcon("icons/arc.png"), "Circle Arc", self)
         arc_action.setCheckable(True)
 
+        # --- NEW ---
+        union_action = QAction(QIcon("icons/union.png"), "Union", self)
+        intersection_action = QAction(QIcon("icons/intersection.png"), "Intersection", self)
+        difference_action = QAction(QIcon("icons/difference.png"), "Difference", self)
+        xor_action = QAction(QIcon("icons/xor.png"), "XOR", self)
+
+        # --- NEW ---: Transforms of the selection
+        rotate_action = QAction(QIcon("icons/rotate.png"), "Rotate 90", self)
+        scale_up_action = QAction(QIcon("icons/scale_up.png"), "Scale Up", self)
+        scale_down_action = QAction(QIcon("icons/scale_down.png"), "Scale Down", self)
+        mirror_h_action = QAction(QIcon("icons/mirror_h.png"), "Mirror Horizontal", self)
+        mirror_v_action = QAction(QIcon("icons/mirror_v.png"), "Mirror Vertical", self)
+
+        # --- NEW ---
+        snap_action = QAction(QIcon("icons/snap.png"), "Snap", self)
+        snap_action.setCheckable(True)
+        snap_action.setChecked(True)
+
+        # --- NEW ---
+        color_pick_action = QAction(QIcon("icons/color_pick.png"), "Color Pick", self)
+        color_pick_action.setCheckable(True)
+
+        # --- NEW ---: Memory diagnostics (the reports go to the console)
+        memory_report_action = QAction(QIcon("icons/memory.png"), "Memory Report", self)
+        self.trace_allocations_action = QAction(QIcon("icons/trace.png"), "Trace Allocations", self)
+        self.trace_allocations_action.setCheckable(True)
+
         # --- Create a single Toolbar ---
         toolbar = self.addToolBar("Tools")
+        toolbar.addAction(open_action)
+        toolbar.addAction(save_action)
+        toolbar.addSeparator()
         toolbar.addAction(pan_action)
         toolbar.addAction(select_action)
         toolbar.addAction(fit_action)
         toolbar.addAction(clear_action)
         toolbar.addSeparator()
         toolbar.addAction(intersect_action) # Name is updated
+        toolbar.addAction(union_action)
+        toolbar.addAction(intersection_action)
+        toolbar.addAction(difference_action)
+        toolbar.addAction(xor_action)
+        toolbar.addSeparator()
+        toolbar.addAction(rotate_action)
+        toolbar.addAction(scale_up_action)
+        toolbar.addAction(scale_down_action)
+        toolbar.addAction(mirror_h_action)
+        toolbar.addAction(mirror_v_action)
         toolbar.addSeparator() 
+        toolbar.addAction(snap_action)
+        toolbar.addAction(color_pick_action)
+        toolbar.addAction(memory_report_action)
+        toolbar.addAction(self.trace_allocations_action)
         toolbar.addAction(line_action)
         toolbar.addAction(polyline_action)
         toolbar.addAction(circle_action)
@@ -74,12 +124,41 @@ class MyWindow(QMainWindow):
         self.mode_action_group.setExclusive(True)
 
         # --- Connect Signals ---
+        open_action.triggered.connect(self.on_open)
+        save_action.triggered.connect(self.on_save)
         fit_action.triggered.connect(self.canvas.fitWorldToViewport)
         clear_action.triggered.connect(self.canvas.clearCanvas)
         # --- MODIFIED ---
         intersect_action.triggered.connect(self.canvas.build_intersection_graph) 
+        snap_action.toggled.connect(self.canvas.set_snap_enabled)
+        color_pick_action.toggled.connect(
+            lambda checked: self.canvas.set_pick_mode(PickModes.COLOR_ID if checked else PickModes.BOUNDING_BOX))
+        memory_report_action.triggered.connect(self.canvas.print_memory_report)
+        self.trace_allocations_action.toggled.connect(self.canvas.set_trace_allocations)
+        union_action.triggered.connect(lambda: self.canvas.run_boolean_operation(BooleanOps.UNION))
+        intersection_action.triggered.connect(lambda: self.canvas.run_boolean_operation(BooleanOps.INTERSECTION))
+        difference_action.triggered.connect(lambda: self.canvas.run_boolean_operation(BooleanOps.DIFFERENCE))
+        xor_action.triggered.connect(lambda: self.canvas.run_boolean_operation(BooleanOps.XOR))
+        rotate_action.triggered.connect(lambda: self.canvas.rotate_selection(90.0))
+        scale_up_action.triggered.connect(lambda: self.canvas.scale_selection(2.0))
+        scale_down_action.triggered.connect(lambda: self.canvas.scale_selection(0.5))
+        mirror_h_action.triggered.connect(lambda: self.canvas.mirror_selection(True))
+        mirror_v_action.triggered.connect(lambda: self.canvas.mirror_selection(False))
         self.mode_action_group.triggered.connect(self.on_mode_action_triggered)
 
+    # --- NEW ---
+    def on_open(self):
+        path, _ = QFileDialog.getOpenFileName(self, "Open Drawing", "",
+                                              "Drawings (*.jsonl *.tiles);;Tiled Drawings (*.tiles);;All Files (*)")
+        if path:
+            self.canvas.open_file(path)
+
+    def on_save(self):
+        path, _ = QFileDialog.getSaveFileName(self, "Save Drawing", "",
+                                              "Drawings (*.jsonl);;Tiled Drawings (*.tiles);;All Files (*)")
+        if path:
+            self.canvas.save_file(path)
+
     def on_mode_action_triggered(self, action: QAction):
         # ... (this function is unchanged)
         text = action.text()
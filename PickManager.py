@@ -0,0 +1,163 @@
+# PickManager.py
+import math
+from OpenGL.GL import *
+from MyModel import MyModel, ModelEvents
+from MyShapes import MyPoint, Shape
+from MyRenderer import unroll_primitive
+
+class PickManager():
+    """
+    Color-ID picking: every visible shape is drawn into an offscreen
+    framebuffer in a flat color encoding its number (24-bit RGB, black is
+    background). The buffer is re-rendered only when the view or the model
+    changed and is read back once; a pick then just scans a small pixel
+    window around the cursor, so it costs the same whatever the number of
+    shapes or their complexity.
+    """
+    def __init__(self, point_size=3.0):
+        self.m_fbo = None
+        self.m_renderbuffer = None
+        self.m_fbo_size = (0, 0)
+        self.m_failed = False # No usable framebuffer: picking stays on the CPU path
+        self.m_view = None # (L, R, B, T, w, h) the pixels were rendered for
+        self.m_dirty = True
+        self.m_pixels: bytes = None # RGB, bottom row first
+        self.m_shapes: list[Shape] = [] # Color number - 1 -> shape
+        self.m_point_size = point_size
+
+    def invalidate(self):
+        self.m_dirty = True
+
+    def on_model_event(self, event: ModelEvents, shapes: list[Shape]):
+        """Model observer: geometry changes make the ID buffer stale (selection doesn't)."""
+        if event not in (ModelEvents.SELECTION_CHANGED, ModelEvents.GRAPH_CHANGED):
+            self.invalidate()
+
+    def is_ready(self, view: tuple) -> bool:
+        return not self.m_dirty and self.m_view == view and self.m_pixels is not None
+
+    def _ensure_framebuffer(self, w: int, h: int) -> bool:
+        """Creates or resizes the offscreen framebuffer and leaves it bound."""
+        if self.m_fbo is None:
+            self.m_fbo = glGenFramebuffers(1)
+            self.m_renderbuffer = glGenRenderbuffers(1)
+        glBindFramebuffer(GL_FRAMEBUFFER, self.m_fbo)
+        if self.m_fbo_size != (w, h):
+            glBindRenderbuffer(GL_RENDERBUFFER, self.m_renderbuffer)
+            glRenderbufferStorage(GL_RENDERBUFFER, GL_RGBA8, w, h)
+            glFramebufferRenderbuffer(GL_FRAMEBUFFER, GL_COLOR_ATTACHMENT0, GL_RENDERBUFFER, self.m_renderbuffer)
+            self.m_fbo_size = (w, h)
+        return glCheckFramebufferStatus(GL_FRAMEBUFFER) == GL_FRAMEBUFFER_COMPLETE
+
+    def _pack(self, lod_manager, world_per_pixel: float) -> (list, list, list, list, list, list):
+        """Vertex and color arrays (lines, triangles, points) for the ID render."""
+        lines, line_colors = [], []
+        triangles, triangle_colors = [], []
+        points, point_colors = [], []
+        for number, shape in enumerate(self.m_shapes, 1):
+            color = ((number >> 16) & 255, (number >> 8) & 255, number & 255)
+            vertices, is_sub_pixel = lod_manager.get_render_points(shape, world_per_pixel)
+            if is_sub_pixel:
+                for p in vertices:
+                    points += (p.getX(), p.getY())
+                    point_colors += color
+                continue
+            shape_triangles, shape_lines = unroll_primitive(shape, vertices)
+            triangles += shape_triangles
+            triangle_colors += color * (len(shape_triangles) // 2)
+            lines += shape_lines
+            line_colors += color * (len(shape_lines) // 2)
+        return lines, line_colors, triangles, triangle_colors, points, point_colors
+
+    def update(self, model: MyModel, lod_manager, view: tuple, default_fbo: int) -> bool:
+        """
+        Re-renders and reads back the ID buffer if the view or the model
+        changed. Needs the GL context to be current (e.g. from paintGL);
+        default_fbo is bound again afterwards. Returns True if the buffer
+        can be picked from.
+        """
+        if self.is_ready(view):
+            return True
+        L, R, B, T, w, h = view
+        if self.m_failed or model is None or w <= 0 or h <= 0:
+            return False
+
+        # Shapes outside the view can't be hovered, so they are left out
+        self.m_shapes = model.get_shape_index().query_box(L, R, B, T)
+        if len(self.m_shapes) >= (1 << 24) - 1:
+            self.m_shapes = self.m_shapes[:(1 << 24) - 1]
+        lines, line_colors, triangles, triangle_colors, points, point_colors = self._pack(lod_manager, (R - L) / w)
+
+        if not self._ensure_framebuffer(w, h):
+            glBindFramebuffer(GL_FRAMEBUFFER, default_fbo)
+            print("Color-ID picking unavailable: offscreen framebuffer is incomplete")
+            self.m_failed = True
+            return False
+
+        glPushAttrib(GL_ALL_ATTRIB_BITS)
+        glViewport(0, 0, w, h)
+        glDisable(GL_BLEND) # Colors must reach the buffer exactly
+        glDisable(GL_DITHER)
+        glDisable(GL_LINE_SMOOTH)
+        glDisable(GL_POINT_SMOOTH)
+        glClearColor(0.0, 0.0, 0.0, 0.0)
+        glClear(GL_COLOR_BUFFER_BIT)
+        glMatrixMode(GL_PROJECTION)
+        glLoadIdentity()
+        glOrtho(L, R, B, T, -1.0, 1.0)
+        glMatrixMode(GL_MODELVIEW)
+        glLoadIdentity()
+
+        glEnableClientState(GL_VERTEX_ARRAY)
+        glEnableClientState(GL_COLOR_ARRAY)
+        glLineWidth(1.0)
+        glPointSize(self.m_point_size)
+        for primitive, coords, colors in ((GL_TRIANGLES, triangles, triangle_colors),
+                                          (GL_LINES, lines, line_colors),
+                                          (GL_POINTS, points, point_colors)):
+            if not coords:
+                continue
+            vertex_array = (GLfloat * len(coords))(*coords)
+            color_array = (GLubyte * len(colors))(*colors)
+            glVertexPointer(2, GL_FLOAT, 0, vertex_array)
+            glColorPointer(3, GL_UNSIGNED_BYTE, 0, color_array)
+            glDrawArrays(primitive, 0, len(coords) // 2)
+        glDisableClientState(GL_COLOR_ARRAY)
+        glDisableClientState(GL_VERTEX_ARRAY)
+
+        glPixelStorei(GL_PACK_ALIGNMENT, 1)
+        data = glReadPixels(0, 0, w, h, GL_RGB, GL_UNSIGNED_BYTE)
+        self.m_pixels = data if isinstance(data, bytes) else data.tobytes()
+        glPopAttrib()
+        glBindFramebuffer(GL_FRAMEBUFFER, default_fbo)
+
+        self.m_view = view
+        self.m_dirty = False
+        return True
+
+    def pick(self, mouse_pos: MyPoint, view: tuple, radius: int) -> (bool, Shape):
+        """
+        Returns (ready, shape): the shape drawn nearest to mouse_pos within
+        radius pixels, or None. ready is False while the buffer is stale
+        for this view (the caller should use another pick method).
+        """
+        if not self.is_ready(view):
+            return False, None
+        L, R, B, T, w, h = view
+        px = math.floor((mouse_pos.getX() - L) / (R - L) * w)
+        py = math.floor((mouse_pos.getY() - B) / (T - B) * h) # Rows count up from the bottom
+
+        pixels = self.m_pixels
+        best_number, best_dist_sq = 0, float('inf')
+        for y in range(max(0, py - radius), min(h, py + radius + 1)):
+            row = y * w
+            for x in range(max(0, px - radius), min(w, px + radius + 1)):
+                i = (row + x) * 3
+                number = (pixels[i] << 16) | (pixels[i + 1] << 8) | pixels[i + 2]
+                if number:
+                    dist_sq = (x - px)**2 + (y - py)**2
+                    if dist_sq < best_dist_sq:
+                        best_number, best_dist_sq = number, dist_sq
+        if best_number == 0 or best_number > len(self.m_shapes):
+            return True, None
+        return True, self.m_shapes[best_number - 1]
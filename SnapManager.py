@@ -0,0 +1,196 @@
+# SnapManager.py
+from enum import Enum
+from MyModel import MyModel, ModelEvents
+from MyShapes import MyPoint, Shape, point_dist_sq
+from MyGeometry import find_segment_intersection, segment_intersects_box
+from MySpatialIndex import GridIndex
+
+class SnapKinds(Enum):
+    ENDPOINT = 0
+    CONTROL_POINT = 1
+    INTERSECTION = 2
+    NEAREST = 3
+
+class SnapManager():
+    """
+    Object snapping for the creation modes.
+    Looks (in priority order) for an endpoint or control point, an
+    intersection between nearby shapes, or the nearest point on a shape,
+    within a world-space tolerance around the mouse.
+    """
+    def __init__(self, max_intersection_shapes=16):
+        # Snap points of every shape: (shape, index, kind) -> zero-size box
+        self.m_point_index = GridIndex()
+        self.m_shape_keys = {} # shape -> its keys in m_point_index
+        self.m_model: MyModel = None # Model the index follows (through its change events)
+        self.m_max_intersection_shapes = max_intersection_shapes
+        self.m_snap_point: MyPoint = None
+        self.m_snap_kind: SnapKinds = None
+
+    def clear(self):
+        """Clears the current snap result (the index is kept)."""
+        self.m_snap_point = None
+        self.m_snap_kind = None
+
+    def reset_index(self):
+        self.m_point_index.clear()
+        self.m_shape_keys.clear()
+
+    def _get_snap_points(self, shape: Shape) -> list:
+        """(key, point) for the endpoints and control points of one shape."""
+        keys = []
+        first, last = shape.get_end_points()
+        if first is not None:
+            for i, p in ((0, first), (-1, last)): # Indices into the tessellated points
+                keys.append(((shape, i, SnapKinds.ENDPOINT), p))
+        for i, p in enumerate(shape.get_control_points()):
+            keys.append(((shape, i, SnapKinds.CONTROL_POINT), p))
+        return keys
+
+    def add_shape(self, shape: Shape):
+        """Indexes the endpoints and control points of one shape."""
+        keys = self._get_snap_points(shape)
+        for key, p in keys:
+            self.m_point_index.insert(key, (p.getX(), p.getX(), p.getY(), p.getY()))
+        self.m_shape_keys[shape] = [key for key, p in keys]
+
+    def update_shapes(self, shapes: list[Shape]):
+        """Moves the snap points of edited shapes, as one bulk index update."""
+        entries = []
+        for shape in shapes:
+            keys = self._get_snap_points(shape)
+            if [key for key, p in keys] != self.m_shape_keys.get(shape):
+                self.remove_shape(shape) # Different points (or not indexed yet)
+                self.add_shape(shape)
+                continue
+            entries.extend((key, (p.getX(), p.getX(), p.getY(), p.getY())) for key, p in keys)
+        self.m_point_index.update_many(entries)
+
+    def remove_shape(self, shape: Shape):
+        for key in self.m_shape_keys.pop(shape, ()):
+            self.m_point_index.remove(key)
+
+    def attach(self, model: MyModel):
+        """Indexes the model's shapes, then follows its changes incrementally."""
+        if self.m_model is model:
+            return
+        if self.m_model is not None:
+            self.m_model.unsubscribe(self.on_model_event)
+        self.m_model = model
+        self.reset_index()
+        if model is not None:
+            for shape in model.getShapes():
+                self.add_shape(shape)
+            model.subscribe(self.on_model_event)
+
+    def on_model_event(self, event: ModelEvents, shapes: list[Shape]):
+        if event == ModelEvents.SHAPES_ADDED:
+            for shape in shapes:
+                self.add_shape(shape)
+        elif event == ModelEvents.SHAPES_REMOVED:
+            for shape in shapes:
+                self.remove_shape(shape)
+        elif event == ModelEvents.SHAPES_MODIFIED:
+            self.update_shapes(shapes)
+        elif event == ModelEvents.CLEARED:
+            self.reset_index()
+
+    def find_control_points(self, xmin: float, xmax: float, ymin: float, ymax: float) -> list[tuple[Shape, int]]:
+        """(shape, index) of the indexed control points inside the box (wherever their shape's box is)."""
+        return [(key[0], key[1]) for key in self.m_point_index.query_box(xmin, xmax, ymin, ymax)
+                if key[2] == SnapKinds.CONTROL_POINT]
+
+    def snap(self, mouse_pos: MyPoint, model: MyModel, tolerance: float) -> MyPoint:
+        """
+        Returns the snapped position (a new MyPoint), or mouse_pos itself if
+        nothing is within tolerance. The result is also kept for drawing.
+        """
+        self.clear()
+        if model is None or tolerance <= 0.0 or not mouse_pos:
+            return mouse_pos
+        self.attach(model)
+
+        mx, my = mouse_pos.getX(), mouse_pos.getY()
+        box = (mx - tolerance, mx + tolerance, my - tolerance, my + tolerance)
+        tol_sq = tolerance * tolerance
+
+        # 1. Endpoints and control points
+        best_point, best_kind = self._snap_to_points(mouse_pos, box, tol_sq)
+
+        # 2. Intersections, then the nearest point on a shape
+        if best_point is None:
+            nearby_shapes = model.get_shape_index().query_box(*box)
+            best_point = self._snap_to_intersections(mouse_pos, box, tol_sq, nearby_shapes)
+            if best_point is not None:
+                best_kind = SnapKinds.INTERSECTION
+            else:
+                best_point = self._snap_to_nearest(mouse_pos, tolerance, nearby_shapes)
+                if best_point is not None:
+                    best_kind = SnapKinds.NEAREST
+
+        if best_point is None:
+            return mouse_pos
+
+        # Always hand out a fresh point: shapes must never share MyPoint objects
+        self.m_snap_point = MyPoint(best_point.getX(), best_point.getY())
+        self.m_snap_kind = best_kind
+        return MyPoint(best_point.getX(), best_point.getY())
+
+    def _snap_to_points(self, mouse_pos: MyPoint, box, tol_sq: float) -> (MyPoint, SnapKinds):
+        best_dist_sq = tol_sq
+        best_point, best_kind = None, None
+        for key in self.m_point_index.query_box(*box):
+            shape, i, kind = key
+            p = shape.get_tessellated_points()[i] if kind == SnapKinds.ENDPOINT else shape.get_control_points()[i]
+            d = point_dist_sq(mouse_pos, p)
+            # Endpoints win ties against control points
+            if d < best_dist_sq or (d == best_dist_sq and kind == SnapKinds.ENDPOINT):
+                best_dist_sq = d
+                best_point, best_kind = p, kind
+        return best_point, best_kind
+
+    def _snap_to_intersections(self, mouse_pos: MyPoint, box, tol_sq: float, shapes: list[Shape]) -> MyPoint:
+        """Intersects the segments of nearby shapes, clipped to the snap box."""
+        if len(shapes) < 2:
+            return None
+        # Keep the work bounded in dense areas: only the closest shapes take part
+        if len(shapes) > self.m_max_intersection_shapes:
+            shapes = sorted(shapes, key=lambda s: s.find_closest_point(mouse_pos)[1])
+            shapes = shapes[:self.m_max_intersection_shapes]
+
+        segments_per_shape = []
+        for shape in shapes:
+            points = shape.get_tessellated_points()
+            segments_per_shape.append([(points[i], points[i + 1]) for i in range(len(points) - 1)
+                                       if segment_intersects_box(points[i], points[i + 1], *box)])
+
+        best_dist_sq = tol_sq
+        best_point = None
+        for a in range(len(segments_per_shape)):
+            for b in range(a + 1, len(segments_per_shape)):
+                for p1, p2 in segments_per_shape[a]:
+                    for p3, p4 in segments_per_shape[b]:
+                        ip = find_segment_intersection(p1, p2, p3, p4)
+                        if ip is None:
+                            continue
+                        d = point_dist_sq(mouse_pos, ip)
+                        if d <= best_dist_sq:
+                            best_dist_sq = d
+                            best_point = ip
+        return best_point
+
+    def _snap_to_nearest(self, mouse_pos: MyPoint, tolerance: float, shapes: list[Shape]) -> MyPoint:
+        best_dist = tolerance
+        best_point = None
+        for shape in shapes:
+            closest_pt, dist = shape.find_closest_point(mouse_pos)
+            if closest_pt is not None and dist <= best_dist:
+                best_dist = dist
+                best_point = closest_pt
+        return best_point
+
+    def get_snap_point(self) -> MyPoint:
+        return self.m_snap_point
+
+    def get_snap_kind(self) -> SnapKinds:
+        return self.m_snap_kind
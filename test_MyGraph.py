@@ -0,0 +1,38 @@
+# test_MyGraph.py
+import unittest
+from unittest import mock
+import MyGraphBuilder
+from MyShapes import MyPoint, MyLine, MyCircle
+from MyGraphBuilder import build_graph, find_faces, trace_components
+
+class SimplifyChainsTest(unittest.TestCase):
+    def build_faces(self, shapes, simplify_chains):
+        graph, _ = build_graph(shapes, simplify_chains=simplify_chains)
+        faces, _ = find_faces(graph)
+        return graph, faces
+
+    def test_loop_on_one_junction_keeps_its_face(self):
+        # The line crosses the circle once: the circle is a loop hanging on a single junction
+        shapes = [MyCircle(MyPoint(0.0, 0.0), 10.0), MyLine(MyPoint(0.0, 0.5), MyPoint(20.0, 0.5))]
+        plain_graph, plain_faces = self.build_faces(shapes, simplify_chains=False)
+        graph, faces = self.build_faces(shapes, simplify_chains=True)
+
+        self.assertEqual(len(plain_faces), 1)
+        self.assertEqual(len(faces), 1)
+        self.assertAlmostEqual(abs(faces[0].get_signed_area()), abs(plain_faces[0].get_signed_area()))
+        self.assertLess(len(graph.get_nodes()), len(plain_graph.get_nodes()))
+        for edge in graph.get_edges():
+            self.assertIsNot(edge.n1, edge.n2)
+
+class TraceComponentsTest(unittest.TestCase):
+    def test_failed_pool_falls_back_to_serial_tracing(self):
+        shapes = [MyCircle(MyPoint(0.0, 0.0), 1.0), MyCircle(MyPoint(10.0, 0.0), 1.0)]
+        graph, _ = build_graph(shapes)
+        components = graph.get_connected_components()
+        with mock.patch.object(MyGraphBuilder, 'ProcessPoolExecutor', side_effect=OSError("no semaphores")):
+            with self.assertLogs('MyGraphBuilder', level='WARNING'):
+                results = trace_components(components, workers=2, min_parallel_edges=0)
+        self.assertEqual([len(bounded) for bounded, outers in results], [1, 1])
+
+if __name__ == '__main__':
+    unittest.main()
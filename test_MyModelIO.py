@@ -0,0 +1,46 @@
+# test_MyModelIO.py
+import os
+import tempfile
+import unittest
+from MyShapes import MyPoint, MyLine, MyCircle, MyCubicBezier, MyPolygon
+from MyModelIO import shape_from_record, shape_to_record, save_shapes, load_shapes
+
+class RecordsTest(unittest.TestCase):
+    def test_round_trip(self):
+        shapes = [MyLine(MyPoint(0.0, 0.0), MyPoint(1.0, 2.0)),
+                  MyCircle(MyPoint(3.0, 4.0), 5.0),
+                  MyCubicBezier(MyPoint(0.0, 0.0), MyPoint(1.0, 3.0), MyPoint(2.0, 3.0), MyPoint(3.0, 0.0)),
+                  MyPolygon([MyPoint(0.0, 0.0), MyPoint(4.0, 0.0), MyPoint(4.0, 4.0)])]
+        for shape in shapes:
+            copy = shape_from_record(shape_to_record(shape))
+            self.assertIs(type(copy), type(shape))
+            self.assertEqual(shape_to_record(copy), shape_to_record(shape))
+
+    def test_bad_records_raise_value_error(self):
+        for record in ([1, 2],
+                       {'type': 'ellipse', 'points': [[0, 0]]},
+                       {'type': 'line'},
+                       {'type': 'line', 'points': [[0, 0]]},
+                       {'type': 'line', 'points': [[0, 0], [1, 'x']]},
+                       {'type': 'line', 'points': [[0, 0], [1, True]]},
+                       {'type': 'line', 'points': [[0, 0], [1]]},
+                       {'type': 'quad_bezier', 'points': [[0, 0], [1, 1], [2, 0]], 'steps': 0},
+                       {'type': 'circle', 'points': [[0, 0]]},
+                       {'type': 'polygon', 'points': [[0, 0], [1, 0], [1, 1]], 'holes': 3}):
+            with self.assertRaises(ValueError, msg=repr(record)):
+                shape_from_record(record)
+
+    def test_bad_line_is_reported_with_its_number(self):
+        handle, path = tempfile.mkstemp(suffix='.jsonl')
+        os.close(handle)
+        try:
+            save_shapes(path, [MyLine(MyPoint(0.0, 0.0), MyPoint(1.0, 1.0))])
+            with open(path, 'a', encoding='utf-8') as f:
+                f.write('{"type": "circle", "points": [[0, 0]]}\n')
+            with self.assertRaisesRegex(ValueError, ':3:'):
+                load_shapes(path)
+        finally:
+            os.remove(path)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,44 @@
+# test_MyRenderer.py
+import unittest
+from MyShapes import MyPoint, MyLine
+from MyModel import MyModel
+from LODManager import LODManager
+
+try:
+    from MyRenderer import ShapeBatchRenderer
+except ImportError: # No PyOpenGL
+    ShapeBatchRenderer = None
+
+@unittest.skipIf(ShapeBatchRenderer is None, "needs PyOpenGL")
+class ShapeBatchRendererTest(unittest.TestCase):
+    def setUp(self):
+        self.model = MyModel()
+        self.renderer = ShapeBatchRenderer(LODManager(), growing_group='all')
+        self.model.subscribe(self.renderer.on_model_event)
+
+    def get_batch(self):
+        return self.renderer.get_batch('all', self.model.iter_all_shapes, 1.0)
+
+    def test_removed_pending_shape_is_never_packed(self):
+        first = MyLine(MyPoint(0.0, 0.0), MyPoint(10.0, 0.0))
+        self.model.add_shapes([first])
+        self.get_batch()
+        added = MyLine(MyPoint(0.0, 5.0), MyPoint(10.0, 5.0))
+        self.model.add_shapes([added]) # Queued, not packed until the next draw
+        self.model.remove_shapes([added])
+        batch = self.get_batch()
+        self.assertNotIn(added, batch.m_shapes)
+        self.assertEqual(batch.m_pending, [])
+        self.assertEqual(batch.m_shapes, {first})
+
+    def test_removed_packed_shape_is_drawn_around(self):
+        lines = [MyLine(MyPoint(0.0, y), MyPoint(10.0, y)) for y in (0.0, 1.0, 2.0)]
+        self.model.add_shapes(lines)
+        self.get_batch()
+        self.model.remove_shapes([lines[1]])
+        batch = self.get_batch()
+        self.assertEqual(batch.m_shapes, {lines[0], lines[2]})
+        self.assertEqual(batch.get_part_runs(0)[1], [(0, 2), (4, 2)])
+
+if __name__ == '__main__':
+    unittest.main()
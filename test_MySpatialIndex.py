@@ -0,0 +1,37 @@
+# test_MySpatialIndex.py
+import random
+import unittest
+from MySpatialIndex import GridIndex
+
+class PointGridTest(unittest.TestCase):
+    def check_point_grid(self, scale):
+        rng = random.Random(1)
+        points = [(rng.uniform(0.0, scale), rng.uniform(0.0, scale)) for _ in range(1000)]
+        index = GridIndex()
+        for i, (x, y) in enumerate(points):
+            index.insert(i, (x, x, y, y))
+        # About four points per cell over the square
+        self.assertLess(index.get_cell_size(), scale * 0.2)
+        self.assertGreater(index.get_cell_size(), scale * 0.02)
+
+        x, y = points[0]
+        r = scale * 0.05
+        expected = {i for i, (px, py) in enumerate(points) if abs(px - x) <= r and abs(py - y) <= r}
+        self.assertEqual(set(index.query_box(x - r, x + r, y - r, y + r)), expected)
+
+    def test_large_coordinates(self):
+        self.check_point_grid(1.0e6)
+
+    def test_sub_unit_drawing(self):
+        self.check_point_grid(1.0e-3)
+
+    def test_bulk_move_keeps_points_apart(self):
+        index = GridIndex()
+        for i in range(100):
+            index.insert(i, (float(i), float(i), 0.0, 0.0))
+        index.update_many([(i, (i * 1000.0, i * 1000.0, 0.0, 0.0)) for i in range(100)])
+        self.assertGreater(index.get_cell_size(), 1000.0)
+        self.assertEqual(index.query_box(4990.0, 5010.0, -1.0, 1.0), [5])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,51 @@
+# test_MyTiledModel.py
+import os
+import tempfile
+import unittest
+from MyShapes import MyPoint, MyLine
+from MyTileStore import TileStore, build_tile_store
+from MyTiledModel import TiledModel
+
+class TiledQueriesTest(unittest.TestCase):
+    def setUp(self):
+        handle, self.path = tempfile.mkstemp(suffix='.tiles')
+        os.close(handle)
+        # One short line per 10 x 10 tile, over 4 x 4 tiles
+        lines = [MyLine(MyPoint(x * 10.0 + 1.0, y * 10.0 + 1.0), MyPoint(x * 10.0 + 2.0, y * 10.0 + 2.0))
+                 for x in range(4) for y in range(4)]
+        build_tile_store(self.path, [lines], 10.0).close()
+        self.model = TiledModel(TileStore(self.path))
+
+    def tearDown(self):
+        self.model.close()
+        os.remove(self.path)
+
+    def test_box_query_only_sees_loaded_tiles(self):
+        model = self.model
+        model.ensure_tiles_in_box(0.0, 5.0, 0.0, 5.0)
+        self.assertEqual(len(model.query_shapes_in_box(0.0, 40.0, 0.0, 40.0)), 1)
+        self.assertEqual(model.get_loaded_tile_count(), 1)
+        self.assertEqual(len(model.get_missing_tiles_in_box(0.0, 40.0, 0.0, 40.0)), 15)
+
+    def test_read_tile_is_added_unless_loaded_or_stale(self):
+        model = self.model
+        reader = TileStore(self.path)
+        write_count = model.get_write_count()
+        shapes = reader.read_tile((1, 1))
+        model.add_read_tile((1, 1), shapes, write_count)
+        self.assertEqual(model.query_shapes_in_box(10.0, 20.0, 10.0, 20.0), shapes)
+        model.add_read_tile((1, 1), reader.read_tile((1, 1)), write_count) # Already loaded
+        self.assertEqual(model.query_shapes_in_box(10.0, 20.0, 10.0, 20.0), shapes)
+
+        # A tile written back after the read is loaded again from the store
+        stale = reader.read_tile((2, 2))
+        model.ensure_tiles_in_box(20.0, 25.0, 20.0, 25.0)
+        moved = model.query_shapes_in_box(20.0, 25.0, 20.0, 25.0)
+        model.remove_shapes(moved)
+        model._unload_tiles([(2, 2)])
+        model.add_read_tile((2, 2), stale, write_count)
+        self.assertEqual(model.query_shapes_in_box(20.0, 30.0, 20.0, 30.0), [])
+        reader.close()
+
+if __name__ == '__main__':
+    unittest.main()
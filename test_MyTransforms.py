@@ -0,0 +1,35 @@
+# test_MyTransforms.py
+import math
+import unittest
+from MyShapes import MyPoint, MyQuadBezier, MyCubicBezier
+from MyModel import MyModel
+from MyTransforms import rotation, scaling, mirroring, translation
+
+class TransformBoxesTest(unittest.TestCase):
+    def assertBoxAlmostEqual(self, box1, box2):
+        for a, b in zip(box1, box2):
+            self.assertAlmostEqual(a, b, places=9)
+
+    def test_indexed_box_of_transformed_beziers_is_exact(self):
+        quad = MyQuadBezier(MyPoint(0.0, 0.0), MyPoint(5.0, 10.0), MyPoint(10.0, 0.0))
+        cubic = MyCubicBezier(MyPoint(0.0, 0.0), MyPoint(5.0, 20.0), MyPoint(10.0, 20.0), MyPoint(15.0, 0.0))
+        model = MyModel()
+        model.add_shapes([quad, cubic])
+        self.assertBoxAlmostEqual(model.get_shape_index().get_box(quad), (0.0, 10.0, 0.0, 5.0))
+
+        for matrix in (translation(3.0, -2.0), rotation(math.pi / 3.0, 1.0, 2.0),
+                       scaling(2.0, 0.5), mirroring(0.0)):
+            model.apply_transform([quad, cubic], matrix)
+            for shape in (quad, cubic):
+                self.assertBoxAlmostEqual(model.get_shape_index().get_box(shape), shape.get_bounding_box())
+
+    def test_window_selection_after_transform(self):
+        quad = MyQuadBezier(MyPoint(0.0, 0.0), MyPoint(5.0, 10.0), MyPoint(10.0, 0.0))
+        model = MyModel()
+        model.add_shapes([quad])
+        model.apply_transform([quad], translation(0.0, 1.0))
+        # The curve tops out at y = 6, well below its middle control point
+        self.assertEqual(model.query_shapes_in_box(-1.0, 11.0, 0.0, 7.0), [quad])
+
+if __name__ == '__main__':
+    unittest.main()
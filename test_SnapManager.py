@@ -0,0 +1,31 @@
+# test_SnapManager.py
+import unittest
+from MyShapes import MyPoint, MyLine, MyQuadBezier
+from MyModel import MyModel
+from MyTransforms import rotation
+from SnapManager import SnapManager
+
+class ControlPointLookupTest(unittest.TestCase):
+    def setUp(self):
+        self.quad = MyQuadBezier(MyPoint(0.0, 0.0), MyPoint(5.0, 10.0), MyPoint(10.0, 0.0))
+        self.line = MyLine(MyPoint(20.0, 0.0), MyPoint(30.0, 0.0))
+        self.model = MyModel()
+        self.model.add_shapes([self.quad, self.line])
+        self.snap_manager = SnapManager()
+        self.snap_manager.attach(self.model)
+
+    def test_bezier_handle_outside_its_box_is_found(self):
+        # The middle handle is above the curve's (tight) box...
+        self.assertEqual(self.model.get_shape_index().query_box(4.9, 5.1, 9.9, 10.1), [])
+        # ...but is still found as a control point
+        self.assertEqual(self.snap_manager.find_control_points(4.9, 5.1, 9.9, 10.1), [(self.quad, 1)])
+
+    def test_lookup_follows_edits(self):
+        self.model.apply_transform([self.quad], rotation(3.141592653589793, 5.0, 0.0))
+        self.assertEqual(self.snap_manager.find_control_points(4.9, 5.1, -10.1, -9.9), [(self.quad, 1)])
+        self.assertEqual(self.snap_manager.find_control_points(4.9, 5.1, 9.9, 10.1), [])
+        self.model.remove_shapes([self.line])
+        self.assertEqual(self.snap_manager.find_control_points(19.9, 30.1, -0.1, 0.1), [])
+
+if __name__ == '__main__':
+    unittest.main()